@@ -1 +1,27 @@
 #1/usr/bin/python3
+"""
+Count files or file sizes in directories with glob filters
+---------------------------------------------------------------------------------
+Muuur - 2020
+---------------------------------------------------------------------------------
+"""
+
+# ? The public names are imported on first access, so `python -m many`
+# ? only loads what the command line needs
+_exports = {
+    "FileType":   "enums",
+    "Size":       "enums",
+    "NoDir":      "mainclass",
+    "ScanResult": "api",
+    "scan":       "api",
+    "search":     "api",
+    "Stats":      "stats",
+}
+
+def __getattr__(name: str) -> object:
+    if name not in _exports:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    from importlib import import_module
+    return getattr(import_module(f".{_exports[name]}", __name__), name)
+
+__all__ = ["FileType", "Size", "NoDir", "ScanResult", "scan", "search", "Stats"]
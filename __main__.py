@@ -6,15 +6,102 @@ Muuur - 2020
 ---------------------------------------------------------------------------------
 """
 
-from sys import argv, stderr, exit
-from os import scandir
-from re import sub
-from typing import NoReturn
-from colorama import init, Fore
-from .enums import FileType
-from .mainclass import ArgvContainer
+from sys import argv, stderr, stdout, exit
+from os import scandir, sep
+from os.path import isdir
+from .colors import init, Fore
 
-def die(msg: str, code: int=1) -> NoReturn:
+# ? The search modules and typing are imported by main once the arguments are known,
+# ? so the trivial invocations do not pay for them
+TYPE_CHECKING = False
+if TYPE_CHECKING:
+    from typing import Collection, NoReturn, Optional
+    from .mainclass import ArgvContainer, NoDir
+    from .estimate import Estimate
+    from .groups import GroupTable
+    from .largest import Largest
+    from .sketch import SizeSketch
+    from .stats import Stats
+
+# ? Short flags of the counts fast_count answers, -a, -d and -l are the file types
+FAST_COUNT = set("nradl")
+
+def fast_count(args: list[str]) -> 'Optional[int]':
+    """
+    Count the entries of the trivial -n invocations straight over os.scandir: short flags among -nradl,
+    at most one directory and file name filters like *, *.txt or a literal name, the same total
+    as the search without importing the argument container, dataclasses, pathlib nor re.
+    Symbolic links are not followed and only counted with -l, like the search does without -f
+
+    Parameters
+    ----------
+    args: list[str]
+        The console arguments, without the program name
+
+    Returns
+    -------
+    fast_count: Optional[int]
+        The total, None if the arguments need the search
+    """
+    flags:   set[str] = set()
+    roots:   list[str] = []
+    filters: set[str] = set()
+    for arg in args:
+        if len(arg) > 1 and arg[0] == "-":
+            if len(roots) > 0 or len(filters) > 0 or not FAST_COUNT.issuperset(arg[1:]):
+                return None
+            flags.update(arg[1:])
+        elif isdir(arg):
+            if len(roots) > 0:
+                return None
+            roots.append(arg)
+        elif arg == "" or sep in arg or "/" in arg or "?" in arg or "[" in arg or "*" in arg[1:]:
+            return None
+        else:
+            filters.add(arg)
+    if "n" not in flags:
+        return None
+
+    # ? The same defaults as ArgvContainer.parse, this directory and every name
+    if len(filters) == 0:
+        filters.add("*")
+    typed = len(flags & set("adl")) > 0
+    files, dirs, links = ("a" in flags, "d" in flags, "l" in flags) if typed else (True, True, False)
+    recursive = "r" in flags
+    suffixes  = [i[1:] for i in filters if i[0] == "*"]
+    literals  = [i for i in filters if i[0] != "*"]
+    total = 0
+    ddires = [roots[0] if len(roots) > 0 else "."]
+    while len(ddires) > 0:
+        try:
+            with scandir(ddires.pop()) as it:
+                entries = list(it)
+        except OSError:
+            continue
+        for entry in entries:
+            try:
+                link = entry.is_symlink()
+                folder = not link and entry.is_dir()
+                if recursive and folder:
+                    ddires.append(entry.path)
+                name = entry.name
+                hits = sum(1 for i in suffixes if name.endswith(i))
+                if name in literals:
+                    # ? A literal filter only matches an existing file, not a broken symlink
+                    try:
+                        entry.stat()
+                        hits += 1
+                    except OSError:
+                        pass
+                if hits == 0:
+                    continue
+                if links if link else (files and entry.is_file()) or (dirs and folder):
+                    total += hits
+            except OSError:
+                continue
+    return total
+
+def die(msg: str, code: int=1) -> 'NoReturn':
     """
     Print an error message to stderr, help recommendation and exit
 
@@ -31,13 +118,248 @@ def die(msg: str, code: int=1) -> NoReturn:
     NoReturn
     """
     print(
-        sub(r'^ *', '', msg),
+        msg.lstrip(' '),
         f"Please run `many --help` to get help",
         file=stderr,
         sep="\n\n"
     )
     exit(code)
 
+def report(argvcont: 'ArgvContainer', totals: 'dict[NoDir, int]', covered: 'Collection[NoDir]'=()) -> None:
+    """
+    Print the file count or the size of the NoDir entries
+
+    Parameters
+    ----------
+    argvcont: ArgvContainer
+        The parsed arguments
+
+    totals: dict[NoDir, int]
+        The file count, or the size in bytes in size mode, of every NoDir entry
+
+    covered: Collection[NoDir] = ()
+        The NoDir entries left out of the combined total, their matches are counted by other ones
+
+    Returns
+    -------
+    None
+    """
+    sumsize = 0
+    recursive_text = "and subdirectories " if argvcont.recr else ""
+    symlink_text   = "following symbolic links " if argvcont.follow else ""
+
+    # ! Size functionlity
+    if argvcont.size is not None:
+        for filter in argvcont:
+            aux = totals[filter]
+            sumsize += aux if filter not in covered else 0
+            if argvcont.separate:
+                if aux == 0:
+                    print(f"{Fore.RED}0 bytes{Fore.RESET} {argvcont.file_repr()} of {Fore.LIGHTGREEN_EX}{filter.fspath()}{Fore.RESET}", file=stderr)
+                else:
+                    print(f"{Fore.LIGHTYELLOW_EX}{argvcont.reducesize(aux)} {argvcont.size.value}{Fore.RESET} {argvcont.file_repr()} of {Fore.LIGHTGREEN_EX}{filter.fspath()}{Fore.RESET}")
+
+        size_reduced = argvcont.reducesize(sumsize)
+        if not argvcont.separate:
+            if argvcont.blank:
+                print(size_reduced)
+            elif argvcont.is_cd:
+                print(f'{Fore.LIGHTYELLOW_EX}{size_reduced} {argvcont.size.value}{Fore.RESET} {argvcont.file_repr()} {symlink_text}in {Fore.LIGHTBLUE_EX}this directory {Fore.RESET}{recursive_text}matching {argvcont.repr_filters()}')
+            else:
+                print(f'{Fore.LIGHTYELLOW_EX}{size_reduced} {argvcont.size.value}{Fore.RESET} {argvcont.file_repr()} {recursive_text}{symlink_text}matching {argvcont.repr_filters()}')
+
+        return
+    # ! First ending, with size
+
+    # ! File count functionality
+    for filter in argvcont:
+        aux = totals[filter]
+        sumsize += aux if filter not in covered else 0
+        if argvcont.separate:
+            if aux == 0:
+                print(f"{Fore.RED}No files{Fore.RESET} matching {Fore.LIGHTBLUE_EX}{filter.fspath()}{Fore.RESET}", file=stderr)
+            else:
+                print(f"{Fore.LIGHTYELLOW_EX}{aux} {argvcont.file_repr()} matching {Fore.LIGHTBLUE_EX}{filter.fspath()}{Fore.RESET}")
+
+    # ? if -s -> all is said
+    if not argvcont.separate:
+        if argvcont.blank:
+            print(sumsize)
+        elif argvcont.is_cd:
+            print(f"{Fore.LIGHTYELLOW_EX}{sumsize} {argvcont.file_repr()} {symlink_text}in this {Fore.LIGHTBLUE_EX}directory {Fore.RESET}{recursive_text}matching {argvcont.repr_filters()}")
+        else:
+            print(f"{Fore.LIGHTYELLOW_EX}{sumsize} {argvcont.repr_filters()} {recursive_text}{symlink_text}matching {argvcont.file_repr()}")
+    # ! Second ending (without size)
+
+def print_stats(argvcont: 'ArgvContainer', stats: 'Stats') -> None:
+    """
+    Print the traversal counters to stderr in the format of --stats
+
+    Parameters
+    ----------
+    argvcont: ArgvContainer
+        The parsed arguments
+
+    stats: Stats
+        The counters of the search
+
+    Returns
+    -------
+    None
+    """
+    if argvcont.stats == "json":
+        from json import dumps
+        print(dumps(stats.asdict()), file=stderr)
+    else:
+        for key, value in stats.asdict().items():
+            print(f"{key}: {Fore.LIGHTYELLOW_EX}{value}{Fore.RESET}", file=stderr)
+
+def report_groups(argvcont: 'ArgvContainer', table: 'GroupTable') -> None:
+    """
+    Print the group by table, with -n as tab separated key, count and, in size mode, bytes
+
+    Parameters
+    ----------
+    argvcont: ArgvContainer
+        The parsed arguments
+
+    table: GroupTable
+        The filled table
+
+    Returns
+    -------
+    None
+    """
+    rows = table.result()
+    # ? A count does not sum the bytes, so there is no size column to print
+    sizing = argvcont.size is not None
+    if not table.exact:
+        print(f"many: {Fore.LIGHTMAGENTA_EX}warning{Fore.RESET}: more {argvcont.group_by} groups than --top {Fore.RED}can{Fore.RESET} track, the ranked {'sizes' if table.by_size else 'counts'} may be overestimated", file=stderr)
+    if argvcont.blank:
+        for key, count, size in rows:
+            if sizing:
+                print(key, count, size, sep="\t")
+            else:
+                print(key, count, sep="\t")
+        return
+
+    width = max([len(argvcont.group_by)] + [len(key or "(none)") for key, _, _ in rows])
+    print(f"{argvcont.group_by:<{width}} {'count':>10}" + (f" {'size':>14}" if sizing else ""))
+    for key, count, size in rows:
+        line = f"{Fore.LIGHTBLUE_EX}{key or '(none)':<{width}}{Fore.RESET} {Fore.LIGHTYELLOW_EX}{count:>10}{Fore.RESET}"
+        if sizing:
+            line += f" {argvcont.reducesize(size):>11} {argvcont.size.value:<2}"
+        print(line)
+
+def report_largest(argvcont: 'ArgvContainer', largest: 'Largest') -> None:
+    """
+    Print the largest files and directories in the size unit of the search, with -n as tab separated size and path
+
+    Parameters
+    ----------
+    argvcont: ArgvContainer
+        The parsed arguments
+
+    largest: Largest
+        The filled heaps
+
+    Returns
+    -------
+    None
+    """
+    for title, rows in (("files", largest.largest_files()), ("directories", largest.largest_dirs())):
+        if len(rows) == 0:
+            continue
+        if not argvcont.blank:
+            print(f"\nLargest {Fore.LIGHTGREEN_EX}{title}{Fore.RESET}")
+        for size, path in rows:
+            if argvcont.blank:
+                print(argvcont.reducesize(size), path, sep="\t")
+            else:
+                print(f"{Fore.LIGHTYELLOW_EX}{argvcont.reducesize(size):>12} {argvcont.size.value:<2}{Fore.RESET} {Fore.LIGHTBLUE_EX}{path}{Fore.RESET}")
+
+def report_distribution(argvcont: 'ArgvContainer', sketches: 'dict[NoDir, SizeSketch]') -> None:
+    """
+    Print the percentiles and the log2 histogram of the sizes of every NoDir entry, the upper bound of the buckets is excluded.
+    With -n as tab separated rows of the path, the percentile or the bucket bounds and the value
+
+    Parameters
+    ----------
+    argvcont: ArgvContainer
+        The parsed arguments
+
+    sketches: dict[NoDir, SizeSketch]
+        The size distribution of every NoDir entry
+
+    Returns
+    -------
+    None
+    """
+    from dataclasses import replace
+    from .enums import Size
+    # ? The bucket bounds are powers of two, they are shown in the best unit
+    human = replace(argvcont, auto=True, size=Size.B, round=1)
+
+    def bound(num: float) -> str:
+        return f"{human.reducesize(num):g} {human.size.value}"
+
+    for filter in argvcont:
+        sketch = sketches[filter]
+        if argvcont.blank:
+            for q in argvcont.quantiles:
+                print(filter.fspath(), f"p{q:g}", argvcont.reducesize(sketch.quantile(q / 100)), sep="\t")
+            for low, high, aux in sketch.buckets():
+                print(filter.fspath(), low, high, aux, sep="\t")
+            continue
+
+        print(f"\nSize distribution of {Fore.LIGHTBLUE_EX}{filter.fspath()}{Fore.RESET}, {Fore.LIGHTYELLOW_EX}{sketch.count}{Fore.RESET} {argvcont.file_repr()}")
+        if sketch.count == 0:
+            continue
+        print("  ".join(
+            f"p{q:g} {Fore.LIGHTYELLOW_EX}{argvcont.reducesize(sketch.quantile(q / 100))} {argvcont.size.value}{Fore.RESET}"
+            for q in argvcont.quantiles
+        ))
+        buckets = sketch.buckets()
+        widest  = max(aux for _, _, aux in buckets)
+        for low, high, aux in buckets:
+            print(f"{bound(low):>9} to {bound(high):<9} {aux:>10} {Fore.LIGHTGREEN_EX}{'#' * max(1, round(40 * aux / widest))}{Fore.RESET}")
+
+def report_estimate(argvcont: 'ArgvContainer', estimate: 'Estimate') -> None:
+    """
+    Print the estimated file count or size of the NoDir entries with their 95% confidence intervals,
+    with the same layout as -s followed by the estimated sum
+
+    Parameters
+    ----------
+    argvcont: ArgvContainer
+        The parsed arguments
+
+    estimate: Estimate
+        The estimated totals
+
+    Returns
+    -------
+    None
+    """
+    if argvcont.size is None:
+        unit = argvcont.file_repr()
+        aprox = round
+    else:
+        unit = f"{argvcont.size.value} {argvcont.file_repr()}"
+        aprox = argvcont.reducesize
+
+    if argvcont.blank:
+        print(aprox(estimate.total))
+        return
+
+    if len(argvcont) > 1:
+        for filter in argvcont:
+            print(f"{Fore.LIGHTYELLOW_EX}~{aprox(estimate.totals[filter])} ±{aprox(estimate.margins[filter])}{Fore.RESET} {unit} matching {Fore.LIGHTBLUE_EX}{filter.fspath()}{Fore.RESET}")
+    print(
+        f"{Fore.LIGHTYELLOW_EX}~{aprox(estimate.total)} ±{aprox(estimate.margin)}{Fore.RESET} {unit} matching {argvcont.repr_filters()}",
+        f"(95% confidence, {estimate.probes} probes over {estimate.dirs} directories)"
+    )
+
 def main(argv: list[str]=argv) -> int:
     """
     Main function, it performs all of the operations to count files or get file sizes
@@ -52,11 +374,9 @@ def main(argv: list[str]=argv) -> int:
     main: int
         Status code, 0 if die was not called
     """
-    init()
-    aux, sumsize = 0, 0
-
     if len(argv) == 1:
         # ? Default (show all separated)
+        init(stdout.isatty())
         dirnum, filenum, linknum = 0, 0, 0
         for i in scandir():
             if i.is_symlink():
@@ -73,10 +393,106 @@ def main(argv: list[str]=argv) -> int:
         """.replace("  ", ''), end="")
         return 0
 
+    # ? The trivial counts do not need the search modules, importing them would be most of their run time
+    total = fast_count(argv[1:])
+    if total is not None:
+        print(total)
+        return 0
+
+    from .enums import FileType, Size
+    from .mainclass import ArgvContainer, NoDir
+
     # ? Argument parsing
     argvcont = ArgvContainer.parse_args(argv[1:])
+    init(stdout.isatty() and not argvcont.blank and argvcont.format is None)
+
+    # ? Thin client of a running daemon, the search is the one of the daemon
+    if argvcont.daemon_socket is not None and not (argvcont.serve or argvcont.query):
+        die(f"many: error: --daemon-socket {Fore.RED}needs{Fore.RESET} --serve or --query")
+    if argvcont.query:
+        from pathlib import Path
+        from dataclasses import replace
+        from .daemon import query, default_socket
+        path = argvcont.daemon_socket or default_socket()
+        try:
+            response = query(path, "stats" if argvcont.server_stats else "totals")
+        except OSError as err:
+            die(f"many: error: could not reach the daemon at {Fore.LIGHTBLUE_EX}{path}{Fore.RESET}: {err.strerror}")
+        if argvcont.server_stats:
+            for key, value in response.items():
+                print(f"{key}: {Fore.LIGHTYELLOW_EX}{value}{Fore.RESET}")
+            return 0
+        totals  = {NoDir(Path(i["path"]), i["filter"]): i["total"] for i in response["filters"]}
+        covered = {NoDir(Path(i["path"]), i["filter"]) for i in response["filters"] if i.get("covered")}
+        argvcont = replace(
+            argvcont,
+            ftype=FileType(response["ftype"]),
+            size=(argvcont.size or Size.B) if response["size"] else None,
+            recr=response["recursive"],
+            follow=response["follow"],
+            separate=argvcont.separate and len(totals) > 1,
+            _is_cd=response["is_cd"],
+            _filters=set(totals)
+        )
+        if argvcont.format is not None:
+            from .output import Records
+            records = Records(argvcont.format, response["size"], stdout)
+            records.begin()
+            records.finish(totals, covered)
+            return 0
+        report(argvcont, totals, covered)
+        return 0
 
     # ! Restrictions
+    if argvcont.jobs < 1 or argvcont.processes < 1:
+        die(f"many: error: the number of {Fore.LIGHTGREEN_EX}jobs and processes{Fore.RESET} {Fore.RED}must be{Fore.RESET} at least 1")
+    if argvcont.stop_at is not None and (argvcont.serve or argvcont.verify_cache):
+        die(f"many: error: --limit, --at-least and --exists {Fore.RED}cannot{Fore.RESET} be used with --serve nor --verify-cache")
+    if argvcont.estimate and (argvcont.stop_at is not None or argvcont.serve or argvcont.verify_cache):
+        die(f"many: error: --estimate {Fore.RED}cannot{Fore.RESET} be used with thresholds, --serve nor --verify-cache")
+    if (argvcont.largest_files > 0 or argvcont.largest_dirs > 0) and (argvcont.size is None or argvcont.processes > 1 or \
+        argvcont.cache or argvcont.estimate or argvcont.stop_at is not None or argvcont.serve):
+        die(f"many: error: --largest-files and --largest-dirs {Fore.RED}need{Fore.RESET} a size flag and cannot be used with -P, --cache, --estimate, thresholds nor --serve")
+    if argvcont.distribution and (argvcont.size is None or argvcont.cache or argvcont.estimate or argvcont.serve):
+        die(f"many: error: --distribution {Fore.RED}needs{Fore.RESET} a size flag and cannot be used with --cache, --estimate nor --serve")
+    if argvcont.distribution and any(not 0 <= i <= 100 for i in argvcont.quantiles):
+        die(f"many: error: the --quantiles {Fore.RED}must be{Fore.RESET} percentiles between 0 and 100")
+    if argvcont.dedupe and (argvcont.cache or argvcont.estimate or argvcont.serve):
+        die(f"many: error: --dedupe-inodes {Fore.RED}cannot{Fore.RESET} be used with --cache, --estimate nor --serve")
+    if argvcont.per_dir and argvcont.format is None:
+        die(f"many: error: --per-dir {Fore.RED}needs{Fore.RESET} --format")
+    if argvcont.format is not None and (argvcont.estimate or argvcont.group_by is not None or argvcont.largest_files > 0 or \
+        argvcont.largest_dirs > 0 or argvcont.distribution or argvcont.batch is not None or argvcont.serve or argvcont.verify_cache):
+        die(f"many: error: --format {Fore.RED}cannot{Fore.RESET} be used with --estimate, --group-by, --largest-files, --largest-dirs, --distribution, --batch, --serve nor --verify-cache")
+    if argvcont.per_dir and (argvcont.processes > 1 or argvcont.cache):
+        die(f"many: error: --per-dir {Fore.RED}cannot{Fore.RESET} be used with -P nor --cache")
+    if argvcont.predicated and (argvcont.cache or argvcont.serve):
+        die(f"many: error: --min-size, --max-size, --newer, --older, --user, --group and --perm {Fore.RED}cannot{Fore.RESET} be used with --cache nor --serve")
+    if argvcont.min_size is not None and argvcont.max_size is not None and argvcont.min_size > argvcont.max_size:
+        die(f"many: error: --min-size {Fore.RED}must not be{Fore.RESET} larger than --max-size")
+    if argvcont.disk_usage and argvcont.size is None:
+        die(f"many: error: --disk-usage {Fore.RED}needs{Fore.RESET} a size flag")
+    if argvcont.archives and (not (argvcont.recr or argvcont.batch is not None or any(i.directed for i in argvcont)) or argvcont.estimate or \
+        argvcont.largest_dirs > 0 or argvcont.serve):
+        die(f"many: error: --archives {Fore.RED}needs{Fore.RESET} -r and cannot be used with --estimate, --largest-dirs nor --serve")
+    if any(i is not None and i <= 0 for i in (argvcont.max_ops, argvcont.max_dirs)):
+        die(f"many: error: --max-ops-per-sec and --max-dirs-per-sec {Fore.RED}must be{Fore.RESET} greater than 0")
+    if argvcont.adaptive and not argvcont.throttled:
+        die(f"many: error: --adaptive {Fore.RED}needs{Fore.RESET} --max-ops-per-sec or --max-dirs-per-sec")
+    if argvcont.top is not None and (argvcont.group_by is None or argvcont.top < 1):
+        die(f"many: error: --top {Fore.RED}must be{Fore.RESET} at least 1 and used with --group-by")
+    if argvcont.group_by is not None and (argvcont.separate or argvcont.estimate or argvcont.stop_at is not None or \
+        argvcont.processes > 1 or argvcont.cache or argvcont.serve):
+        die(f"many: error: --group-by {Fore.RED}cannot{Fore.RESET} be used with -s, -P, --cache, --estimate, thresholds nor --serve")
+    if argvcont.batch is not None and (not argvcont.is_cd or any(i.filter != "*" for i in argvcont) or argvcont.separate or \
+        argvcont.estimate or argvcont.stop_at is not None or argvcont.group_by is not None or argvcont.largest_files > 0 or \
+        argvcont.largest_dirs > 0 or argvcont.distribution or argvcont.serve or argvcont.verify_cache):
+        die(f"many: error: --batch {Fore.RED}takes{Fore.RESET} the {Fore.LIGHTGREEN_EX}roots and filters{Fore.RESET} from its queries and cannot be used with -s, --estimate, thresholds, --group-by, --largest-files, --largest-dirs, --distribution, --serve nor --verify-cache")
+    if argvcont.recr and argvcont.batch is None and (not argvcont.separate or argvcont.format is not None or \
+        argvcont.stop_at is not None or argvcont.serve):
+        from .planner import QueryPlan
+        for inner, outer in QueryPlan(argvcont).overlapping(argvcont)[:1]:
+            die(f"many: error: {Fore.LIGHTBLUE_EX}{inner.fspath()}{Fore.RESET} is inside {Fore.LIGHTBLUE_EX}{outer.fspath()}{Fore.RESET} and with --max-depth or an anchored --exclude it {Fore.RED}cannot{Fore.RESET} be walked as a part of it, the combined total would count its files twice, use -s")
     if argvcont.separate:
         if argvcont.blank:
             die(f"many: error: you {Fore.RED}cannot{Fore.RESET} separate output and run it blank, -s is incompatible with -n")
@@ -90,65 +506,111 @@ def main(argv: list[str]=argv) -> int:
         argvcont.ftype = FileType.FILE
     # ! Restrictions end
 
-    recursive_text = "and subdirectories " if argvcont.recr else ""
-    symlink_text   = "following symbolic links " if argvcont.follow else ""
-
-    # ! Size functionlity
     if argvcont.size is not None:
         argvcont.ftype = FileType.FILE
-        sumsize = 0
 
-        # ? Recursive
-        for filter in argvcont:
-            aux = 0
-            for dir in filter.walk(recursive=argvcont.recr, follow=argvcont.follow, verbose=not argvcont.blank):
-                aux += sum(
-                    file.stat(follow_symlinks=argvcont.follow).st_size \
-                    for file in dir.glob(filter.filter)     
-                    if argvcont.match_type(file)
-                )
-            sumsize += aux
-            if argvcont.separate:
-                if aux == 0:
-                    print(f"{Fore.RED}0 bytes{Fore.RESET} {argvcont.file_repr()} of {Fore.LIGHTGREEN_EX}{filter.fspath()}{Fore.RESET}", file=stderr)
-                else:
-                    print(f"{Fore.LIGHTYELLOW_EX}{argvcont.reducesize(aux)} {argvcont.size.value}{Fore.RESET} {argvcont.file_repr()} of {Fore.LIGHTGREEN_EX}{filter.fspath()}{Fore.RESET}")
+    # ? Before any worker thread or process starts, they inherit the priorities
+    niceness = 0
+    if argvcont.nice:
+        from .throttle import renice
+        niceness, failed = renice()
+        if len(failed) > 0:
+            print(f"many: {Fore.LIGHTMAGENTA_EX}warning{Fore.RESET}: the {' and '.join(failed)} priority {Fore.RED}could not{Fore.RESET} be lowered", file=stderr)
 
-        size_reduced = argvcont.reducesize(sumsize)
-        if not argvcont.separate:
-            if argvcont.blank:
-                print(size_reduced)
-            elif argvcont.is_cd:
-                print(f'{Fore.LIGHTYELLOW_EX}{size_reduced} {argvcont.size.value}{Fore.RESET} {argvcont.file_repr()} {symlink_text}in {Fore.LIGHTBLUE_EX}this directory {Fore.RESET}{recursive_text}matching {argvcont.repr_filters()}')
-            else:
-                print(f'{Fore.LIGHTYELLOW_EX}{size_reduced} {argvcont.size.value}{Fore.RESET} {argvcont.file_repr()} {recursive_text}{symlink_text}matching {argvcont.repr_filters()}')
+    if argvcont.verify_cache:
+        from .planner import QueryPlan
+        cached, fresh = QueryPlan(argvcont).verify_cache(verbose=not argvcont.blank)
+        stale = [filter for filter in argvcont if cached[filter] != fresh[filter]]
+        for filter in stale:
+            print(f"many: {Fore.RED}error:{Fore.RESET} cached result {Fore.LIGHTYELLOW_EX}{cached[filter]}{Fore.RESET} of {Fore.LIGHTBLUE_EX}{filter.fspath()}{Fore.RESET} does not match {Fore.LIGHTYELLOW_EX}{fresh[filter]}{Fore.RESET}", file=stderr)
+        if len(stale) == 0 and not argvcont.blank:
+            print(f"The cached results of {argvcont.repr_filters()} match a fresh search")
+        return 1 if len(stale) > 0 else 0
 
+    if argvcont.serve:
+        from .daemon import Daemon, default_socket
+        path = argvcont.daemon_socket or default_socket()
+        try:
+            Daemon(argvcont, path).serve()
+        except OSError as err:
+            die(f"many: error: cannot serve on {Fore.LIGHTBLUE_EX}{path}{Fore.RESET}: {err.strerror or err}")
         return 0
-    # ! First ending, with size
 
-    # ! File count functionality
-    for filter in argvcont:
-        aux = 0
-        for dir in filter.walk(recursive=argvcont.recr, follow=argvcont.follow, verbose=not argvcont.blank):
-            aux += sum(1 for file in dir.glob(filter.filter) if argvcont.match_type(file))
-        sumsize += aux
-        if argvcont.separate:
-            if aux == 0:
-                print(f"{Fore.RED}No files{Fore.RESET} matching {Fore.LIGHTBLUE_EX}{filter.fspath()}{Fore.RESET}", file=stderr)
+    stats = None
+    if argvcont.stats is not None:
+        from .stats import Stats
+        stats = Stats(nice=niceness)
+
+    if argvcont.batch is not None:
+        from .batch import Batch
+        batch = Batch(argvcont, stats)
+        try:
+            if argvcont.batch == "-":
+                from sys import stdin
+                queries = batch.read(stdin)
             else:
-                print(f"{Fore.LIGHTYELLOW_EX}{aux} {argvcont.file_repr()} matching {Fore.LIGHTBLUE_EX}{filter.fspath()}{Fore.RESET}")
+                with open(argvcont.batch, encoding="utf-8") as file:
+                    queries = batch.read(file)
+        except (OSError, UnicodeDecodeError) as err:
+            die(f"many: error: cannot read the queries of {Fore.LIGHTBLUE_EX}{argvcont.batch}{Fore.RESET}: {getattr(err, 'strerror', None) or err}")
+        wrong = batch.run(queries, stdout, verbose=not argvcont.blank)
+        if stats is not None:
+            print_stats(argvcont, stats)
+        return int(wrong > 0)
 
-    # ? if -s -> all is said
-    if not argvcont.separate:
-        if argvcont.blank:
-            print(sumsize)
-        elif argvcont.is_cd:
-            print(f"{Fore.LIGHTYELLOW_EX}{sumsize} {argvcont.file_repr()} {symlink_text}in this {Fore.LIGHTBLUE_EX}directory {Fore.RESET}{recursive_text}matching {argvcont.repr_filters()}")
-        else:
-            print(f"{Fore.LIGHTYELLOW_EX}{sumsize} {argvcont.repr_filters()} {recursive_text}{symlink_text}matching {argvcont.file_repr()}")
-    # ! Second ending (without size)
+    if argvcont.estimate:
+        from .estimate import Estimator
+        from .planner import QueryPlan
+        estimate = Estimator(
+            QueryPlan(argvcont, stats),
+            seconds=argvcont.estimate_time,
+            dirs=argvcont.estimate_dirs
+        ).run(verbose=not argvcont.blank)
+        report_estimate(argvcont, estimate)
+        if stats is not None:
+            print_stats(argvcont, stats)
+        return 0
+
+    # ? The group by table and the largest heaps are filled in the same traversal as the totals
+    table, largest = None, None
+    if argvcont.group_by is not None:
+        from .groups import GroupTable
+        table = GroupTable(argvcont.group_by, argvcont.top, argvcont.size is not None)
+    if argvcont.largest_files > 0 or argvcont.largest_dirs > 0:
+        from .largest import Largest
+        largest = Largest(argvcont.largest_files, argvcont.largest_dirs)
 
-    return 0
+    # ? Every root is walked once for all of its filters
+    from time import perf_counter
+    from .api import search
+    records = None
+    if argvcont.format is not None:
+        from .output import Records
+        records = Records(argvcont.format, argvcont.size is not None, stdout)
+        records.begin()
+    result = search(argvcont, verbose=not argvcont.blank, stats=stats, table=table, largest=largest, rows=records if argvcont.per_dir else None)
+    start  = perf_counter()
+    if records is not None:
+        records.finish(result.totals, result.covered, result.errors, result.stopped)
+    elif table is None:
+        report(argvcont, result.totals, result.covered)
+    else:
+        report_groups(argvcont, table)
+    if largest is not None:
+        report_largest(argvcont, largest)
+    if result.sketches is not None:
+        report_distribution(argvcont, result.sketches)
+    if stats is not None:
+        stats.output_seconds = perf_counter() - start
+        print_stats(argvcont, stats)
+
+    # ? Threshold queries answer with the exit status, like grep -q
+    if argvcont.stop_at is None:
+        return 0
+    if result.stopped and not argvcont.blank:
+        print(f"many: {Fore.LIGHTMAGENTA_EX}note{Fore.RESET}: the search stopped once the total reached {Fore.LIGHTYELLOW_EX}{argvcont.stop_at}{Fore.RESET}, the totals are partial", file=stderr)
+    reached = result.total >= argvcont.stop_at
+    return int(reached) if argvcont.limit is not None else int(not reached)
 
 if __name__ == '__main__':
     exit(main())
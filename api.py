@@ -0,0 +1,221 @@
+#!/usr/bin/python3
+"""
+Library API, searches without argparse nor colorama
+---------------------------------------------------------------------------------
+>>> from many import scan, FileType
+>>> result = scan(["/data"], ["*.pdf", "*.mp4"], ftype=FileType.FILE, recursive=True, size=True)
+>>> result.total, result["/data/*.pdf"]
+---------------------------------------------------------------------------------
+"""
+
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Iterable, Iterator, Optional, Union, TYPE_CHECKING
+from .enums import FileType, Size
+from .mainclass import ArgvContainer, NoDir
+from .planner import QueryPlan
+from .walker import StrPath
+if TYPE_CHECKING:
+    from .groups import GroupTable
+    from .largest import Largest
+    from .output import Records
+    from .sketch import SizeSketch
+    from .stats import Stats
+
+@dataclass(frozen=True)
+class ScanResult():
+    """
+    Result of a search
+
+    Parameters
+    ----------
+    totals: dict[NoDir, int]
+        The file count, or the size in bytes if size, of every NoDir entry
+
+    size: bool
+        Whether the totals are sizes in bytes instead of file counts
+
+    errors: int
+        The number of directories that could not be read
+
+    stopped: bool = False
+        Whether the search stopped early at its threshold, so the totals are partial
+
+    sketches: Optional[dict[NoDir, SizeSketch]] = None
+        The size distribution of every NoDir entry, if it was requested
+
+    covered: frozenset[NoDir] = frozenset()
+        The NoDir entries whose matches are all matches of another one, left out of the total
+    """
+    totals:   dict[NoDir, int]
+    size:     bool
+    errors:   int
+    stopped:  bool = False
+    sketches: Optional[dict[NoDir, 'SizeSketch']] = None
+    covered:  frozenset[NoDir] = frozenset()
+
+    def __iter__(self) -> Iterator[NoDir]:
+        yield from self.totals
+
+    def __getitem__(self, key: Union[NoDir, str]) -> int:
+        """
+        Get the total of a NoDir entry, or of its path representation like /data/*.pdf
+
+        Parameters
+        ----------
+        key: Union[NoDir, str]
+            The NoDir entry or its NoDir.join() string
+
+        Returns
+        -------
+        __getitem__: int
+            The total of the entry
+        """
+        if isinstance(key, NoDir):
+            return self.totals[key]
+        key = Path(key).as_posix()
+        for nodir, aux in self.totals.items():
+            if nodir.join() == key:
+                return aux
+        raise KeyError(key)
+
+    @property
+    def total(self) -> int:
+        """
+        The combined total, the files of nested or repeated roots are counted once
+        """
+        return sum(aux for nodir, aux in self.totals.items() if nodir not in self.covered)
+
+def search(
+    argvcont: ArgvContainer,
+    verbose: bool=False,
+    stats: Optional['Stats']=None,
+    table: Optional['GroupTable']=None,
+    largest: Optional['Largest']=None,
+    rows: Optional['Records']=None
+) -> ScanResult:
+    """
+    Run an already built search, this is the layer shared by scan and the command line
+
+    Parameters
+    ----------
+    argvcont: ArgvContainer
+        The search options and NoDir entries
+
+    verbose: bool = False
+        Whether to print error messages or not
+
+    stats: Optional[Stats] = None
+        The counters to fill with the traversal statistics, default they are not collected
+
+    table: Optional[GroupTable] = None
+        The group by table to fill, default no table is built
+
+    largest: Optional[Largest] = None
+        The largest files and directories heaps to fill in size mode, default they are not kept
+
+    rows: Optional[Records] = None
+        The writer of a record per visited directory, default they are not written
+
+    Returns
+    -------
+    search: ScanResult
+        The totals of the search
+    """
+    plan   = QueryPlan(argvcont, stats, table, largest, rows)
+    totals = plan.run(verbose=verbose)
+    return ScanResult(totals, argvcont.size is not None, plan.errors, plan.stopped, plan.sketches, plan.covered(argvcont))
+
+def scan(
+    roots: Iterable[StrPath],
+    filters: Iterable[str]=("*",),
+    *,
+    ftype: Optional[FileType]=None,
+    recursive: bool=False,
+    size: bool=False,
+    follow: bool=False,
+    jobs: int=1,
+    processes: int=1,
+    cache: bool=False,
+    stats: Optional['Stats']=None,
+    at_least: Optional[int]=None,
+    distribution: bool=False,
+    archives: bool=False
+) -> ScanResult:
+    """
+    Count files or sum their sizes in directories, every root is combined with every filter
+
+    Parameters
+    ----------
+    roots: Iterable[StrPath]
+        The directories to search
+
+    filters: Iterable[str] = ("*",)
+        The glob filters to match in every root
+
+    ftype: Optional[FileType] = None
+        The file types to match, default FILE | DIR for counting and FILE for size
+
+    recursive: bool = False
+        Whether to search sub directories or not
+
+    size: bool = False
+        Whether to sum the size in bytes instead of counting
+
+    follow: bool = False
+        Whether to follow symbolic links or not
+
+    jobs: int = 1
+        The number of threads listing directories
+
+    processes: int = 1
+        The number of processes sharding the roots
+
+    cache: bool = False
+        Whether to use the scan cache
+
+    stats: Optional[Stats] = None
+        The counters to fill with the traversal statistics, default they are not collected
+
+    at_least: Optional[int] = None
+        Stop the search as soon as the total reaches it, default search everything
+
+    distribution: bool = False
+        Whether to keep the size distribution of every filter, with size
+
+    archives: bool = False
+        Whether to enter the tar and zip archives like directories, with recursive
+
+    Returns
+    -------
+    scan: ScanResult
+        The totals of every root and filter combination
+    """
+    dires = [Path(i) for i in roots]
+    filts = list(filters)
+    for dire in dires:
+        if not dire.is_dir():
+            raise NotADirectoryError(f"many: {dire} is not a directory")
+    if ftype is None:
+        ftype = FileType.FILE if size else FileType.FILE | FileType.DIR
+    elif size:
+        ftype = FileType.FILE
+    argvcont = ArgvContainer(
+        ftype=ftype,
+        size=Size.B if size else None,
+        auto=False,
+        follow=follow,
+        blank=True,
+        recr=recursive,
+        separate=False,
+        jobs=jobs,
+        processes=processes,
+        cache=cache,
+        at_least=at_least,
+        distribution=distribution and size,
+        archives=archives,
+        _filters={NoDir(i, j) for i in dires for j in filts}
+    )
+    return search(argvcont, stats=stats)
+
+__all__ = ["ScanResult", "scan", "search"]
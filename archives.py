@@ -0,0 +1,333 @@
+#!/usr/bin/python3
+"""
+Archives as virtual directories, --archives
+---------------------------------------------------------------------------------
+A tar or zip archive reached by a recursive walk is entered like a directory with its name:
+its members are the entries of virtual directories, matched by the same filters, file types,
+metadata conditions and sizes as the files on disk, so /data/*.pdf also counts /data/docs.zip/a.pdf.
+Only the headers are read, the central directory of a zip archive and the member headers of a tar
+archive whose payloads are skipped by seeking. A compressed tar archive has no index, its stream is
+decompressed to reach the headers, but no member is ever extracted nor written to disk.
+The listings are kept by archive identity, size and mtime, so an archive is read once per process
+while it does not change, and with --cache the totals of every archive are stored like the ones of a directory.
+Archives inside archives are not entered.
+---------------------------------------------------------------------------------
+"""
+
+from dataclasses import dataclass, field
+from os import sep, stat, stat_result
+from stat import S_IFBLK, S_IFCHR, S_IFDIR, S_IFIFO, S_IFLNK, S_IFMT, S_IFREG, S_ISDIR, S_ISLNK, S_ISREG
+from threading import Lock
+from typing import Iterator, Optional
+
+# ? The compressions tarfile opens by itself, lzma may be missing from the Python build
+SUFFIXES = (".tar", ".tar.gz", ".tgz", ".tar.bz2", ".tbz", ".tbz2", ".tar.xz", ".txz", ".zip")
+
+# ? Members kept in the listings of a process, the least recently read archives are dropped over it
+MAX_MEMBERS = 1 << 21
+
+Listing = list[tuple[str, list[tuple[str, stat_result]]]]
+
+def is_archive(name: str) -> bool:
+    """
+    Test if a file name has the suffix of a supported archive
+
+    Parameters
+    ----------
+    name: str
+        The file name or path
+
+    Returns
+    -------
+    is_archive: bool
+        Whether the file is entered with --archives
+    """
+    return name.lower().endswith(SUFFIXES)
+
+@dataclass(eq=False)
+class Member():
+    """
+    An archive member, with the DirEntry methods the searches use.
+    The stat comes from its header: type, permissions, size, owner and mtime,
+    a zip archive has no owner so the one of the archive is used.
+    The allocated size of --disk-usage is the space the member takes in the archive,
+    its compressed size in a zip archive and its 512 byte blocks in a tar archive
+
+    Parameters
+    ----------
+    name: str
+        The member name
+
+    path: str
+        The archive path followed by the member path
+
+    st: stat_result
+        The stat of the member
+    """
+    name: str
+    path: str
+    st:   stat_result
+
+    def __fspath__(self) -> str:
+        return self.path
+
+    def is_dir(self, *, follow_symlinks: bool=True) -> bool:
+        return S_ISDIR(self.st.st_mode)
+
+    def is_file(self, *, follow_symlinks: bool=True) -> bool:
+        return S_ISREG(self.st.st_mode)
+
+    def is_symlink(self) -> bool:
+        return S_ISLNK(self.st.st_mode)
+
+    def is_junction(self) -> bool:
+        return False
+
+    def inode(self) -> int:
+        return self.st.st_ino
+
+    def stat(self, *, follow_symlinks: bool=True) -> stat_result:
+        # ? The target of a symbolic link member is not looked up, it is sized as the link itself
+        return self.st
+
+def member_stat(mode: int, size: int, blocks: int, uid: int, gid: int, mtime: float, archive: stat_result) -> stat_result:
+    """
+    Build the stat of a member, on the device of its archive
+
+    Parameters
+    ----------
+    mode: int
+        The file type and permission bits
+
+    size: int
+        The uncompressed size
+
+    blocks: int
+        The 512 byte blocks the member takes in the archive
+
+    uid: int
+        The owner
+
+    gid: int
+        The group
+
+    mtime: float
+        The modification time
+
+    archive: stat_result
+        The stat of the archive
+
+    Returns
+    -------
+    member_stat: stat_result
+        The stat, with a single link and no inode number
+    """
+    return stat_result(
+        (mode, 0, archive.st_dev, 1, uid, gid, size, mtime, mtime, mtime),
+        {"st_blocks": blocks, "st_mtime_ns": int(mtime * 10**9)}
+    )
+
+def read_tar(path: str, st: stat_result) -> Iterator[tuple[str, stat_result]]:
+    """
+    Read the member headers of a tar archive, compressed or not
+
+    Parameters
+    ----------
+    path: str
+        The archive
+
+    st: stat_result
+        Its stat
+
+    Returns
+    -------
+    read_tar: Iterator[tuple[str, stat_result]]
+        The member paths and their stats, in archive order
+    """
+    import tarfile
+    with tarfile.open(path, "r:*") as tar:
+        while (info := tar.next()) is not None:
+            if info.isdir():
+                kind = S_IFDIR
+            elif info.issym():
+                kind = S_IFLNK
+            elif info.ischr():
+                kind = S_IFCHR
+            elif info.isblk():
+                kind = S_IFBLK
+            elif info.isfifo():
+                kind = S_IFIFO
+            else:
+                kind = S_IFREG
+            yield info.name, member_stat(kind | info.mode & 0o7777, info.size, (info.size + 511) // 512, info.uid, info.gid, info.mtime, st)
+            # ? The headers read so far are not needed anymore, a large archive would keep them all
+            tar.members.clear()
+
+def read_zip(path: str, st: stat_result) -> Iterator[tuple[str, stat_result]]:
+    """
+    Read the central directory of a zip archive
+
+    Parameters
+    ----------
+    path: str
+        The archive
+
+    st: stat_result
+        Its stat
+
+    Returns
+    -------
+    read_zip: Iterator[tuple[str, stat_result]]
+        The member paths and their stats, in archive order
+    """
+    from time import mktime
+    from zipfile import ZipFile
+    with ZipFile(path) as archive:
+        for info in archive.infolist():
+            # ? Unix zip tools keep the whole mode in the high bits of the external attributes
+            mode = info.external_attr >> 16 if info.create_system == 3 else 0
+            if S_IFMT(mode) == 0:
+                mode |= S_IFDIR if info.is_dir() else S_IFREG
+            if mode & 0o7777 == 0:
+                mode |= 0o755 if S_ISDIR(mode) else 0o644
+            try:
+                mtime = mktime(info.date_time + (0, 0, -1))
+            except (OverflowError, ValueError):
+                mtime = st.st_mtime
+            yield info.filename, member_stat(mode, info.file_size, (info.compress_size + 511) // 512, st.st_uid, st.st_gid, mtime, st)
+
+def read(path: str, st: stat_result) -> Listing:
+    """
+    Read the members of an archive into virtual directories.
+    The directories missing from the archive are added with the owner and mtime of the archive,
+    members with .. in their path are skipped and a member given twice keeps its last header, like extracting does
+
+    Parameters
+    ----------
+    path: str
+        The archive
+
+    st: stat_result
+        Its stat
+
+    Returns
+    -------
+    read: Listing
+        The virtual directories, relative to the archive with "" for the archive itself, parents first,
+        along with the names and stats of their entries
+    """
+    implicit = member_stat(S_IFDIR | 0o755, 0, 0, st.st_uid, st.st_gid, st.st_mtime, st)
+    dirs: dict[str, dict[str, stat_result]] = {"": {}}
+    for name, aux in (read_zip if path.lower().endswith(".zip") else read_tar)(path, st):
+        parts = [i for i in name.split("/") if i not in ("", ".")]
+        if len(parts) == 0 or ".." in parts:
+            continue
+        parent = ""
+        for part in parts[:-1]:
+            dirs[parent].setdefault(part, implicit)
+            parent = parent + sep + part if parent else part
+            dirs.setdefault(parent, {})
+        dirs[parent][parts[-1]] = aux
+        if S_ISDIR(aux.st_mode):
+            dirs.setdefault(parent + sep + parts[-1] if parent else parts[-1], {})
+    return [(rel, list(entries.items())) for rel, entries in dirs.items()]
+
+@dataclass
+class ArchiveIndex():
+    """
+    The listings of the archives read by a process, keyed by their identity (st_dev, st_ino)
+    and only valid for the same size and st_mtime_ns. Reading is thread safe, two workers
+    reaching the same archive at once may both read it.
+
+    Parameters
+    ----------
+    max_members: int = MAX_MEMBERS
+        The number of members kept, the least recently read archives are dropped over it
+    """
+    max_members: int = MAX_MEMBERS
+    _listings:   dict[tuple[int, int], tuple[int, int, int, Listing]] = field(default_factory=dict, init=False)
+    _members:    int = field(default=0, init=False)
+    _lock:       Lock = field(default_factory=Lock, init=False)
+
+    def listing(self, path: str, st: stat_result) -> tuple[Listing, bool]:
+        """
+        Get the listing of an archive, read it if it is not known or it changed
+
+        Parameters
+        ----------
+        path: str
+            The archive
+
+        st: stat_result
+            Its stat
+
+        Returns
+        -------
+        listing: tuple[Listing, bool]
+            The virtual directories of the archive, relative to it, and whether the archive was read
+
+        Raises
+        ------
+        OSError, EOFError, tarfile.TarError, zipfile.BadZipFile
+            The archive could not be read
+        """
+        key = st.st_dev, st.st_ino
+        with self._lock:
+            known = self._listings.get(key)
+            if known is not None and known[:2] == (st.st_mtime_ns, st.st_size):
+                return known[3], False
+        listing = read(path, st)
+        members = sum(len(i) for _, i in listing)
+        with self._lock:
+            old = self._listings.pop(key, None)
+            self._members -= 0 if old is None else old[2]
+            while self._members + members > self.max_members and len(self._listings) > 0:
+                self._members -= self._listings.pop(next(iter(self._listings)))[2]
+            if members <= self.max_members:
+                self._listings[key] = st.st_mtime_ns, st.st_size, members, listing
+                self._members += members
+        return listing, True
+
+    def open(self, path: str, st: Optional[stat_result]=None) -> Optional[tuple[Iterator[tuple[str, list[Member]]], bool]]:
+        """
+        Enter an archive, its virtual directories are built with their absolute paths while they are iterated
+
+        Parameters
+        ----------
+        path: str
+            The archive
+
+        st: Optional[stat_result] = None
+            Its stat, default path is stat'ed
+
+        Returns
+        -------
+        open: Optional[tuple[Iterator[tuple[str, list[Member]]], bool]]
+            The virtual directories with their entries, parents first, and whether the archive was read.
+            None if path is not a regular file
+
+        Raises
+        ------
+        OSError, EOFError, tarfile.TarError, zipfile.BadZipFile
+            The archive could not be read
+        """
+        if st is None:
+            try:
+                st = stat(path)
+            except OSError:
+                return None
+        if not S_ISREG(st.st_mode):
+            return None
+        listing, fresh = self.listing(path, st)
+
+        def members() -> Iterator[tuple[str, list[Member]]]:
+            for rel, entries in listing:
+                vdir = path + sep + rel if rel else path
+                yield vdir, [Member(name, vdir + sep + name, aux) for name, aux in entries]
+
+        return members(), fresh
+
+# ? The listings are shared by every search of the process, --batch runs several of them
+shared = ArchiveIndex()
+
+__all__ = ["ArchiveIndex", "Member", "SUFFIXES", "is_archive", "read", "shared"]
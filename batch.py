@@ -0,0 +1,281 @@
+#!/usr/bin/python3
+"""
+Batch mode, many queries read as NDJSON and answered in one process
+---------------------------------------------------------------------------------
+Every line is a query like {"id": 1, "roots": ["/data"], "filters": ["*.pdf"], "recursive": true, "size": "MB"},
+the queries with the same traversal settings (file types, counting or sizing, recursion
+and symbolic links) are run as a single search, so every root is walked once for all of them.
+The answers are written as NDJSON in the order of the queries, each one as soon as it and all the previous ones are known.
+---------------------------------------------------------------------------------
+"""
+
+from dataclasses import dataclass, replace
+from json import dumps, loads
+from pathlib import Path
+from os import sep
+from typing import Any, Iterable, Optional, TextIO, TYPE_CHECKING
+from .enums import FileType, Size
+from .mainclass import FAST_TYPES, ArgvContainer, NoDir
+from .planner import QueryPlan
+if TYPE_CHECKING:
+    from .stats import Stats
+
+# ? Query keys, anything else is an error so that typos are not silently ignored
+KEYS = {"id", "roots", "filters", "ftype", "size", "recursive", "follow"}
+
+@dataclass
+class Query():
+    """
+    A query of a batch
+
+    Parameters
+    ----------
+    index: int
+        The position of the query in the batch, the answers follow it
+
+    id: Any = None
+        The id given by the query, echoed in its answer
+
+    argvcont: Optional[ArgvContainer] = None
+        The search of the query, None if the query is wrong
+
+    error: Optional[str] = None
+        Why the query is wrong
+    """
+    index:    int
+    id:       Any = None
+    argvcont: Optional[ArgvContainer] = None
+    error:    Optional[str] = None
+
+    @classmethod
+    def fromjson(cls, index: int, line: str, base: ArgvContainer) -> 'Query':
+        """
+        Parse a query line
+
+        Parameters
+        ----------
+        index: int
+            The position of the query in the batch
+
+        line: str
+            The JSON object of the query.
+            roots and filters are lists of strings, or a single string, combined like the command line
+            arguments: default the current directory and all files, a filter with a slash is relative to its root.
+            ftype holds the file type flags of the command line, like "ad" for files and directories.
+            size is a unit, B, KB, MB, GB, TB or auto, default the files are counted.
+            recursive and follow are booleans, default false
+
+        base: ArgvContainer
+            The options of the command line, shared by every query
+
+        Returns
+        -------
+        fromjson: Query
+            The query, with its error if it is wrong
+        """
+        try:
+            request = loads(line)
+        except ValueError as err:
+            return cls(index, error=f"invalid JSON: {err}")
+        if not isinstance(request, dict):
+            return cls(index, error="a query must be a JSON object")
+        query = cls(index, request.get("id"))
+        unknown = set(request) - KEYS
+        if len(unknown) > 0:
+            query.error = f"unknown keys {', '.join(sorted(unknown))}"
+            return query
+
+        roots, filters = request.get("roots", ["."]), request.get("filters", ["*"])
+        roots   = [roots] if isinstance(roots, str) else roots
+        filters = [filters] if isinstance(filters, str) else filters
+        if not isinstance(roots, list) or not isinstance(filters, list) or not all(isinstance(i, str) for i in [*roots, *filters]):
+            query.error = "roots and filters must be strings"
+            return query
+        if any("\0" in i for i in [*roots, *filters]):
+            query.error = "roots and filters must not have null characters"
+            return query
+        ftype = FileType(0)
+        flags = request.get("ftype", "")
+        if not isinstance(flags, str):
+            query.error = f"ftype must be a string of file type flags, use {''.join(FAST_TYPES)}"
+            return query
+        for flag in flags:
+            if flag not in FAST_TYPES:
+                query.error = f"unknown file type flag {flag}, use {''.join(FAST_TYPES)}"
+                return query
+            ftype |= FAST_TYPES[flag]
+        if not all(isinstance(request.get(i, False), bool) for i in ("recursive", "follow")):
+            query.error = "recursive and follow must be booleans"
+            return query
+        unit = request.get("size")
+        if unit is not None and not isinstance(unit, str):
+            query.error = f"size must be a string, use {', '.join(Size.__members__)} or auto"
+            return query
+        if unit is not None and unit != "auto" and unit not in Size.__members__:
+            query.error = f"unknown size unit {unit}, use {', '.join(Size.__members__)} or auto"
+            return query
+
+        nodires: set[NoDir] = set()
+        for root in roots or ["."]:
+            if not Path(root).is_dir():
+                query.error = f"directory {root} not found"
+                return query
+            for filter in filters or ["*"]:
+                nodires.add(NoDir.frompath(Path(root, filter)) if sep in filter else NoDir(Path(root), filter))
+        query.argvcont = replace(
+            base,
+            # ? Sizes are only summed for regular files, like on the command line
+            ftype=FileType.FILE if unit is not None else ftype or FileType.FILE | FileType.DIR,
+            size=None if unit is None else Size.B if unit == "auto" else Size[unit],
+            auto=unit == "auto",
+            recr=request.get("recursive", False),
+            follow=request.get("follow", False),
+            _filters=nodires
+        )
+        return query
+
+    @property
+    def key(self) -> tuple[int, bool, bool, bool]:
+        """
+        The traversal settings, the queries with the same key share their search
+        """
+        argvcont = self.argvcont
+        return int(argvcont.ftype), argvcont.size is not None, argvcont.recr, argvcont.follow
+
+    def answer(self, totals: Optional[dict[NoDir, int]]=None, covered: frozenset[NoDir]=frozenset()) -> dict[str, Any]:
+        """
+        Build the answer of the query
+
+        Parameters
+        ----------
+        totals: Optional[dict[NoDir, int]] = None
+            The totals of the search of the query, it may have the ones of other queries, None if the query is wrong
+
+        covered: frozenset[NoDir] = frozenset()
+            The NoDir entries of the query left out of its total, their matches are counted by other ones
+
+        Returns
+        -------
+        answer: dict[str, Any]
+            The id and the error, or the total and the file count, or size in bytes, of every NoDir entry
+        """
+        if self.argvcont is None or totals is None:
+            return {"id": self.id, "error": self.error}
+        argvcont = self.argvcont
+        total    = sum(totals[i] for i in argvcont if i not in covered)
+        answer   = {
+            "id":      self.id,
+            "filters": [{"path": str(i.path), "filter": i.filter, "total": totals[i]} for i in argvcont],
+            "total":   total
+        }
+        if argvcont.size is not None:
+            answer["value"] = argvcont.reducesize(total)
+            answer["unit"]  = argvcont.size.value
+        return answer
+
+@dataclass
+class Batch():
+    """
+    Run the queries of a batch grouped by their traversal settings
+
+    Parameters
+    ----------
+    argvcont: ArgvContainer
+        The options of the command line, like -j, -P, --cache or --exclude, shared by every query
+
+    stats: Optional[Stats] = None
+        The counters to fill with the traversal statistics of all the searches, default they are not collected
+    """
+    argvcont: ArgvContainer
+    stats:    Optional['Stats'] = None
+
+    def read(self, lines: Iterable[str]) -> list[Query]:
+        """
+        Parse the queries, blank lines are skipped
+
+        Parameters
+        ----------
+        lines: Iterable[str]
+            The NDJSON lines
+
+        Returns
+        -------
+        read: list[Query]
+            The queries in order
+        """
+        return [Query.fromjson(n, line, self.argvcont) for n, line in enumerate(i for i in lines if i.strip())]
+
+    def run(self, queries: list[Query], out: TextIO, verbose: bool=True) -> int:
+        """
+        Answer the queries, every group of queries sharing their traversal settings is a single search.
+        The groups run in the order of their first query, so the first answers are written early
+
+        Parameters
+        ----------
+        queries: list[Query]
+            The queries in order
+
+        out: TextIO
+            Where the NDJSON answers are written
+
+        verbose: bool = True
+            Whether to print error messages or not
+
+        Returns
+        -------
+        run: int
+            The number of wrong queries
+        """
+        groups: dict[tuple[int, bool, bool, bool], list[Query]] = {}
+        for query in queries:
+            overlap = [] if query.argvcont is None else QueryPlan(query.argvcont).overlapping(query.argvcont)[:1]
+            for inner, outer in overlap:
+                # ? The total of the query would count the files under the inner root twice, see QueryPlan.overlapping
+                query.argvcont = None
+                query.error    = f"{inner.join()} is inside {outer.join()} and the pruning rules cannot walk it as a part of it"
+            if query.argvcont is not None:
+                groups.setdefault(query.key, []).append(query)
+        answers: list[Optional[dict[str, Any]]] = [None if i.argvcont is not None else i.answer() for i in queries]
+        written = self.flush(answers, 0, out)
+        for group in groups.values():
+            argvcont = replace(
+                group[0].argvcont,
+                size=None if group[0].argvcont.size is None else Size.B,
+                auto=False,
+                _filters={j for i in group for j in i.argvcont}
+            )
+            plan   = QueryPlan(argvcont, self.stats)
+            totals = plan.run(verbose=verbose)
+            for query in group:
+                answers[query.index] = query.answer(totals, plan.covered(query.argvcont))
+            written = self.flush(answers, written, out)
+        return sum(i.argvcont is None for i in queries)
+
+    @staticmethod
+    def flush(answers: list[Optional[dict[str, Any]]], written: int, out: TextIO) -> int:
+        """
+        Write the answers known from the first one not written yet
+
+        Parameters
+        ----------
+        answers: list[Optional[dict[str, Any]]]
+            The answers in order, None if not known yet
+
+        written: int
+            The number of answers already written
+
+        out: TextIO
+            Where the NDJSON answers are written
+
+        Returns
+        -------
+        flush: int
+            The number of answers written
+        """
+        while written < len(answers) and answers[written] is not None:
+            out.write(dumps(answers[written]) + "\n")
+            written += 1
+        out.flush()
+        return written
+
+__all__ = ["Batch", "Query"]
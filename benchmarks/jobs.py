@@ -0,0 +1,70 @@
+#!/usr/bin/python3
+"""
+Benchmark of the --jobs thread pool, shows how the speedup scales with the number of threads
+---------------------------------------------------------------------------------
+Run it from the directory containing the package: python -m many.benchmarks.jobs
+Use --root to measure a real tree, like a NFS mount, instead of a synthetic one
+---------------------------------------------------------------------------------
+"""
+
+from argparse import ArgumentParser
+from tempfile import TemporaryDirectory
+from time import perf_counter
+from ..mainclass import ArgvContainer
+from ..planner import QueryPlan
+from .tree import TreeSpec, generate
+
+def measure(root: str, jobs: int, repeat: int) -> float:
+    """
+    Best wall time of a recursive count with a number of jobs
+
+    Parameters
+    ----------
+    root: str
+        The tree to count
+
+    jobs: int
+        The number of threads
+
+    repeat: int
+        Number of runs, the best one is kept
+
+    Returns
+    -------
+    measure: float
+        The time in seconds
+    """
+    best = float("inf")
+    for _ in range(repeat):
+        argvcont = ArgvContainer.parse_args(["-rn", "-j", str(jobs), root, "*.txt"])
+        start = perf_counter()
+        QueryPlan(argvcont).run(verbose=False)
+        best = min(best, perf_counter() - start)
+    return best
+
+def main() -> int:
+    parser = ArgumentParser(description="Benchmark the speedup of many --jobs")
+    parser.add_argument("--root", help="Existing tree to benchmark instead of a synthetic one")
+    parser.add_argument("--width", type=int, default=6)
+    parser.add_argument("--depth", type=int, default=4)
+    parser.add_argument("--files", type=int, default=20)
+    parser.add_argument("--jobs", type=int, nargs="+", default=[1, 2, 4, 8, 16])
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    with TemporaryDirectory(prefix="many-bench-") as tmp:
+        root = args.root
+        if root is None:
+            root = tmp
+            stats = generate(root, TreeSpec(args.width, args.depth, args.files))
+            print(f"synthetic tree: {stats.dirs} directories, {stats.files} files")
+        base = None
+        print(f"{'jobs':>6} {'seconds':>10} {'speedup':>8}")
+        for jobs in args.jobs:
+            elapsed = measure(root, jobs, args.repeat)
+            base = base or elapsed
+            print(f"{jobs:>6} {elapsed:>10.4f} {base / elapsed:>7.2f}x")
+    return 0
+
+if __name__ == '__main__':
+    exit(main())
@@ -0,0 +1,117 @@
+#!/usr/bin/python3
+"""
+Benchmark of directory pruning, shows the time saved by --exclude, --max-depth and -x
+---------------------------------------------------------------------------------
+Run it from the directory containing the package: python -m many.benchmarks.prune
+The synthetic tree is a set of projects with small sources next to big
+node_modules and .git trees, the usual trees nobody wants to count
+---------------------------------------------------------------------------------
+"""
+
+from argparse import ArgumentParser
+from os import makedirs
+from os.path import join
+from tempfile import TemporaryDirectory
+from time import perf_counter
+from ..mainclass import ArgvContainer
+from ..planner import QueryPlan
+from ..stats import Stats
+from .tree import TreeSpec, TreeStats, generate
+
+# ? (name, options of many), every scenario counts the same tree
+SCENARIOS = [
+    ("full",        []),
+    ("exclude",     ["--exclude", "node_modules", "--exclude", ".git"]),
+    ("max-depth",   ["--max-depth", "2"]),
+    ("one-fs",      ["-x"]),
+]
+
+def projects(root: str, count: int, sources: TreeSpec, vendored: TreeSpec) -> TreeStats:
+    """
+    Create the projects of the benchmark tree
+
+    Parameters
+    ----------
+    root: str
+        The directory where the projects are created
+
+    count: int
+        Number of projects
+
+    sources: TreeSpec
+        The shape of the src tree of every project
+
+    vendored: TreeSpec
+        The shape of the node_modules and .git/objects trees of every project
+
+    Returns
+    -------
+    projects: TreeStats
+        The number of created entries
+    """
+    total = TreeStats()
+    for i in range(count):
+        project = join(root, f"project{i}")
+        for sub, spec in (("src", sources), ("node_modules", vendored), (join(".git", "objects"), vendored)):
+            makedirs(join(project, sub))
+            stats = generate(join(project, sub), spec)
+            total.dirs  += stats.dirs
+            total.files += stats.files
+    return total
+
+def measure(root: str, options: list[str], repeat: int) -> tuple[float, Stats]:
+    """
+    Best wall time of a recursive count with some pruning options
+
+    Parameters
+    ----------
+    root: str
+        The tree to count
+
+    options: list[str]
+        The pruning options of many
+
+    repeat: int
+        Number of runs, the best one is kept
+
+    Returns
+    -------
+    measure: tuple[float, Stats]
+        The time in seconds and the counters of the last run
+    """
+    best  = float("inf")
+    stats = Stats()
+    for _ in range(repeat):
+        argvcont = ArgvContainer.parse_args(["-rn", *options, root, "*.txt"])
+        stats = Stats()
+        start = perf_counter()
+        QueryPlan(argvcont, stats).run(verbose=False)
+        best = min(best, perf_counter() - start)
+    return best, stats
+
+def main() -> int:
+    parser = ArgumentParser(description="Benchmark the time saved by many directory pruning")
+    parser.add_argument("--root", help="Existing tree to benchmark instead of a synthetic one")
+    parser.add_argument("--projects", type=int, default=8)
+    parser.add_argument("--width", type=int, default=5, help="Subdirectories of every node_modules and .git directory")
+    parser.add_argument("--depth", type=int, default=3, help="Levels of every node_modules and .git tree")
+    parser.add_argument("--files", type=int, default=10)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    with TemporaryDirectory(prefix="many-bench-") as tmp:
+        root = args.root
+        if root is None:
+            root  = tmp
+            stats = projects(root, args.projects, TreeSpec(2, 1, args.files), TreeSpec(args.width, args.depth, args.files))
+            print(f"synthetic tree: {stats.dirs} directories, {stats.files} files")
+        base = None
+        print(f"{'scenario':<10} {'seconds':>9} {'listed':>8} {'pruned':>8} {'speedup':>8}")
+        for name, options in SCENARIOS:
+            elapsed, counters = measure(root, options, args.repeat)
+            base = base or elapsed
+            print(f"{name:<10} {elapsed:>9.4f} {counters.dirs:>8} {counters.pruned:>8} {base / elapsed:>7.2f}x")
+    return 0
+
+if __name__ == '__main__':
+    exit(main())
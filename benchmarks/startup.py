@@ -0,0 +1,110 @@
+#!/usr/bin/python3
+"""
+Startup time regression benchmark, based on python -X importtime
+---------------------------------------------------------------------------------
+Run it from the directory containing the package: python -m many.benchmarks.startup
+It exits with status 1 when an invocation goes over its import time budget
+or imports a module that it should not need
+---------------------------------------------------------------------------------
+"""
+
+from argparse import ArgumentParser
+from os import environ
+from pathlib import Path
+from statistics import median
+from subprocess import run, PIPE, DEVNULL
+from sys import executable
+from tempfile import TemporaryDirectory
+
+PACKAGE = __package__.rsplit(".", 1)[0]
+ROOT    = str(Path(__file__).resolve().parents[2])
+
+# ? (arguments, import budget in ms, modules that must not be imported)
+SCENARIOS = [
+    ([],                       15, ["colorama", "argparse", "typing", f"{PACKAGE}.mainclass"]),
+    (["-n"],                   15, ["colorama", "argparse", "sqlite3", "threading", "pathlib", "re", "glob", f"{PACKAGE}.mainclass"]),
+    (["-nr", ".", "*.txt"],    15, ["colorama", "argparse", "sqlite3", "threading", "pathlib", "re", "glob", f"{PACKAGE}.mainclass"]),
+    (["-r", ".", "*.txt"],     75, ["argparse", "sqlite3", "threading"]),
+]
+
+def importtime(args: list[str], cwd: str) -> tuple[dict[str, int], set[str]]:
+    """
+    Run python -X importtime and get the cumulative import time of every top level import
+
+    Parameters
+    ----------
+    args: list[str]
+        The arguments after python -X importtime
+
+    cwd: str
+        The working directory
+
+    Returns
+    -------
+    importtime: tuple[dict[str, int], set[str]]
+        The cumulative microseconds of every top level import and the names of all the imported modules
+    """
+    env  = dict(environ, PYTHONPATH=ROOT)
+    proc = run([executable, "-X", "importtime", *args], cwd=cwd, env=env, stdout=DEVNULL, stderr=PIPE, text=True)
+    times:   dict[str, int] = {}
+    modules: set[str] = set()
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        modules.add(name.strip())
+        if len(name) - len(name.lstrip()) == 1:
+            times[name.strip()] = int(cumulative)
+    return times, modules
+
+def measure(args: list[str], cwd: str, repeat: int) -> tuple[float, set[str]]:
+    """
+    Median import time of a many invocation, without the interpreter own startup imports
+
+    Parameters
+    ----------
+    args: list[str]
+        The arguments of many
+
+    cwd: str
+        The working directory
+
+    repeat: int
+        Number of runs
+
+    Returns
+    -------
+    measure: tuple[float, set[str]]
+        The median milliseconds and the modules that were imported
+    """
+    _, base = importtime(["-c", "pass"], cwd)
+    samples = []
+    modules: set[str] = set()
+    for _ in range(repeat):
+        times, loaded = importtime(["-m", PACKAGE, *args], cwd)
+        modules |= loaded - base
+        samples.append(sum(value for name, value in times.items() if name not in base) / 1000)
+    return median(samples), modules
+
+def main() -> int:
+    parser = ArgumentParser(description="Check the startup time budget of many")
+    parser.add_argument("--repeat", type=int, default=7)
+    parser.add_argument("--scale", type=float, default=1.0, help="Multiply the budgets, for slow machines")
+    args = parser.parse_args()
+
+    failed = False
+    with TemporaryDirectory(prefix="many-startup-") as tmp:
+        for i in range(20):
+            (Path(tmp) / f"file{i}.txt").touch()
+        print(f"{'arguments':<20} {'ms':>8} {'budget':>8}")
+        for argv, budget, forbidden in SCENARIOS:
+            elapsed, modules = measure(argv, tmp, args.repeat)
+            loaded = [i for i in forbidden if i in modules]
+            over   = elapsed > budget * args.scale
+            failed = failed or over or len(loaded) > 0
+            status = "FAIL" if over or loaded else "ok"
+            print(f"{' '.join(argv) or '(none)':<20} {elapsed:>8.2f} {budget * args.scale:>8.2f} {status}", *loaded)
+    return 1 if failed else 0
+
+if __name__ == '__main__':
+    exit(main())
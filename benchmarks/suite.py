@@ -0,0 +1,211 @@
+#!/usr/bin/python3
+"""
+Benchmark suite of the count, size, separated and follow paths of many
+---------------------------------------------------------------------------------
+Run it from the directory containing the package: python -m many.benchmarks.suite
+Every scenario is timed calling __main__.main on a synthetic tree, then run once
+in a child process for the peak RSS and, if strace is installed, the syscalls.
+Save a run with --output and compare a later one with --compare
+---------------------------------------------------------------------------------
+"""
+
+from argparse import ArgumentParser
+from contextlib import redirect_stdout, redirect_stderr
+from json import dump, load
+from os import environ, devnull, wait4, waitstatus_to_exitcode
+from pathlib import Path
+from platform import platform, python_version
+from shutil import which
+from subprocess import Popen, run, DEVNULL
+from sys import executable
+from tempfile import TemporaryDirectory
+from time import perf_counter
+from typing import Optional
+from ..__main__ import main as many
+from .tree import TreeSpec, generate, restore
+
+PACKAGE = __package__.rsplit(".", 1)[0]
+ROOT    = str(Path(__file__).resolve().parents[2])
+
+# ? (name, arguments of many), ROOT is replaced by the tree
+SCENARIOS = [
+    ("count",    ["-rn", "ROOT"]),
+    ("filter",   ["-rn", "ROOT", "*.txt"]),
+    ("size",     ["-rny", "ROOT"]),
+    ("separate", ["-rs", "ROOT", "*.txt", "file1*"]),
+    ("follow",   ["-rnf", "ROOT"]),
+]
+
+def timeit(args: list[str], repeat: int) -> float:
+    """
+    Best wall time of __main__.main, with its output discarded
+
+    Parameters
+    ----------
+    args: list[str]
+        The arguments of many
+
+    repeat: int
+        Number of runs, the best one is kept
+
+    Returns
+    -------
+    timeit: float
+        The time in seconds
+    """
+    best = float("inf")
+    with open(devnull, "w") as null, redirect_stdout(null), redirect_stderr(null):
+        for _ in range(repeat):
+            start = perf_counter()
+            many(["many", *args])
+            best = min(best, perf_counter() - start)
+    return best
+
+def peak_rss(args: list[str]) -> int:
+    """
+    Peak resident set size of a many process
+
+    Parameters
+    ----------
+    args: list[str]
+        The arguments of many
+
+    Returns
+    -------
+    peak_rss: int
+        The maximum resident set size in KB
+    """
+    proc = Popen([executable, "-m", PACKAGE, *args], env=dict(environ, PYTHONPATH=ROOT), stdout=DEVNULL, stderr=DEVNULL)
+    _, status, usage = wait4(proc.pid, 0)
+    proc.returncode  = waitstatus_to_exitcode(status)
+    return usage.ru_maxrss
+
+def syscalls(args: list[str], tmp: str) -> Optional[int]:
+    """
+    Number of system calls of a many process counted by strace -c,
+    None when strace is not installed or cannot trace
+
+    Parameters
+    ----------
+    args: list[str]
+        The arguments of many
+
+    tmp: str
+        A directory for the strace summary
+
+    Returns
+    -------
+    syscalls: Optional[int]
+        The total number of system calls
+    """
+    if which("strace") is None:
+        return None
+    summary = Path(tmp) / "strace.txt"
+    proc = run(
+        ["strace", "-c", "-f", "-o", str(summary), executable, "-m", PACKAGE, *args],
+        env=dict(environ, PYTHONPATH=ROOT), stdout=DEVNULL, stderr=DEVNULL
+    )
+    if proc.returncode != 0 or not summary.exists():
+        return None
+    for line in summary.read_text().splitlines():
+        if line.rstrip().endswith(" total"):
+            return int(line.split()[3])
+    return None
+
+def compare(results: list[dict], path: str) -> None:
+    """
+    Print the speedup of every scenario over a previous run
+
+    Parameters
+    ----------
+    results: list[dict]
+        The results of this run
+
+    path: str
+        The JSON file of the previous run
+
+    Returns
+    -------
+    None
+    """
+    with open(path) as file:
+        previous = {i["name"]: i for i in load(file)["results"]}
+    print(f"\n{'compared to ' + path:<30}")
+    for result in results:
+        old = previous.get(result["name"])
+        if old is None or result["seconds"] is None or old["seconds"] is None:
+            continue
+        print(f"{result['name']:<10} {old['seconds'] / result['seconds']:>7.2f}x time {result['peak_rss_kb'] - old['peak_rss_kb']:>+8} KB rss")
+
+def main() -> int:
+    parser = ArgumentParser(description="Benchmark many on a synthetic tree")
+    parser.add_argument("--width", type=int, default=6)
+    parser.add_argument("--depth", type=int, default=4)
+    parser.add_argument("--files", type=int, default=20)
+    parser.add_argument("--max-size", type=int, default=1 << 20, dest="max_size")
+    parser.add_argument("--symlinks", type=int, default=2)
+    parser.add_argument("--loops", type=int, default=0, help="Symbolic links to the parent directory, follow detects and skips them")
+    parser.add_argument("--fifos", type=int, default=1)
+    parser.add_argument("--sockets", type=int, default=1)
+    parser.add_argument("--unreadable", type=int, default=1)
+    parser.add_argument("--flat", type=int, default=20000, help="Files of the huge flat directory")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--only", nargs="+", choices=[i[0] for i in SCENARIOS], help="Run only these scenarios")
+    parser.add_argument("--output", help="Write the results to this JSON file")
+    parser.add_argument("--compare", help="JSON file of a previous run to compare with")
+    args = parser.parse_args()
+
+    spec = TreeSpec(
+        args.width, args.depth, args.files, args.max_size, args.symlinks, args.loops,
+        args.fifos, args.sockets, args.unreadable, args.flat, args.seed
+    )
+    results = []
+    with TemporaryDirectory(prefix="many-bench-") as tmp, TemporaryDirectory(prefix="many-empty-") as empty:
+        root = str(Path(tmp) / "tree")
+        Path(root).mkdir()
+        try:
+            stats = generate(root, spec)
+            print(f"synthetic tree: {stats.dirs} directories, {stats.entries} entries, {stats.size} bytes")
+            print(f"{'scenario':<10} {'seconds':>9} {'entries/s':>11} {'syscalls/entry':>15} {'peak KB':>9}")
+            for name, argv in SCENARIOS:
+                if args.only and name not in args.only:
+                    continue
+                full    = [root if i == "ROOT" else i for i in argv]
+                elapsed = timeit(full, args.repeat)
+                calls   = syscalls(full, tmp)
+                # ? The calls of the interpreter startup are the ones of the same search on an empty directory
+                base    = syscalls([empty if i == "ROOT" else i for i in argv], tmp)
+                per     = None if calls is None or base is None else (calls - base) / stats.entries
+                result  = {
+                    "name":               name,
+                    "args":               argv,
+                    "seconds":            elapsed,
+                    "entries_per_sec":    stats.entries / elapsed,
+                    "syscalls":           calls,
+                    "syscalls_per_entry": per,
+                    "peak_rss_kb":        peak_rss(full),
+                }
+                results.append(result)
+                print(
+                    f"{name:<10} {elapsed:>9.4f} {result['entries_per_sec']:>11.0f}",
+                    f"{'-' if per is None else format(per, '.2f'):>15} {result['peak_rss_kb']:>9}"
+                )
+        finally:
+            restore(root, spec)
+
+    if args.output is not None:
+        with open(args.output, "w") as file:
+            dump({
+                "python":   python_version(),
+                "platform": platform(),
+                "spec":     spec.asdict(),
+                "tree":     stats.asdict(),
+                "results":  results,
+            }, file, indent=4)
+    if args.compare is not None:
+        compare(results, args.compare)
+    return 0
+
+if __name__ == '__main__':
+    exit(main())
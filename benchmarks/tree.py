@@ -0,0 +1,224 @@
+#!/usr/bin/python3
+"""
+Reproducible synthetic filesystem trees for the benchmarks
+---------------------------------------------------------------------------------
+The same TreeSpec always creates the same names, sizes and special files,
+so the results of two runs on the same machine can be compared
+---------------------------------------------------------------------------------
+"""
+
+from dataclasses import dataclass, asdict, replace
+from os import chmod, makedirs, mkfifo, mknod, symlink, truncate
+from os.path import join
+from random import Random
+from stat import S_IFSOCK
+
+@dataclass(frozen=True)
+class TreeSpec():
+    """
+    Shape of a synthetic tree
+
+    Parameters
+    ----------
+    width: int = 6
+        Number of subdirectories of every directory
+
+    depth: int = 4
+        Number of directory levels under the root
+
+    files: int = 20
+        Number of regular files in every directory
+
+    max_size: int = 0
+        Maximum size in bytes of the files, they are sparse so big sizes are cheap
+
+    symlinks: int = 0
+        Number of symbolic links to sibling files in every directory
+
+    loops: int = 0
+        Number of symbolic links to the parent directory in every directory,
+        they make cycles when following symbolic links
+
+    fifos: int = 0
+        Number of fifo files in every directory
+
+    sockets: int = 0
+        Number of socket files in every directory
+
+    unreadable: int = 0
+        Number of empty directories without permissions in every directory,
+        they cannot be listed unless running as root
+
+    flat: int = 0
+        Number of files in one huge flat directory under the root
+
+    seed: int = 0
+        Seed of the file sizes
+    """
+    width:      int = 6
+    depth:      int = 4
+    files:      int = 20
+    max_size:   int = 0
+    symlinks:   int = 0
+    loops:      int = 0
+    fifos:      int = 0
+    sockets:    int = 0
+    unreadable: int = 0
+    flat:       int = 0
+    seed:       int = 0
+
+    def asdict(self) -> dict[str, int]:
+        return asdict(self)
+
+@dataclass
+class TreeStats():
+    """
+    Number of entries created by generate, by file type
+
+    Parameters
+    ----------
+    dirs: int = 0
+        Directories, including the root and the unreadable ones
+
+    files: int = 0
+        Regular files
+
+    size: int = 0
+        Sum of the sizes of the regular files in bytes
+
+    symlinks: int = 0
+        Symbolic links, including the loops
+
+    fifos: int = 0
+        Fifo files
+
+    sockets: int = 0
+        Socket files
+    """
+    dirs:     int = 0
+    files:    int = 0
+    size:     int = 0
+    symlinks: int = 0
+    fifos:    int = 0
+    sockets:  int = 0
+
+    @property
+    def entries(self) -> int:
+        """
+        Number of directory entries, every one of them is returned by a directory listing
+        """
+        return self.dirs - 1 + self.files + self.symlinks + self.fifos + self.sockets
+
+    def asdict(self) -> dict[str, int]:
+        return dict(asdict(self), entries=self.entries)
+
+def populate(root: str, spec: TreeSpec, depth: int, random: Random, stats: TreeStats) -> None:
+    """
+    Create the entries of a directory and its subdirectories
+
+    Parameters
+    ----------
+    root: str
+        The directory to populate, it must exist
+
+    spec: TreeSpec
+        The shape of the tree
+
+    depth: int
+        Number of directory levels left
+
+    random: Random
+        The generator of file sizes
+
+    stats: TreeStats
+        The counters updated with the created entries
+
+    Returns
+    -------
+    None
+    """
+    stats.dirs += 1
+    for i in range(spec.files):
+        size = random.randint(0, spec.max_size)
+        with open(join(root, f"file{i}.txt"), "wb"):
+            pass
+        if size > 0:
+            truncate(join(root, f"file{i}.txt"), size)
+        stats.files += 1
+        stats.size  += size
+    for i in range(spec.symlinks):
+        symlink(f"file{i % spec.files}.txt" if spec.files > 0 else "missing", join(root, f"link{i}.txt"))
+        stats.symlinks += 1
+    for i in range(spec.loops):
+        symlink("..", join(root, f"loop{i}"))
+        stats.symlinks += 1
+    for i in range(spec.fifos):
+        mkfifo(join(root, f"fifo{i}"))
+        stats.fifos += 1
+    for i in range(spec.sockets):
+        mknod(join(root, f"socket{i}"), S_IFSOCK | 0o600)
+        stats.sockets += 1
+    for i in range(spec.unreadable):
+        makedirs(join(root, f"unreadable{i}"))
+        chmod(join(root, f"unreadable{i}"), 0)
+        stats.dirs += 1
+    if depth > 0:
+        for i in range(spec.width):
+            sub = join(root, f"dir{i}")
+            makedirs(sub)
+            populate(sub, spec, depth - 1, random, stats)
+
+def generate(root: str, spec: TreeSpec) -> TreeStats:
+    """
+    Create a synthetic tree, the unreadable directories must be made readable again
+    with restore before removing the tree
+
+    Parameters
+    ----------
+    root: str
+        The directory where the tree is created, usually an empty temporary directory
+
+    spec: TreeSpec
+        The shape of the tree
+
+    Returns
+    -------
+    generate: TreeStats
+        The number of created entries
+    """
+    stats  = TreeStats()
+    random = Random(spec.seed)
+    populate(root, spec, spec.depth, random, stats)
+    if spec.flat > 0:
+        flat = join(root, "flat")
+        makedirs(flat)
+        stats.dirs += 1
+        for i in range(spec.flat):
+            with open(join(flat, f"file{i}.txt"), "wb"):
+                pass
+        stats.files += spec.flat
+    return stats
+
+def restore(root: str, spec: TreeSpec) -> None:
+    """
+    Give back the permissions of the unreadable directories of a tree, so it can be removed
+
+    Parameters
+    ----------
+    root: str
+        The directory where the tree was created
+
+    spec: TreeSpec
+        The shape the tree was created with
+
+    Returns
+    -------
+    None
+    """
+    for i in range(spec.unreadable):
+        chmod(join(root, f"unreadable{i}"), 0o755)
+    if spec.depth > 0:
+        for i in range(spec.width):
+            restore(join(root, f"dir{i}"), replace(spec, depth=spec.depth - 1))
+
+__all__ = ["TreeSpec", "TreeStats", "generate", "restore"]
@@ -0,0 +1,337 @@
+#!/usr/bin/python3
+from dataclasses import dataclass, field
+from os import environ, makedirs, scandir, stat, stat_result, DirEntry
+from os.path import dirname, expanduser, getsize, join
+from stat import S_ISREG
+from json import dumps, loads
+from threading import Lock
+from time import perf_counter, time, time_ns
+from typing import Callable, Optional
+import sqlite3
+from .walker import StrPath, Walker
+
+# ? Directories modified this close to the scan start are not stored,
+# ? a later change in the same mtime tick would go unnoticed
+RACY_NS = 2 * 10**9
+
+def default_path() -> str:
+    """
+    Get the default cache file, under $XDG_CACHE_HOME/many
+
+    Parameters
+    ----------
+    None
+
+    Returns
+    -------
+    default_path: str
+        The path of the SQLite cache file
+    """
+    return join(environ.get("XDG_CACHE_HOME") or expanduser("~/.cache"), "many", "scan.sqlite")
+
+@dataclass
+class ScanCache():
+    """
+    Persistent per directory scan results, stored in SQLite.
+    Rows are keyed by the directory identity (st_dev, st_ino) and a signature of the
+    filters, file types, follow flag and size mode, and are only valid for the same st_mtime_ns.
+    A row keeps the totals of the directory own entries and the names of the subdirectories to descend into.
+    With --archives an archive has a row too, keyed by the identity of the archive file, with the totals of all its members.
+
+    Parameters
+    ----------
+    path: str
+        The SQLite file, default $XDG_CACHE_HOME/many/scan.sqlite
+
+    rebuild: bool = False
+        Ignore the stored rows and store fresh ones
+
+    max_age: float = 30
+        Rows not used for this number of days are evicted
+
+    max_size: float = 256
+        Maximum size of the cache file in MB, least recently used rows are evicted over it
+    """
+    path:     str   = field(default_factory=default_path)
+    rebuild:  bool  = False
+    max_age:  float = 30
+    max_size: float = 256
+    _started: int   = field(default_factory=time_ns, init=False)
+    _lock:    Lock  = field(default_factory=Lock, init=False)
+    _conn:    sqlite3.Connection = field(init=False)
+
+    def __post_init__(self) -> None:
+        makedirs(dirname(self.path), exist_ok=True)
+        self._conn = sqlite3.connect(self.path, timeout=60, check_same_thread=False)
+        self._conn.execute("""CREATE TABLE IF NOT EXISTS dirs (
+            dev     INTEGER NOT NULL,
+            ino     INTEGER NOT NULL,
+            sig     TEXT    NOT NULL,
+            mtime   INTEGER NOT NULL,
+            totals  TEXT    NOT NULL,
+            subdirs TEXT    NOT NULL,
+            used    REAL    NOT NULL,
+            PRIMARY KEY (dev, ino, sig)
+        )""")
+
+    @staticmethod
+    def signature(filters: list[str], ftype: int, follow: bool, size: bool, blocks: bool=False, archives: bool=False) -> str:
+        """
+        Build the signature of the search a row belongs to
+
+        Parameters
+        ----------
+        filters: list[str]
+            The glob filters of the root
+
+        ftype: int
+            The file type flags
+
+        follow: bool
+            Whether symlinks are followed
+
+        size: bool
+            Whether the totals are sizes instead of file counts
+
+        blocks: bool = False
+            Whether the sizes are the allocated ones, with --disk-usage
+
+        archives: bool = False
+            Whether the archives are entered, with --archives, the subdirectories of a row have them
+
+        Returns
+        -------
+        signature: str
+            The signature string
+        """
+        # ? Apparent sizes keep the signature of the rows stored before --disk-usage existed
+        return dumps([sorted(filters), int(ftype), follow, size] + (["blocks"] if blocks else []) + (["archives"] if archives else []))
+
+    def get(self, st: stat_result, sig: str) -> Optional[tuple[dict[str, int], list[str]]]:
+        """
+        Get the stored results of a directory if its mtime has not changed
+
+        Parameters
+        ----------
+        st: stat_result
+            The stat of the directory
+
+        sig: str
+            The search signature
+
+        Returns
+        -------
+        get: Optional[tuple[dict[str, int], list[str]]]
+            The totals of every filter and the subdirectory names, None if there is no valid row
+        """
+        if self.rebuild:
+            return None
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT mtime, totals, subdirs FROM dirs WHERE dev = ? AND ino = ? AND sig = ?",
+                (st.st_dev, st.st_ino, sig)
+            ).fetchone()
+            if row is None or row[0] != st.st_mtime_ns:
+                return None
+            self._conn.execute("UPDATE dirs SET used = ? WHERE dev = ? AND ino = ? AND sig = ?", (time(), st.st_dev, st.st_ino, sig))
+        return loads(row[1]), loads(row[2])
+
+    def put(self, st: stat_result, sig: str, totals: dict[str, int], subdirs: list[str]) -> None:
+        """
+        Store the results of a directory
+
+        Parameters
+        ----------
+        st: stat_result
+            The stat of the directory, taken before listing it
+
+        sig: str
+            The search signature
+
+        totals: dict[str, int]
+            The totals of every filter over the directory own entries
+
+        subdirs: list[str]
+            The names of the subdirectories to descend into
+
+        Returns
+        -------
+        None
+        """
+        if st.st_mtime_ns >= self._started - RACY_NS:
+            return
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO dirs VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (st.st_dev, st.st_ino, sig, st.st_mtime_ns, dumps(totals), dumps(subdirs), time())
+            )
+
+    def evict(self) -> None:
+        """
+        Delete the rows older than max_age and the least recently used rows over max_size
+
+        Parameters
+        ----------
+        None
+
+        Returns
+        -------
+        None
+        """
+        with self._lock:
+            self._conn.execute("DELETE FROM dirs WHERE used < ?", (time() - self.max_age * 86400,))
+            self._conn.commit()
+            size = getsize(self.path)
+            if size <= self.max_size * 2**20:
+                return
+            rows = self._conn.execute("SELECT COUNT(*) FROM dirs").fetchone()[0]
+            keep = int(rows * self.max_size * 2**20 / size * 0.9)
+            self._conn.execute(
+                "DELETE FROM dirs WHERE rowid IN (SELECT rowid FROM dirs ORDER BY used LIMIT ?)",
+                (rows - keep,)
+            )
+            self._conn.commit()
+            self._conn.execute("VACUUM")
+
+    def close(self) -> None:
+        """
+        Commit the stored rows, evict old ones and close the cache
+
+        Parameters
+        ----------
+        None
+
+        Returns
+        -------
+        None
+        """
+        with self._lock:
+            self._conn.commit()
+        self.evict()
+        self._conn.close()
+
+@dataclass
+class CachedWalker(Walker):
+    """
+    Walker skipping the listing of directories whose mtime has not changed since they were cached.
+    The subdirectories stored with the directory are still visited, so changes deeper in the tree are found.
+
+    Parameters
+    ----------
+    cache: Optional[ScanCache] = None
+        The scan cache
+
+    sig: str = ""
+        The search signature
+
+    reuse: Optional[Callable[[int, dict[str, int]], None]] = None
+        Called with the worker index and the stored totals of a directory that was not listed
+    """
+    cache: Optional[ScanCache] = None
+    sig:   str = ""
+    reuse: Optional[Callable[[int, dict[str, int]], None]] = None
+
+    def expand(self, wid: int, path: StrPath, visit: Callable[[int, str, list[DirEntry]], object]) -> list[StrPath]:
+        """
+        Process a single directory from the cache if possible, or list it and store its results.
+        visit must return the totals of the directory by filter to be stored.
+        An archive is processed the same way, all its virtual directories at once.
+
+        Parameters
+        ----------
+        wid: int
+            The index of the worker processing the directory
+
+        path: StrPath
+            The directory to process
+
+        visit: Callable[[int, str, list[DirEntry]], object]
+            Called with the worker index, the directory path and its entries
+
+        Returns
+        -------
+        expand: list[StrPath]
+            The subdirectories to visit next, empty if not recursive
+        """
+        assert self.cache is not None and self.reuse is not None
+        if self.throttle is not None:
+            self.throttle.take(1)
+        try:
+            st = stat(path)
+        except OSError:
+            return super().expand(wid, path, visit)
+
+        if self.archives is not None and S_ISREG(st.st_mode):
+            from .archives import is_archive
+            if is_archive(str(path)):
+                return self.unarchive(wid, str(path), st, visit)
+
+        hit = self.cache.get(st, self.sig)
+        if hit is not None:
+            totals, names = hit
+            self.reuse(wid, totals)
+            return [i for i in (join(path, name) for name in names) if self.keep(i)] if self.recursive else []
+
+        if self.throttle is not None:
+            self.throttle.take(1, 1)
+        start = perf_counter() if self.stats is not None or self.throttle is not None else 0.0
+        try:
+            with scandir(path) as it:
+                entries = list(it)
+        except OSError:
+            return super().expand(wid, path, visit)
+        if self.stats is not None:
+            self.stats.listed(entries, perf_counter() - start)
+        if self.throttle is not None:
+            self.throttle.listed(len(entries), perf_counter() - start)
+        totals  = visit(wid, str(path), entries)
+        # ? The rows keep every subdirectory, the pruning depends on the root and is applied on every use
+        subdirs = self.subdirs(entries, prune=False)
+        if isinstance(totals, dict):
+            self.cache.put(st, self.sig, totals, [i.name for i in subdirs])
+        return [i.path for i in subdirs if self.keep(i.path, i)] if self.recursive else []
+
+    def unarchive(self, wid: int, path: str, st: stat_result, visit: Callable[[int, str, list[DirEntry]], object]) -> list[StrPath]:
+        """
+        Process an archive from the cache if it has not changed, or enter it and store the sum of the totals of its virtual directories.
+        Under pruning rules the totals of an archive depend on the root, they are not stored
+
+        Parameters
+        ----------
+        wid: int
+            The index of the worker processing the archive
+
+        path: str
+            The archive
+
+        st: stat_result
+            Its stat
+
+        visit: Callable[[int, str, list[DirEntry]], object]
+            Called with the worker index, every virtual directory path and its members
+
+        Returns
+        -------
+        unarchive: list[StrPath]
+            Always empty, the archive has no subdirectory to list
+        """
+        assert self.cache is not None and self.reuse is not None
+        stored = self.pruner is None
+        hit    = self.cache.get(st, self.sig) if stored else None
+        if hit is not None:
+            self.reuse(wid, hit[0])
+            if self.stats is not None:
+                self.stats.archives += 1
+            return []
+        results = self.unpack(wid, path, visit, st)
+        totals: dict[str, int] = {}
+        for aux in results or []:
+            if isinstance(aux, dict):
+                for key, value in aux.items():
+                    totals[key] = totals.get(key, 0) + value
+        # ? An archive that could not be read has no virtual directory, it is tried again next time
+        if stored and results:
+            self.cache.put(st, self.sig, totals, [])
+        return []
+
+__all__ = ["ScanCache", "CachedWalker", "default_path"]
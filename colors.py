@@ -0,0 +1,39 @@
+#!/usr/bin/python3
+from os import name as osname
+
+class Fore():
+    """
+    Foreground colors, the same ANSI codes as colorama.Fore.
+    They are plain strings, so colored output does not need to import colorama,
+    and they are blanked by init when the output is not colored.
+    """
+    RED             = "\x1b[31m"
+    LIGHTBLUE_EX    = "\x1b[94m"
+    LIGHTCYAN_EX    = "\x1b[96m"
+    LIGHTGREEN_EX   = "\x1b[92m"
+    LIGHTMAGENTA_EX = "\x1b[95m"
+    LIGHTYELLOW_EX  = "\x1b[93m"
+    RESET           = "\x1b[39m"
+
+def init(enabled: bool=True) -> None:
+    """
+    Enable or disable colored output.
+    colorama is only imported on Windows with colors enabled, to translate the ANSI codes for the console
+
+    Parameters
+    ----------
+    enabled: bool = True
+        Whether to color the output, usually only when stdout is a terminal
+
+    Returns
+    -------
+    None
+    """
+    if not enabled:
+        for color in [i for i in vars(Fore) if i.isupper()]:
+            setattr(Fore, color, "")
+    elif osname == "nt":
+        from colorama import just_fix_windows_console
+        just_fix_windows_console()
+
+__all__ = ["Fore", "init"]
@@ -0,0 +1,833 @@
+#!/usr/bin/python3
+from dataclasses import dataclass, field
+from ctypes import CDLL, get_errno
+from ctypes.util import find_library
+from errno import EADDRINUSE, EEXIST, ENOSPC
+from json import dumps, loads
+from os import environ, getuid, lstat, pipe2, read, close, scandir, stat, strerror, sysconf, unlink, DirEntry, O_CLOEXEC, O_NONBLOCK
+from os.path import join
+from selectors import BaseSelector, DefaultSelector, EVENT_READ, EVENT_WRITE
+from signal import set_wakeup_fd, signal, SIGINT, SIGTERM
+from socket import socket, AF_UNIX, SOCK_STREAM
+from stat import S_ISSOCK
+from struct import calcsize, unpack_from
+from time import monotonic, perf_counter
+from typing import Any, Iterator, Optional
+from .mainclass import ArgvContainer, NoDir
+from .planner import Matcher, QueryPlan
+from .walker import isdir
+
+IN_MODIFY      = 0x00000002
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM  = 0x00000040
+IN_MOVED_TO    = 0x00000080
+IN_CREATE      = 0x00000100
+IN_DELETE      = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_MOVE_SELF   = 0x00000800
+IN_Q_OVERFLOW  = 0x00004000
+IN_IGNORED     = 0x00008000
+IN_ONLYDIR     = 0x01000000
+IN_NONBLOCK    = 0o4000
+IN_CLOEXEC     = 0o2000000
+EVENT          = "iIII"
+EVENT_SIZE     = calcsize(EVENT)
+
+# ? Changes are applied once the events stop for DEBOUNCE seconds, or at most every MAX_DELAY seconds
+DEBOUNCE  = 0.05
+MAX_DELAY = 0.5
+
+# ? A client has CLIENT_TIMEOUT seconds in total to send its query and read the answer, the query is at most MAX_QUERY bytes
+CLIENT_TIMEOUT = 5
+MAX_QUERY      = 65536
+
+def default_socket() -> str:
+    """
+    Get the default Unix socket of the daemon, under $XDG_RUNTIME_DIR or /tmp
+
+    Parameters
+    ----------
+    None
+
+    Returns
+    -------
+    default_socket: str
+        The socket path
+    """
+    runtime = environ.get("XDG_RUNTIME_DIR")
+    return join(runtime, "many.sock") if runtime else f"/tmp/many-{getuid()}.sock"
+
+def query(path: str, cmd: str="totals") -> dict[str, Any]:
+    """
+    Thin client, send a query to a running daemon
+
+    Parameters
+    ----------
+    path: str
+        The Unix socket of the daemon
+
+    cmd: str = "totals"
+        The query, "totals" or "stats"
+
+    Returns
+    -------
+    query: dict[str, Any]
+        The decoded response
+    """
+    with socket(AF_UNIX, SOCK_STREAM) as sock:
+        sock.connect(path)
+        sock.sendall(dumps({"cmd": cmd}).encode() + b"\n")
+        data = b""
+        while not data.endswith(b"\n"):
+            chunk = sock.recv(65536)
+            if not chunk:
+                break
+            data += chunk
+    return loads(data)
+
+@dataclass
+class Inotify():
+    """
+    Minimal inotify binding over ctypes, Linux only
+
+    Parameters
+    ----------
+    fd: int
+        The inotify file descriptor
+    """
+    fd: int
+
+    _libc = None
+
+    @classmethod
+    def libc(cls) -> CDLL:
+        if cls._libc is None:
+            cls._libc = CDLL(find_library("c") or "libc.so.6", use_errno=True)
+        return cls._libc
+
+    @classmethod
+    def open(cls) -> 'Inotify':
+        """
+        Create a non blocking inotify instance
+
+        Parameters
+        ----------
+        None
+
+        Returns
+        -------
+        open: Inotify
+            The inotify instance
+        """
+        fd = cls.libc().inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if fd < 0:
+            errno = get_errno()
+            raise OSError(errno, strerror(errno))
+        return cls(fd)
+
+    def add(self, path: str, mask: int) -> int:
+        """
+        Watch a directory
+
+        Parameters
+        ----------
+        path: str
+            The directory to watch
+
+        mask: int
+            The events to watch
+
+        Returns
+        -------
+        add: int
+            The watch descriptor, the same for the same inode
+        """
+        wd = self.libc().inotify_add_watch(self.fd, path.encode(), mask | IN_ONLYDIR)
+        if wd < 0:
+            errno = get_errno()
+            raise OSError(errno, strerror(errno), path)
+        return wd
+
+    def remove(self, wd: int) -> None:
+        """
+        Stop watching a directory, errors are ignored
+
+        Parameters
+        ----------
+        wd: int
+            The watch descriptor
+
+        Returns
+        -------
+        None
+        """
+        self.libc().inotify_rm_watch(self.fd, wd)
+
+    def read(self) -> Iterator[tuple[int, int, str]]:
+        """
+        Read the pending events
+
+        Parameters
+        ----------
+        None
+
+        Returns
+        -------
+        read: Iterator[tuple[int, int, str]]
+            The watch descriptor, mask and name of every event
+        """
+        try:
+            data = read(self.fd, 1 << 16)
+        except BlockingIOError:
+            return
+        offset = 0
+        while offset < len(data):
+            wd, mask, _, length = unpack_from(EVENT, data, offset)
+            name = data[offset + EVENT_SIZE:offset + EVENT_SIZE + length].rstrip(b"\0")
+            offset += EVENT_SIZE + length
+            yield wd, mask, name.decode(errors="surrogateescape")
+
+    def close(self) -> None:
+        close(self.fd)
+
+@dataclass
+class DirState():
+    """
+    Live state of a directory
+
+    Parameters
+    ----------
+    totals: list[int]
+        The totals of the directory own entries for every NoDir entry of its root
+
+    subdirs: set[str]
+        The subdirectories being tracked
+
+    mtime: int
+        The directory st_mtime_ns when it was listed
+    """
+    totals:  list[int]
+    subdirs: set[str]
+    mtime:   int
+
+@dataclass
+class Client():
+    """
+    A connection to the daemon, served by its event loop without blocking it
+
+    Parameters
+    ----------
+    conn: socket
+        The non blocking connection
+
+    start: float
+        The perf_counter value when it was accepted
+
+    deadline: float
+        The monotonic time it is dropped at if it is not answered yet
+
+    inbox: bytes = b""
+        The query received so far
+
+    outbox: bytes = b""
+        The answer not sent yet
+    """
+    conn:     socket
+    start:    float
+    deadline: float
+    inbox:    bytes = b""
+    outbox:   bytes = b""
+
+@dataclass
+class Daemon():
+    """
+    Long running search, the totals are computed once and kept up to date from inotify events.
+    Every event marks its directory as dirty, dirty directories are listed again and their
+    contribution to the totals is replaced. When the event queue overflows the directories whose
+    mtime changed are listed again (all of them in size mode), and the directories that could not be
+    watched are listed again every interval seconds.
+
+    Parameters
+    ----------
+    argvcont: ArgvContainer
+        The search to serve
+
+    path: str
+        The Unix socket to listen on
+
+    interval: float = 60
+        Seconds between rescans of the directories that could not be watched
+    """
+    argvcont: ArgvContainer
+    path:     str
+    interval: float = 60
+    plan:     QueryPlan = field(init=False)
+    totals:   dict[NoDir, int] = field(init=False)
+    covered:  frozenset[NoDir] = field(init=False)
+    _groups:  list[tuple[list[NoDir], Matcher]] = field(default_factory=list, init=False)
+    _dirs:    dict[tuple[int, str], DirState] = field(default_factory=dict, init=False)
+    _owners:  dict[str, set[int]] = field(default_factory=dict, init=False)
+    _wd_of:   dict[str, int] = field(default_factory=dict, init=False)
+    _path_of: dict[int, str] = field(default_factory=dict, init=False)
+    _unwatched: set[str] = field(default_factory=set, init=False)
+    _inotify: Optional[Inotify] = field(default=None, init=False)
+    _stats:   dict[str, float] = field(default_factory=dict, init=False)
+    # ? A dict and not an InodeSet, the identities are released when their directories go away
+    _inodes:  dict[tuple[int, int, int], str] = field(default_factory=dict, init=False)
+    _identity: dict[tuple[int, str], tuple[int, int, int]] = field(default_factory=dict, init=False)
+
+    def __post_init__(self) -> None:
+        self.plan   = QueryPlan(self.argvcont)
+        self.totals = dict.fromkeys(self.argvcont, 0)
+        self.covered = self.plan.covered(self.argvcont)
+        for nodires in self.plan.groups().values():
+            self._groups.append((nodires, self.plan.matcher(nodires)))
+        self._stats = dict.fromkeys((
+            "events", "overflows", "rescans", "watch_exhausted",
+            "updates", "update_seconds", "update_max_seconds",
+            "queries", "query_seconds", "query_max_seconds", "crawl_seconds"
+        ), 0)
+
+    @property
+    def mask(self) -> int:
+        mask = IN_CREATE | IN_DELETE | IN_MOVED_FROM | IN_MOVED_TO | IN_DELETE_SELF | IN_MOVE_SELF
+        if self.argvcont.size is not None:
+            mask |= IN_MODIFY | IN_CLOSE_WRITE
+        return mask
+
+    def watch(self, path: str) -> None:
+        """
+        Add an inotify watch to a directory, remembering it for rescans if the watches are exhausted
+
+        Parameters
+        ----------
+        path: str
+            The directory to watch
+
+        Returns
+        -------
+        None
+        """
+        if self._inotify is None or path in self._wd_of:
+            return
+        try:
+            wd = self._inotify.add(path, self.mask)
+        except OSError as err:
+            if err.errno == ENOSPC:
+                self._stats["watch_exhausted"] += 1
+                self._unwatched.add(path)
+            return
+        self._unwatched.discard(path)
+        old = self._path_of.get(wd)
+        if old is not None and old != path:
+            self._wd_of.pop(old, None)
+        self._path_of[wd] = path
+        self._wd_of[path] = wd
+
+    def unwatch(self, path: str) -> None:
+        """
+        Remove the inotify watch of a directory that is no longer tracked
+
+        Parameters
+        ----------
+        path: str
+            The directory
+
+        Returns
+        -------
+        None
+        """
+        self._unwatched.discard(path)
+        wd = self._wd_of.pop(path, None)
+        if wd is not None and self._path_of.get(wd) == path:
+            del self._path_of[wd]
+            if self._inotify is not None:
+                self._inotify.remove(wd)
+
+    def update(self, gid: int, path: str) -> list[str]:
+        """
+        List a directory again and replace its contribution to the totals
+
+        Parameters
+        ----------
+        gid: int
+            The root group the directory belongs to
+
+        path: str
+            The directory
+
+        Returns
+        -------
+        update: list[str]
+            The new subdirectories that have to be crawled
+        """
+        nodires, matcher = self._groups[gid]
+        old = self._dirs.get((gid, path))
+        throttle = self.plan.throttle
+        if throttle is not None:
+            throttle.take(2, 1)
+        start = perf_counter()
+        try:
+            mtime = stat(path).st_mtime_ns
+            with scandir(path) as it:
+                entries: list[DirEntry] = list(it)
+        except (FileNotFoundError, NotADirectoryError):
+            if old is not None and path != str(nodires[0].path):
+                self.drop(gid, path)
+                return []
+            mtime, entries = 0, []
+        except OSError as err:
+            # ? Any other error, like EACCES, ELOOP or EIO, leaves the directory empty until it is listed again
+            self.plan.errors += 1
+            if self.argvcont.recr and not self.argvcont.blank:
+                ArgvContainer.print_permission(err)
+            mtime, entries = 0, []
+        if throttle is not None:
+            throttle.listed(len(entries), perf_counter() - start)
+
+        local = dict.fromkeys(nodires, 0)
+        self.plan.accumulate(local, nodires, matcher, entries)
+        pruner  = self.plan.pruner(nodires[0].path)
+        subdirs = {
+            i.path for i in entries if isdir(i, self.argvcont.follow) and (pruner is None or not pruner.prunes(i.path, i))
+        } if self.argvcont.recr or matcher.directed else set()
+        if self.argvcont.follow:
+            known   = old.subdirs if old is not None else set()
+            subdirs = {i for i in subdirs if i in known or self.claim(gid, i)}
+        state = DirState([local[i] for i in nodires], subdirs, mtime)
+        self._dirs[(gid, path)] = state
+        self._owners.setdefault(path, set()).add(gid)
+        self.watch(path)
+
+        previous = old.totals if old is not None else [0] * len(nodires)
+        for nodir, aux, prev in zip(nodires, state.totals, previous):
+            self.totals[nodir] += aux - prev
+        if old is None:
+            return list(subdirs)
+        for sub in old.subdirs - subdirs:
+            self.drop(gid, sub)
+        return list(subdirs - old.subdirs)
+
+    def crawl(self, gid: int, path: str) -> None:
+        """
+        List a directory tree, adding its directories to the live state
+
+        Parameters
+        ----------
+        gid: int
+            The root group the tree belongs to
+
+        path: str
+            The top directory of the tree
+
+        Returns
+        -------
+        None
+        """
+        ddires = [path]
+        while len(ddires) > 0:
+            ddires.extend(self.update(gid, ddires.pop()))
+
+    def claim(self, gid: int, path: str) -> bool:
+        """
+        Take a directory identity for a path while following symbolic links,
+        so a directory reached through several links or a loop is tracked only once
+
+        Parameters
+        ----------
+        gid: int
+            The root group the directory belongs to
+
+        path: str
+            The directory
+
+        Returns
+        -------
+        claim: bool
+            False if the directory is already tracked under another path
+        """
+        try:
+            st = stat(path)
+        except OSError:
+            return True
+        key   = (gid, st.st_dev, st.st_ino)
+        owner = self._inodes.setdefault(key, path)
+        if owner != path:
+            return False
+        self._identity[(gid, path)] = key
+        return True
+
+    def drop(self, gid: int, path: str) -> None:
+        """
+        Remove a directory tree from the live state
+
+        Parameters
+        ----------
+        gid: int
+            The root group the tree belongs to
+
+        path: str
+            The top directory of the tree
+
+        Returns
+        -------
+        None
+        """
+        nodires, _ = self._groups[gid]
+        ddires = [path]
+        while len(ddires) > 0:
+            last  = ddires.pop()
+            state = self._dirs.pop((gid, last), None)
+            if state is None:
+                continue
+            key = self._identity.pop((gid, last), None)
+            if key is not None and self._inodes.get(key) == last:
+                del self._inodes[key]
+            for nodir, aux in zip(nodires, state.totals):
+                self.totals[nodir] -= aux
+            ddires.extend(state.subdirs)
+            owners = self._owners.get(last, set())
+            owners.discard(gid)
+            if len(owners) == 0:
+                self._owners.pop(last, None)
+                self.unwatch(last)
+
+    def refresh(self, paths: set[str]) -> None:
+        """
+        Apply the changes of the dirty directories
+
+        Parameters
+        ----------
+        paths: set[str]
+            The directories that received events
+
+        Returns
+        -------
+        None
+        """
+        for path in paths:
+            for gid in list(self._owners.get(path, ())):
+                if (gid, path) in self._dirs:
+                    for sub in self.update(gid, path):
+                        self.crawl(gid, sub)
+
+    def resync(self, everything: bool=False) -> None:
+        """
+        Targeted rescan after losing events, lists again the directories whose mtime changed
+
+        Parameters
+        ----------
+        everything: bool = False
+            List again every directory, needed in size mode since file writes do not change the directory mtime
+
+        Returns
+        -------
+        None
+        """
+        self._stats["rescans"] += 1
+        dirty = set()
+        for (_, path), state in list(self._dirs.items()):
+            try:
+                if everything or stat(path).st_mtime_ns != state.mtime:
+                    dirty.add(path)
+            except OSError:
+                dirty.add(path)
+        self.refresh(dirty)
+
+    def stats(self) -> dict[str, float]:
+        """
+        Get the daemon statistics, memory, latencies and counters
+
+        Parameters
+        ----------
+        None
+
+        Returns
+        -------
+        stats: dict[str, float]
+            The statistics
+        """
+        with open("/proc/self/statm") as statm:
+            rss = int(statm.read().split()[1]) * sysconf("SC_PAGE_SIZE")
+        stats = dict(self._stats)
+        stats.update(
+            rss_bytes=rss,
+            directories=len(self._dirs),
+            watches=len(self._wd_of),
+            unwatched=len(self._unwatched),
+            errors=self.plan.errors,
+            update_mean_seconds=stats["update_seconds"] / max(stats["updates"], 1),
+            query_mean_seconds=stats["query_seconds"] / max(stats["queries"], 1)
+        )
+        throttle = self.plan.throttle
+        if throttle is not None:
+            stats.update(
+                ops_limit=throttle.max_ops or 0.0,
+                dirs_limit=throttle.max_dirs or 0.0,
+                rate_factor=throttle.factor,
+                wait_seconds=throttle.waited
+            )
+        return stats
+
+    def answer(self, request: dict[str, Any]) -> dict[str, Any]:
+        """
+        Build the response of a query
+
+        Parameters
+        ----------
+        request: dict[str, Any]
+            The decoded query
+
+        Returns
+        -------
+        answer: dict[str, Any]
+            The response
+        """
+        if request.get("cmd") == "stats":
+            return self.stats()
+        argvcont = self.argvcont
+        return {
+            "filters":   [{"path": str(i.path), "filter": i.filter, "total": aux, "covered": i in self.covered} for i, aux in self.totals.items()],
+            "size":      argvcont.size is not None,
+            "ftype":     int(argvcont.ftype),
+            "recursive": argvcont.recr,
+            "follow":    argvcont.follow,
+            "is_cd":     argvcont.is_cd
+        }
+
+    def accept(self, server: socket, selector: BaseSelector) -> None:
+        """
+        Accept a client connection and register it with the event loop
+
+        Parameters
+        ----------
+        server: socket
+            The listening socket
+
+        selector: BaseSelector
+            The selector of the event loop
+
+        Returns
+        -------
+        None
+        """
+        try:
+            conn, _ = server.accept()
+        except OSError:
+            return
+        conn.setblocking(False)
+        selector.register(conn, EVENT_READ, Client(conn, perf_counter(), monotonic() + CLIENT_TIMEOUT))
+
+    def respond(self, client: Client, selector: BaseSelector) -> None:
+        """
+        Read the query of a client or write its answer, as much as the connection takes without blocking.
+        The query ends with a newline or when the client shuts its side down
+
+        Parameters
+        ----------
+        client: Client
+            The connection ready to read or to write
+
+        selector: BaseSelector
+            The selector of the event loop
+
+        Returns
+        -------
+        None
+        """
+        conn = client.conn
+        try:
+            if not client.outbox:
+                chunk = conn.recv(4096)
+                client.inbox += chunk
+                if chunk and not client.inbox.endswith(b"\n"):
+                    if len(client.inbox) > MAX_QUERY:
+                        self.hang_up(client, selector)
+                    return
+                client.outbox = dumps(self.answer(loads(client.inbox or b"{}"))).encode() + b"\n"
+                selector.modify(conn, EVENT_WRITE, client)
+            client.outbox = client.outbox[conn.send(client.outbox):]
+        except (BlockingIOError, InterruptedError):
+            return
+        except (OSError, ValueError):
+            self.hang_up(client, selector)
+            return
+        if client.outbox:
+            return
+        self.hang_up(client, selector)
+        elapsed = perf_counter() - client.start
+        self._stats["queries"] += 1
+        self._stats["query_seconds"] += elapsed
+        self._stats["query_max_seconds"] = max(self._stats["query_max_seconds"], elapsed)
+
+    def hang_up(self, client: Client, selector: BaseSelector) -> None:
+        """
+        Close a client connection and remove it from the event loop
+
+        Parameters
+        ----------
+        client: Client
+            The connection
+
+        selector: BaseSelector
+            The selector of the event loop
+
+        Returns
+        -------
+        None
+        """
+        selector.unregister(client.conn)
+        client.conn.close()
+
+    def reclaim(self) -> None:
+        """
+        Make room for the socket of the daemon, the socket left by a daemon that is gone is removed.
+        Anything else at the path is kept
+
+        Parameters
+        ----------
+        None
+
+        Returns
+        -------
+        None
+
+        Raises
+        ------
+        OSError
+            The path is not a socket or a daemon answers on it
+        """
+        try:
+            st = lstat(self.path)
+        except FileNotFoundError:
+            return
+        if not S_ISSOCK(st.st_mode):
+            raise OSError(EEXIST, "the path exists and is not a socket", self.path)
+        with socket(AF_UNIX, SOCK_STREAM) as probe:
+            try:
+                probe.connect(self.path)
+            except ConnectionRefusedError:
+                unlink(self.path)
+                return
+        raise OSError(EADDRINUSE, "a daemon is already serving on it", self.path)
+
+    def serve(self) -> None:
+        """
+        Crawl the roots and serve the totals until SIGINT or SIGTERM
+
+        Parameters
+        ----------
+        None
+
+        Returns
+        -------
+        None
+
+        Raises
+        ------
+        OSError
+            The socket cannot be created, see reclaim, or inotify is not available
+        """
+        self.reclaim()
+        self._inotify = Inotify.open()
+        start = perf_counter()
+        for gid, (nodires, _) in enumerate(self._groups):
+            if self.argvcont.follow:
+                self.claim(gid, str(nodires[0].path))
+            self.crawl(gid, str(nodires[0].path))
+        self._stats["crawl_seconds"] = perf_counter() - start
+
+        server = socket(AF_UNIX, SOCK_STREAM)
+        try:
+            server.bind(self.path)
+        except OSError:
+            server.close()
+            self._inotify.close()
+            raise
+        server.listen()
+        # ? Only the socket bound here is removed on exit, not one that replaced it
+        bound = lstat(self.path)
+        selector = DefaultSelector()
+        selector.register(server, EVENT_READ, "server")
+        selector.register(self._inotify.fd, EVENT_READ, "inotify")
+
+        # ? The signal handlers only flag the stop, the wakeup pipe interrupts the select
+        running = [True]
+        def stop(*_: object) -> None:
+            running[0] = False
+        wakeup, notify = pipe2(O_NONBLOCK | O_CLOEXEC)
+        set_wakeup_fd(notify)
+        selector.register(wakeup, EVENT_READ, "signal")
+        signal(SIGINT, stop)
+        signal(SIGTERM, stop)
+
+        dirty: set[str] = set()
+        first = last = rescanned = monotonic()
+        try:
+            while running[0]:
+                timeout = DEBOUNCE if dirty else max(self.interval - (monotonic() - rescanned), 0)
+                # ? The clients too slow to send their query or to read the answer are dropped at their deadline
+                clients = [i.data for i in selector.get_map().values() if isinstance(i.data, Client)]
+                for client in clients:
+                    if client.deadline <= monotonic():
+                        self.hang_up(client, selector)
+                    else:
+                        timeout = min(timeout, client.deadline - monotonic())
+                for key, _ in selector.select(max(timeout, 0)):
+                    if isinstance(key.data, Client):
+                        self.respond(key.data, selector)
+                        continue
+                    if key.data == "server":
+                        self.accept(server, selector)
+                        continue
+                    if key.data == "signal":
+                        read(wakeup, 512)
+                        continue
+                    for wd, mask, _ in self._inotify.read():
+                        self._stats["events"] += 1
+                        if mask & IN_Q_OVERFLOW:
+                            self._stats["overflows"] += 1
+                            self.resync(everything=self.argvcont.size is not None)
+                            continue
+                        path = self._path_of.get(wd)
+                        if path is None:
+                            continue
+                        if mask & IN_IGNORED:
+                            self._wd_of.pop(path, None)
+                            del self._path_of[wd]
+                            continue
+                        if not dirty:
+                            first = monotonic()
+                        last = monotonic()
+                        dirty.add(path)
+                now = monotonic()
+                if dirty and (now - last >= DEBOUNCE or now - first >= MAX_DELAY):
+                    start = perf_counter()
+                    self.refresh(dirty)
+                    dirty = set()
+                    elapsed = perf_counter() - start + (now - first)
+                    self._stats["updates"] += 1
+                    self._stats["update_seconds"] += elapsed
+                    self._stats["update_max_seconds"] = max(self._stats["update_max_seconds"], elapsed)
+                if now - rescanned >= self.interval:
+                    rescanned = now
+                    if self._unwatched:
+                        self.refresh(set(self._unwatched))
+        finally:
+            set_wakeup_fd(-1)
+            close(wakeup)
+            close(notify)
+            for key in list(selector.get_map().values()):
+                if isinstance(key.data, Client):
+                    self.hang_up(key.data, selector)
+            selector.close()
+            server.close()
+            self._inotify.close()
+            try:
+                st = lstat(self.path)
+                if (st.st_dev, st.st_ino) == (bound.st_dev, bound.st_ino):
+                    unlink(self.path)
+            except OSError:
+                pass
+
+__all__ = ["Client", "Daemon", "Inotify", "default_socket", "query"]
@@ -0,0 +1,282 @@
+#!/usr/bin/python3
+"""
+Approximate search by random probing of the directory tree (Knuth's estimator)
+---------------------------------------------------------------------------------
+A probe descends from the root to a leaf choosing a random subdirectory at every level.
+The totals of every directory on the path are weighted by the product of the
+branching factors above it, the mean of many probes is an unbiased estimate
+of the totals of the whole tree and their spread gives the confidence interval.
+---------------------------------------------------------------------------------
+"""
+
+from dataclasses import dataclass, field
+from itertools import compress
+from math import sqrt
+from random import Random
+from time import perf_counter
+from typing import Optional
+from .mainclass import NoDir
+from .planner import Matcher, QueryPlan
+from .walker import Walker
+
+# ? z value of the 95% confidence interval
+Z95 = 1.96
+
+# ? Probes in a row that list no new directory, the sampled part of the tree is then saturated
+SATURATION = 1000
+
+# ? Deepest level a probe descends to, it stops symbolic link loops while following them
+MAX_DEPTH = 512
+
+@dataclass(frozen=True)
+class Estimate():
+    """
+    Result of an approximate search
+
+    Parameters
+    ----------
+    totals: dict[NoDir, float]
+        The estimated file count, or size in bytes, of every NoDir entry
+
+    margins: dict[NoDir, float]
+        The half width of the 95% confidence interval of every NoDir entry
+
+    total: float
+        The estimated total of all the NoDir entries
+
+    margin: float
+        The half width of the 95% confidence interval of the total
+
+    probes: int
+        The number of random descents
+
+    dirs: int
+        The number of directories listed
+    """
+    totals:  dict[NoDir, float]
+    margins: dict[NoDir, float]
+    total:   float
+    margin:  float
+    probes:  int
+    dirs:    int
+
+@dataclass
+class Root():
+    """
+    The probing state of a root and its NoDir entries.
+    Every listed directory is kept with its totals, so the upper levels shared by
+    most probes are only listed once and the budget goes to new directories.
+
+    Parameters
+    ----------
+    walker: Walker
+        The traversal engine of the root
+
+    nodires: list[NoDir]
+        The NoDir entries of the root
+
+    plan: QueryPlan
+        The search, used to match the entries
+
+    counted: list[bool]
+        Whether every NoDir entry is added to the combined total, the covered ones are not
+    """
+    walker:   Walker
+    nodires:  list[NoDir]
+    plan:     QueryPlan
+    matcher:  Matcher = field(init=False)
+    counted:  list[bool] = field(init=False)
+    nodes:    dict[str, tuple[list[int], list[str]]] = field(default_factory=dict, init=False)
+    samples:  list[list[float]] = field(default_factory=list, init=False)
+    _known:   int = field(default=1, init=False)
+
+    def __post_init__(self) -> None:
+        self.matcher = self.plan.matcher(self.nodires)
+        covered      = self.plan.covered(self.plan.argvcont)
+        self.counted = [i not in covered for i in self.nodires]
+
+    @property
+    def complete(self) -> bool:
+        """
+        Whether every directory of the tree has been listed, so the totals are exact
+        """
+        return self._known == len(self.nodes)
+
+    def node(self, path: str) -> tuple[list[int], list[str]]:
+        """
+        List a directory, or get it from the already listed ones
+
+        Parameters
+        ----------
+        path: str
+            The directory
+
+        Returns
+        -------
+        node: tuple[list[int], list[str]]
+            The totals of the directory by NoDir entry and its subdirectories
+        """
+        if path not in self.nodes:
+            entries = self.walker.listdir(path)
+            local   = dict.fromkeys(self.nodires, 0)
+            self.plan.accumulate(local, self.nodires, self.matcher, entries, self.plan.stats)
+            subdirs = [i.path for i in self.walker.subdirs(entries)]
+            self.nodes[path] = [local[i] for i in self.nodires], subdirs
+            self._known     += len(subdirs)
+        return self.nodes[path]
+
+    def probe(self, random: Random) -> None:
+        """
+        Descend from the root to a leaf through random subdirectories and keep the estimate of the whole tree
+
+        Parameters
+        ----------
+        random: Random
+            The generator choosing the subdirectories
+
+        Returns
+        -------
+        None
+        """
+        path   = str(self.walker.root)
+        weight = 1
+        totals = [0.0] * len(self.nodires)
+        for _ in range(MAX_DEPTH):
+            values, subdirs = self.node(path)
+            for i, aux in enumerate(values):
+                totals[i] += weight * aux
+            if len(subdirs) == 0:
+                break
+            weight *= len(subdirs)
+            path    = random.choice(subdirs)
+        self.samples.append(totals)
+
+    def moments(self) -> tuple[list[float], list[float]]:
+        """
+        The estimated totals of the NoDir entries and of their sum, with the variance of every estimate.
+        If the tree is complete they are the exact totals with no variance.
+
+        Parameters
+        ----------
+        None
+
+        Returns
+        -------
+        moments: tuple[list[float], list[float]]
+            The totals of every NoDir entry followed by their sum, and their variances
+        """
+        if self.complete:
+            exact = [float(sum(i)) for i in zip(*(values for values, _ in self.nodes.values()))]
+            return exact + [sum(compress(exact, self.counted))], [0.0] * (len(exact) + 1)
+        columns = [list(i) for i in zip(*self.samples)]
+        columns.append([sum(compress(i, self.counted)) for i in self.samples])
+        means, variances = [], []
+        for column in columns:
+            mean, var = moments(column)
+            means.append(mean)
+            variances.append(var)
+        return means, variances
+
+@dataclass
+class Estimator():
+    """
+    Approximate search with a time or directory budget
+
+    Parameters
+    ----------
+    plan: QueryPlan
+        The search to estimate, its stats counters are filled if it has them
+
+    seconds: Optional[float] = None
+        Stop probing after this time
+
+    dirs: Optional[int] = None
+        Stop probing after listing this number of directories
+
+    seed: Optional[int] = None
+        Seed of the random descents, default a random one
+    """
+    plan:    QueryPlan
+    seconds: Optional[float] = None
+    dirs:    Optional[int] = None
+    seed:    Optional[int] = None
+
+    def run(self, verbose: bool=True) -> Estimate:
+        """
+        Probe the roots in turns until the budget runs out, every tree is completely listed
+        or the sampled part of the trees is saturated. Without recursion the search is exact.
+
+        Parameters
+        ----------
+        verbose: bool = True
+            Whether to print error messages or not
+
+        Returns
+        -------
+        run: Estimate
+            The estimated totals with their confidence intervals
+        """
+        plan = self.plan
+        if not plan.argvcont.recr:
+            exact   = plan.run(verbose)
+            covered = plan.covered(exact)
+            total   = sum(aux for nodir, aux in exact.items() if nodir not in covered)
+            return Estimate(exact, dict.fromkeys(exact, 0.0), total, 0.0, 1, len(plan.groups()))
+
+        start  = perf_counter()
+        random = Random(self.seed)
+        roots  = [Root(plan.walker(root, verbose), nodires, plan) for root, nodires in plan.groups().items()]
+        plan.errors = 0
+        probes, idle = 0, 0
+        while True:
+            listed = sum(len(i.nodes) for i in roots)
+            for root in roots:
+                if not root.complete:
+                    root.probe(random)
+            probes += 1
+            dirs    = sum(len(i.nodes) for i in roots)
+            idle    = idle + 1 if dirs == listed else 0
+            if all(i.complete for i in roots) or (probes >= 2 and (
+                idle >= SATURATION or
+                (self.dirs is not None and dirs >= self.dirs) or
+                (self.seconds is not None and perf_counter() - start >= self.seconds)
+            )):
+                break
+
+        totals:  dict[NoDir, float] = {}
+        margins: dict[NoDir, float] = {}
+        total, variance = 0.0, 0.0
+        for root in roots:
+            means, variances = root.moments()
+            for nodir, mean, var in zip(root.nodires, means, variances):
+                totals[nodir]  = mean
+                margins[nodir] = Z95 * sqrt(var)
+            total    += means[-1]
+            variance += variances[-1]
+
+        if plan.stats is not None:
+            plan.stats.errors  += plan.errors
+            plan.stats.seconds += perf_counter() - start
+            if plan.throttle is not None:
+                plan.throttle.report(plan.stats)
+        return Estimate(totals, margins, total, Z95 * sqrt(variance), probes, dirs)
+
+def moments(samples: list[float]) -> tuple[float, float]:
+    """
+    Mean of the samples and the variance of that mean
+
+    Parameters
+    ----------
+    samples: list[float]
+        The estimates of the probes, at least two
+
+    Returns
+    -------
+    moments: tuple[float, float]
+        The mean and its variance
+    """
+    n    = len(samples)
+    mean = sum(samples) / n
+    return mean, sum((i - mean) ** 2 for i in samples) / (n - 1) / n
+
+__all__ = ["Estimate", "Estimator", "Root"]
@@ -0,0 +1,336 @@
+#!/usr/bin/python3
+from dataclasses import dataclass, field
+from functools import lru_cache
+from heapq import heapify, heappop, heappush, heappushpop, nlargest
+from os import DirEntry, sep
+from os.path import relpath
+from typing import Optional
+from .mainclass import ArgvContainer
+from .planner import st_bytes
+
+GROUP_KEYS = ["ext", "type", "owner", "depth", "dir"]
+
+# ? With top, the keys that are not complete rows keep SPACE_FACTOR counters per printed group
+SPACE_FACTOR = 10
+
+@lru_cache(maxsize=None)
+def owner(uid: int) -> str:
+    """
+    Get the user name of an uid, or the uid itself if it has no name or the platform has no pwd module
+
+    Parameters
+    ----------
+    uid: int
+        The user id
+
+    Returns
+    -------
+    owner: str
+        The user name
+    """
+    try:
+        from pwd import getpwuid
+        return getpwuid(uid).pw_name
+    except (ImportError, KeyError):
+        return str(uid)
+
+@dataclass
+class GroupTable():
+    """
+    Hash aggregated table of file counts and, in size mode, byte sums by key, built in the same traversal as the totals.
+    Every directory is added at once, so the rows of the dir key are complete when they are added
+    and with top they are kept in a bounded min heap instead of the table, the memory does not grow
+    with the number of directories. The rows of the other keys grow while the walk goes on, with top
+    they are kept by Space-Saving in top * SPACE_FACTOR counters: once they are all taken a new key
+    replaces the smallest row and starts from its rank, so the ranked count or size of a row is at most
+    its error over the exact one. While the keys fit in the counters the table is exact.
+
+    Parameters
+    ----------
+    key: str
+        The group key, one of ext, type, owner, depth or dir
+
+    top: Optional[int] = None
+        Keep only the top rows, default all of them
+
+    by_size: bool = False
+        Rank the rows by bytes instead of by count
+    """
+    key:     str
+    top:     Optional[int] = None
+    by_size: bool = False
+    rows:    dict[str, list[int]] = field(default_factory=dict, init=False)
+    heap:    list[tuple[int, str, int, int]] = field(default_factory=list, init=False)
+    errors:  dict[str, int] = field(default_factory=dict, init=False)
+    _floor:  list[tuple[int, str]] = field(default_factory=list, init=False)
+
+    @property
+    def capacity(self) -> Optional[int]:
+        """
+        Number of rows kept for the keys that are not complete rows, None without top
+        """
+        return None if self.top is None else self.top * SPACE_FACTOR
+
+    @property
+    def exact(self) -> bool:
+        """
+        Whether no row was replaced, so every count and size is exact
+        """
+        return len(self.errors) == 0
+
+    def empty(self) -> 'GroupTable':
+        """
+        Get an empty table with the same options, for a worker
+
+        Parameters
+        ----------
+        None
+
+        Returns
+        -------
+        empty: GroupTable
+            The new table
+        """
+        return GroupTable(self.key, self.top, self.by_size)
+
+    def keyof(self, argvcont: ArgvContainer, entry: DirEntry, depth: int) -> str:
+        """
+        Get the group of an entry
+
+        Parameters
+        ----------
+        argvcont: ArgvContainer
+            The search options, to classify the file type
+
+        entry: DirEntry
+            The matched entry
+
+        depth: int
+            The depth of the entry under its root, 1 for the entries of the root
+
+        Returns
+        -------
+        keyof: str
+            The group key of the entry
+        """
+        match self.key:
+            case "ext":
+                name = entry.name.lstrip(".")
+                return name.rpartition(".")[2].lower() if "." in name else ""
+            case "type":
+                return (argvcont.classify(entry).name or "unknown").lower()
+            case "owner":
+                try:
+                    return owner(entry.stat(follow_symlinks=argvcont.follow).st_uid)
+                except OSError:
+                    return ""
+            case _:
+                return str(depth)
+
+    def add(self, argvcont: ArgvContainer, root: str, path: str, entries: list[DirEntry]) -> None:
+        """
+        Add the matched entries of a directory
+
+        Parameters
+        ----------
+        argvcont: ArgvContainer
+            The search options
+
+        root: str
+            The root of the traversal
+
+        path: str
+            The directory
+
+        entries: list[DirEntry]
+            The entries of the directory matching a filter and the file type
+
+        Returns
+        -------
+        None
+        """
+        follow = argvcont.follow
+        # ? The byte sums are only shown in size mode, a count does not stat the entries for them
+        sizing = argvcont.size is not None
+        if self.key == "dir":
+            count, size = 0, 0
+            for entry in entries:
+                count += 1
+                if sizing:
+                    size += fsize(entry, follow, argvcont.disk_usage)
+            self.push(path, count, size)
+            return
+
+        depth = 1 if path == root else relpath(path, root).count(sep) + 2
+        rows  = self.rows
+        for entry in entries:
+            key  = self.keyof(argvcont, entry, depth)
+            size = fsize(entry, follow, argvcont.disk_usage) if sizing else 0
+            row  = rows.get(key)
+            if row is None:
+                row = self.admit(key)
+            row[0] += 1
+            row[1] += size
+            if self._floor:
+                heappush(self._floor, (self.rank(row), key))
+
+    def rank(self, row: list[int]) -> int:
+        """
+        The value a row is ranked by
+
+        Parameters
+        ----------
+        row: list[int]
+            The file count and byte sum
+
+        Returns
+        -------
+        rank: int
+            The byte sum with by_size, the file count otherwise
+        """
+        return row[1] if self.by_size else row[0]
+
+    def admit(self, key: str) -> list[int]:
+        """
+        Create the row of a new key. With top and every counter taken, the smallest row is replaced
+        and the new one starts from its rank, kept as its error
+
+        Parameters
+        ----------
+        key: str
+            The group key
+
+        Returns
+        -------
+        admit: list[int]
+            The row of the key
+        """
+        rows = self.rows
+        if self.capacity is None or len(rows) < self.capacity:
+            row = rows[key] = [0, 0]
+            return row
+        if len(self._floor) == 0 or len(self._floor) > 2 * self.capacity:
+            # ? The heap keeps stale ranks of the rows that grew, it is rebuilt from the rows once it doubles
+            self._floor = [(self.rank(row), i) for i, row in rows.items()]
+            heapify(self._floor)
+        while True:
+            floor, smallest = heappop(self._floor)
+            if smallest in rows and self.rank(rows[smallest]) == floor:
+                break
+        del rows[smallest]
+        self.errors.pop(smallest, None)
+        self.errors[key] = floor
+        row = rows[key] = [0, floor] if self.by_size else [floor, 0]
+        return row
+
+    def push(self, key: str, count: int, size: int) -> None:
+        """
+        Add a complete row, into the bounded heap if there is a top
+
+        Parameters
+        ----------
+        key: str
+            The group key
+
+        count: int
+            The file count of the row
+
+        size: int
+            The byte sum of the row
+
+        Returns
+        -------
+        None
+        """
+        if count == 0:
+            return
+        if self.top is None:
+            row = self.rows.setdefault(key, [0, 0])
+            row[0] += count
+            row[1] += size
+            return
+        item = (size if self.by_size else count, key, count, size)
+        if len(self.heap) < self.top:
+            heappush(self.heap, item)
+        else:
+            heappushpop(self.heap, item)
+
+    def merge(self, other: 'GroupTable') -> None:
+        """
+        Add the rows of the table of another worker
+
+        Parameters
+        ----------
+        other: GroupTable
+            The table to add
+
+        Returns
+        -------
+        None
+        """
+        for key, (count, size) in other.rows.items():
+            row = self.rows.setdefault(key, [0, 0])
+            row[0] += count
+            row[1] += size
+        for key, error in other.errors.items():
+            self.errors[key] = self.errors.get(key, 0) + error
+        capacity = self.capacity
+        if capacity is not None and len(self.rows) > capacity:
+            # ? The summed rows keep the largest ones, the dropped ones are at most the smallest kept
+            kept = nlargest(capacity, self.rows.items(), key=lambda item: self.rank(item[1]))
+            floor = self.rank(kept[-1][1])
+            self.rows = dict(kept)
+            self.errors = {key: self.errors.get(key, 0) + floor for key in self.rows}
+        # ? The ranks changed without going through the heap
+        self._floor = []
+        for _, key, count, size in other.heap:
+            self.push(key, count, size)
+
+    def result(self) -> list[tuple[str, int, int]]:
+        """
+        Get the rows sorted from the biggest to the smallest
+
+        Parameters
+        ----------
+        None
+
+        Returns
+        -------
+        result: list[tuple[str, int, int]]
+            The key, file count and byte sum of every row, only the top ones if there is a top
+        """
+        rows = [(key, count, size) for key, (count, size) in self.rows.items()]
+        rows.extend((key, count, size) for _, key, count, size in self.heap)
+        rank = (lambda row: (row[2], row[1])) if self.by_size else (lambda row: (row[1], row[2]))
+        if self.top is not None:
+            return nlargest(self.top, rows, key=rank)
+        return sorted(rows, key=rank, reverse=True)
+
+def fsize(entry: DirEntry, follow: bool, blocks: bool=False) -> int:
+    """
+    Size of a regular file, 0 for any other file type
+
+    Parameters
+    ----------
+    entry: DirEntry
+        The entry
+
+    follow: bool
+        Whether to follow symbolic links or not
+
+    blocks: bool = False
+        Whether to use the allocated size instead of the apparent one
+
+    Returns
+    -------
+    fsize: int
+        The size in bytes
+    """
+    try:
+        if entry.is_file(follow_symlinks=follow):
+            return st_bytes(entry.stat(follow_symlinks=follow), blocks)
+    except OSError:
+        pass
+    return 0
+
+__all__ = ["GROUP_KEYS", "GroupTable"]
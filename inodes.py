@@ -0,0 +1,206 @@
+#!/usr/bin/python3
+from array import array
+from dataclasses import dataclass, field
+from threading import Lock
+
+# ? Fibonacci hashing multiplier, spreads close inode numbers over the whole table
+GOLDEN = 0x9E3779B97F4A7C15
+MASK64 = (1 << 64) - 1
+
+# ? Inode numbers kept in the bitmaps of InodeTable, up to 32 MB per device
+BITMAP_LIMIT = 1 << 28
+
+@dataclass
+class InodeSet():
+    """
+    Set of (st_dev, st_ino) file identities, stored as pairs of 64 bit integers in a single
+    open addressing array with linear probing. It takes 16 bytes per slot and is kept at most
+    half full, against more than 100 bytes per identity of a Python set of tuples.
+    The empty slots are (0, 0), that identity is kept apart.
+    Adding is thread safe.
+
+    Parameters
+    ----------
+    capacity: int = 1024
+        The initial number of identities it can hold without growing
+    """
+    capacity: int = 1024
+    _bits:    int = field(default=0, init=False)
+    _keys:    array = field(init=False)
+    _size:    int = field(default=0, init=False)
+    _zero:    bool = field(default=False, init=False)
+    _lock:    Lock = field(default_factory=Lock, init=False)
+
+    def __post_init__(self) -> None:
+        self._bits = max(4, (2 * self.capacity - 1).bit_length())
+        self._keys = array("Q", bytes(16 << self._bits))
+
+    def __len__(self) -> int:
+        return self._size
+
+    @property
+    def nbytes(self) -> int:
+        """
+        Memory used by the table
+        """
+        return self._keys.itemsize * len(self._keys)
+
+    def slot(self, dev: int, ino: int) -> int:
+        """
+        Find the slot of an identity, or the empty slot where it would be stored
+
+        Parameters
+        ----------
+        dev: int
+            The device
+
+        ino: int
+            The inode number
+
+        Returns
+        -------
+        slot: int
+            The index of the slot, the pair is at 2 * slot
+        """
+        keys = self._keys
+        mask = (1 << self._bits) - 1
+        slot = ((ino * GOLDEN + dev) & MASK64) >> (64 - self._bits)
+        while True:
+            kdev, kino = keys[2 * slot], keys[2 * slot + 1]
+            if (kdev == dev and kino == ino) or (kdev == 0 and kino == 0):
+                return slot
+            slot = (slot + 1) & mask
+
+    def __contains__(self, key: tuple[int, int]) -> bool:
+        dev, ino = key
+        if dev == 0 and ino == 0:
+            return self._zero
+        slot = self.slot(dev, ino)
+        return self._keys[2 * slot] == dev and self._keys[2 * slot + 1] == ino
+
+    def add(self, dev: int, ino: int) -> bool:
+        """
+        Add an identity
+
+        Parameters
+        ----------
+        dev: int
+            The device
+
+        ino: int
+            The inode number
+
+        Returns
+        -------
+        add: bool
+            True if it was not in the set yet
+        """
+        with self._lock:
+            if dev == 0 and ino == 0:
+                new, self._zero = not self._zero, True
+                return new
+            # ? The probe loop of slot, inlined since it runs once per directory
+            keys = self._keys
+            mask = (1 << self._bits) - 1
+            slot = ((ino * GOLDEN + dev) & MASK64) >> (64 - self._bits)
+            while True:
+                i = slot << 1
+                kdev, kino = keys[i], keys[i + 1]
+                if kino == ino and kdev == dev:
+                    return False
+                if kdev == 0 and kino == 0:
+                    break
+                slot = (slot + 1) & mask
+            keys[i], keys[i + 1] = dev, ino
+            self._size += 1
+            if 2 * self._size > mask:
+                self.grow()
+            return True
+
+    def grow(self) -> None:
+        """
+        Double the table and insert the identities again, called with the lock held
+
+        Parameters
+        ----------
+        None
+
+        Returns
+        -------
+        None
+        """
+        old = iter(self._keys)
+        self._bits += 1
+        keys  = self._keys = array("Q", bytes(16 << self._bits))
+        mask  = (1 << self._bits) - 1
+        shift = 64 - self._bits
+        for dev, ino in zip(old, old):
+            if dev == 0 and ino == 0:
+                continue
+            slot = ((ino * GOLDEN + dev) & MASK64) >> shift
+            while keys[slot << 1] != 0 or keys[(slot << 1) + 1] != 0:
+                slot = (slot + 1) & mask
+            keys[slot << 1], keys[(slot << 1) + 1] = dev, ino
+
+@dataclass
+class InodeTable():
+    """
+    Set of (st_dev, st_ino) file identities for hundreds of millions of inodes.
+    Most file systems number their inodes densely from 1, so every device gets a bitmap
+    indexed by inode number that grows up to the largest one seen: one bit per inode of
+    the file system at most, whatever the number of identities added. The inode numbers
+    over BITMAP_LIMIT, from file systems with sparse 64 bit numbers, go to an InodeSet.
+    A search keeps a single table, shared by all its roots and filters.
+    Adding is thread safe.
+
+    Parameters
+    ----------
+    None
+    """
+    duplicates: int = field(default=0, init=False)
+    _bitmaps:   dict[int, bytearray] = field(default_factory=dict, init=False)
+    _sparse:    InodeSet = field(default_factory=InodeSet, init=False)
+    _lock:      Lock = field(default_factory=Lock, init=False)
+
+    @property
+    def nbytes(self) -> int:
+        """
+        Memory used by the bitmaps and the sparse table
+        """
+        return sum(len(i) for i in self._bitmaps.values()) + self._sparse.nbytes
+
+    def add(self, dev: int, ino: int) -> bool:
+        """
+        Add an identity, counting the ones already added
+
+        Parameters
+        ----------
+        dev: int
+            The device
+
+        ino: int
+            The inode number
+
+        Returns
+        -------
+        add: bool
+            True if it was not in the table yet
+        """
+        if ino >= BITMAP_LIMIT:
+            new = self._sparse.add(dev, ino)
+        else:
+            byte, bit = ino >> 3, 1 << (ino & 7)
+            with self._lock:
+                bitmap = self._bitmaps.get(dev)
+                if bitmap is None:
+                    bitmap = self._bitmaps[dev] = bytearray(max(4096, byte + 1))
+                elif byte >= len(bitmap):
+                    bitmap.extend(bytes(min(max(byte + 1, 2 * len(bitmap)), BITMAP_LIMIT >> 3) - len(bitmap)))
+                new = not bitmap[byte] & bit
+                bitmap[byte] |= bit
+        if not new:
+            with self._lock:
+                self.duplicates += 1
+        return new
+
+__all__ = ["InodeSet", "InodeTable"]
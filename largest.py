@@ -0,0 +1,129 @@
+#!/usr/bin/python3
+from dataclasses import dataclass, field
+from heapq import heappush, heappushpop, nlargest
+from os import sep, DirEntry
+from os.path import dirname
+from threading import Lock
+
+@dataclass
+class Largest():
+    """
+    The largest files and directories of a search, kept in fixed size min heaps.
+    The directory sizes roll up post order: a directory is open from its visit until
+    all of its subdirectories are closed, then its subtree size is pushed to the heap
+    and added to its parent. Only the open directories are stored, with a depth first
+    traversal they are the ancestors of the current directory.
+    The workers share it through a lock.
+
+    Parameters
+    ----------
+    files: int = 0
+        Number of largest files to keep, 0 to keep none
+
+    dirs: int = 0
+        Number of largest directories to keep, 0 to keep none
+    """
+    files:     int = 0
+    dirs:      int = 0
+    file_heap: list[tuple[int, str]] = field(default_factory=list, init=False)
+    dir_heap:  list[tuple[int, str]] = field(default_factory=list, init=False)
+    _open:     dict[str, list[int]] = field(default_factory=dict, init=False)
+    _lock:     Lock = field(default_factory=Lock, init=False)
+
+    @staticmethod
+    def push(heap: list[tuple[int, str]], size: int, item: tuple[int, str]) -> None:
+        if len(heap) < size:
+            heappush(heap, item)
+        elif item > heap[0]:
+            heappushpop(heap, item)
+
+    def add(self, root: str, path: str, matched: list[DirEntry], sizes: list[int], subdirs: int) -> None:
+        """
+        Add a visited directory
+
+        Parameters
+        ----------
+        root: str
+            The root of the traversal, its size is not added to any parent
+
+        path: str
+            The directory
+
+        matched: list[DirEntry]
+            The entries of the directory matching a filter and the file type
+
+        sizes: list[int]
+            The size of every matched entry
+
+        subdirs: int
+            The number of subdirectories that will be visited
+
+        Returns
+        -------
+        None
+        """
+        with self._lock:
+            if self.files > 0:
+                for entry, size in zip(matched, sizes):
+                    self.push(self.file_heap, self.files, (size, entry.path))
+            if self.dirs > 0:
+                self._open[path] = [sum(sizes), subdirs]
+                if subdirs == 0:
+                    self.close(root, path)
+
+    def close(self, root: str, path: str) -> None:
+        """
+        Close a directory whose subdirectories are all closed, and the parents it completes
+
+        Parameters
+        ----------
+        root: str
+            The root of the traversal
+
+        path: str
+            The directory to close
+
+        Returns
+        -------
+        None
+        """
+        while True:
+            size, _ = self._open.pop(path)
+            self.push(self.dir_heap, self.dirs, (size, path))
+            if path == root:
+                return
+            path   = dirname(path)
+            parent = self._open.get(path)
+            if parent is None:
+                return
+            parent[0] += size
+            parent[1] -= 1
+            if parent[1] > 0:
+                return
+
+    def finish(self, root: str) -> None:
+        """
+        Close the directories left open after the traversal, deepest first, like the ones
+        with a subdirectory reached again through a symbolic link that was not visited twice
+
+        Parameters
+        ----------
+        root: str
+            The root of the traversal
+
+        Returns
+        -------
+        None
+        """
+        with self._lock:
+            for path in sorted(self._open, key=lambda i: i.count(sep), reverse=True):
+                if path in self._open:
+                    self.close(root, path)
+
+    def largest_files(self) -> list[tuple[int, str]]:
+        return nlargest(self.files, self.file_heap)
+
+    def largest_dirs(self) -> list[tuple[int, str]]:
+        return nlargest(self.dirs, self.dir_heap)
+
+__all__ = ["Largest"]
@@ -1,35 +1,148 @@
 #1/usr/bin/python3
 from dataclasses import dataclass, field
-from pathlib import Path
-from typing import Iterator, Self, Optional
-from os import sep
+from typing import Callable, Iterable, Iterator, Self, Optional, TYPE_CHECKING
+from os import sep, DirEntry
+from stat import S_ISFIFO, S_ISCHR, S_ISBLK, S_ISSOCK
+from functools import lru_cache
 from sys import stdout, stderr, argv
-from itertools import product, starmap
-from argparse import ArgumentParser, RawTextHelpFormatter
-from colorama import Fore
 from .enums import FileType, Size
+# ? pathlib, re, glob and the traversal modules are imported where they are used,
+# ? so importing the argument container does not pay for them
+if TYPE_CHECKING:
+    from pathlib import Path
+
+# ? Short flags parse_fast understands without building the argparse parser
+FAST_TYPES = {"a": FileType.FILE, "d": FileType.DIR, "l": FileType.LINK, "c": FileType.CHAR, "b": FileType.BLOCK, "F": FileType.FIFO, "S": FileType.SOCKET}
+FAST_SIZES = {"y": Size.B, "k": Size.KB, "m": Size.MB, "g": Size.GB, "t": Size.TB}
+FAST_FLAGS = set("fnrsu")
+
+@lru_cache(maxsize=None)
+def compile_filter(filter: str) -> Callable[[str], object]:
+    """
+    Compile a glob filter into a name matching function, with the same rules as Path.glob
+
+    Parameters
+    ----------
+    filter: str
+        The glob filter to compile
+
+    Returns
+    -------
+    compile_filter: Callable[[str], object]
+        A function returning a truthy value if the name matches the filter
+    """
+    from fnmatch import translate
+    from re import compile as re_compile
+    return re_compile(translate(filter)).match
 
-def isdir(file: Path, follow: bool=False) -> bool:
+def duration(text: str) -> float:
     """
-    Test if the file is of a certain type and not a symlink_text, or is a symlink_text while follow flag is set
+    Parse a duration like 30s, 5m, 1h, 7d, 2w or a plain number of seconds
 
     Parameters
     ----------
-    file: Path
-        The file path to test
+    text: str
+        The duration
 
-    test: str
-        The attribute to test, like is_file
+    Returns
+    -------
+    duration: float
+        The duration in seconds
+    """
+    units = {"s": 1, "m": 60, "h": 3600, "d": 86400, "w": 604800}
+    if text[-1:] in units:
+        return float(text[:-1]) * units[text[-1]]
+    return float(text)
 
-    follow: bool
-        Whether to follow symlinks or not
+def byte_size(text: str) -> int:
+    """
+    Parse a size like 512, 10K, 1.5M, 2G or 1T, the units are powers of 1024 like the size flags
+
+    Parameters
+    ----------
+    text: str
+        The size, a trailing B is allowed like in 10KB
 
     Returns
     -------
-    issth: bool
-        Whether the test has passed or not
+    byte_size: int
+        The size in bytes
+    """
+    units = {"K": 1 << 10, "M": 1 << 20, "G": 1 << 30, "T": 1 << 40}
+    text  = text.upper().removesuffix("B") if len(text) > 1 else text
+    if text[-1:] in units:
+        return int(float(text[:-1]) * units[text[-1]])
+    return int(text)
+
+def moment(text: str) -> float:
     """
-    return file.is_dir() and (not file.is_symlink() or follow)
+    Parse a point in time, a date like 2026-01-31 or 2026-01-31T12:00, or a duration before now like 7d
+
+    Parameters
+    ----------
+    text: str
+        The date in ISO format or the duration
+
+    Returns
+    -------
+    moment: float
+        The time as seconds since the epoch
+    """
+    from datetime import datetime
+    from time import time
+    try:
+        return datetime.fromisoformat(text).timestamp()
+    except ValueError:
+        return time() - duration(text)
+
+def owner_id(text: str, group: bool=False) -> int:
+    """
+    Parse a user, or a group, as its name or its number
+
+    Parameters
+    ----------
+    text: str
+        The name or the number
+
+    group: bool = False
+        Whether it is a group instead of a user
+
+    Returns
+    -------
+    owner_id: int
+        The uid or the gid
+    """
+    if text.isdigit():
+        return int(text)
+    from argparse import ArgumentTypeError
+    try:
+        if group:
+            from grp import getgrnam
+            return getgrnam(text).gr_gid
+        from pwd import getpwnam
+        return getpwnam(text).pw_uid
+    except ImportError:
+        raise ArgumentTypeError(f"names are not supported on this platform, use the number of {text}")
+    except KeyError:
+        raise ArgumentTypeError(f"unknown {'group' if group else 'user'} {text}")
+
+def permission(text: str) -> tuple[str, int]:
+    """
+    Parse a permission test like find -perm, an octal mode: 644 for exactly these bits,
+    -644 for at least all of them and /644 for any of them
+
+    Parameters
+    ----------
+    text: str
+        The permission test
+
+    Returns
+    -------
+    permission: tuple[str, int]
+        The kind of test, =, - or /, and the mode bits
+    """
+    kind = text[0] if text[:1] in ("-", "/") else "="
+    return kind, int(text.lstrip("-/"), 8) & 0o7777
 
 @dataclass
 class NoDir():
@@ -45,7 +158,7 @@ class NoDir():
         The filter to search for in the directory.
         The default is None, that means all contents (*).
     """
-    _path:   Path
+    _path:   'Path'
     _filter: str = '*'
 
     def __repr__(self) -> str:
@@ -55,15 +168,22 @@ class NoDir():
         return hash(self.join())
 
     @property
-    def path(self) -> Path:
+    def path(self) -> 'Path':
         return self._path
 
     @property
     def filter(self) -> str:
         return self._filter
 
+    @property
+    def directed(self) -> bool:
+        """
+        Whether the filter is a path pattern, with several components or **, instead of a file name
+        """
+        return sep in self._filter or self._filter == "**"
+
     @classmethod
-    def frompath(cls, nodir: Path) -> 'NoDir':
+    def frompath(cls, nodir: 'Path') -> 'NoDir':
         """
         Creates a NoDir entry from a Path object
 
@@ -71,10 +191,23 @@ class NoDir():
         ----------
         nodir: Path
             The Path object containing the directory and the filter
-            If this variable is a directory, the filter is assumed as the default
+            If this variable is a directory, the filter is assumed as the default.
+            Wildcards may be in any component and ** matches any number of directories,
+            then the filter is the rest of the path after the last literal directory.
+            A trailing ** matches every file and directory below its directory, not the directory
+            itself, unlike Path.glob where it matches the directories only
         """
         if nodir.is_dir():
             return cls(nodir)
+        from glob import has_magic
+        from pathlib import Path
+        # ? Wildcards in the directory part make a multi component filter from the last literal directory
+        for i, part in enumerate(nodir.parts[:-1]):
+            if has_magic(part):
+                return cls(
+                    _path=Path(*nodir.parts[:i]),
+                    _filter=sep.join(nodir.parts[i:])
+                )
         return cls(
             _path=nodir.parent,
             _filter=nodir.name
@@ -110,25 +243,40 @@ class NoDir():
         """
         return self._path.is_dir()
 
-    def glob(self) -> Iterator[Path]:
+    def glob(self, entries: Optional[Iterable[DirEntry]]=None) -> Iterator[DirEntry]:
         """
         Search for files in the directory self._path matching self._filter with shell expansion
 
         Parameters
         ----------
-        None
+        entries: Optional[Iterable[DirEntry]] = None
+            The already listed entries of the directory, default self._path is listed
 
         Returns
         -------
-        glob: Iterator[Path]
+        glob: Iterator[DirEntry]
             An interator over the files matching the pattern in the directory
         """
-        yield from self._path.glob(self._filter)
-
+        from glob import has_magic
+        if entries is None:
+            from .walker import Walker
+            entries = Walker(self._path).listdir(self._path)
+        if has_magic(self._filter):
+            match = compile_filter(self._filter)
+            yield from (i for i in entries if match(i.name))
+            return
+        # ? Path.glob only yields existing literal names, so broken symlinks are skipped
+        for i in entries:
+            if i.name == self._filter:
+                try:
+                    i.stat()
+                except OSError:
+                    continue
+                yield i
 
-    def walk(self, *, recursive: bool=False, follow: bool=True, verbose: bool=True) -> Iterator[Path]:
+    def walk(self, *, recursive: bool=False, follow: bool=True, verbose: bool=True, archives: bool=False) -> Iterator[tuple[str, list[DirEntry]]]:
         """
-        Wrapper for os.walk of a NoDir entry
+        Scandir traversal of a NoDir entry, every directory is listed only once
 
         Parameters
         ----------
@@ -141,26 +289,25 @@ class NoDir():
         verbose: bool=True
             Whether to print error messages or not
 
+        archives: bool=False
+            Whether to enter the tar and zip archives like directories while recursing, their members are the entries
+
         Returns
         -------
-        walk: Iterator[Path]
-            Iterates over all directories recurvisely (or not) over the tree
-        """
-        if recursive:
-            ddires = [self._path]
-            while len(ddires) > 0:
-                last = ddires.pop()
-                yield last
-                try:
-                    tmp = [i for i in last.iterdir() if isdir(i, follow)]
-                    if len(tmp) > 0:
-                        tmp.reverse()
-                        ddires.extend(tmp)
-                except PermissionError as prm:
-                    if verbose:
-                        ArgvContainer.print_permission(prm)
-        else:
-            yield self._path
+        walk: Iterator[tuple[str, list[DirEntry]]]
+            Iterates over all directories recurvisely (or not) over the tree along with their entries
+        """
+        from .walker import Walker
+        shared = None
+        if archives:
+            from .archives import shared
+        yield from Walker(
+            self._path,
+            recursive=recursive,
+            follow=follow,
+            onerror=ArgvContainer.print_permission if verbose and recursive else None,
+            archives=shared
+        )
     
     def fspath(self) -> str:
         """
@@ -206,19 +353,195 @@ class ArgvContainer():
     round: int
         The floating point decimals to round the output, default 2
 
+    jobs: int
+        The number of threads listing directories in recursive mode, default 1
+
+    processes: int
+        The number of processes the roots are sharded across, default 1
+
+    cache: bool
+        Whether to reuse and store per directory results in the scan cache, default False
+
+    rebuild_cache: bool
+        Whether to ignore the stored results and store fresh ones, default False
+
+    verify_cache: bool
+        Whether to check the cached results against a fresh scan, default False
+
+    cache_age: float
+        Days after which unused cache rows are evicted, default 30
+
+    cache_size: float
+        Maximum size of the cache in MB, default 256
+
+    serve: bool
+        Whether to serve the search as a daemon, default False
+
+    query: bool
+        Whether to query a daemon instead of searching, default False
+
+    daemon_socket: Optional[str]
+        The Unix socket of the daemon with serve or query, default None for default_socket()
+
+    server_stats: bool
+        Whether to query the daemon statistics instead of the totals, default False
+
+    stats: Optional[str]
+        The format of the traversal statistics printed after the search, text or json, default None (not printed)
+
+    limit: Optional[int]
+        Stop the search once the total reaches it, exiting 1 if so and 0 if the total stays below, default None
+
+    at_least: Optional[int]
+        Stop the search once the total reaches it, exiting 0 if so and 1 if the total stays below, default None
+
+    estimate: bool
+        Whether to estimate the totals by random probing instead of searching everything, default False
+
+    estimate_time: Optional[float]
+        Seconds of probing with estimate, default None (no time limit)
+
+    estimate_dirs: Optional[int]
+        Directories listed while probing with estimate, default None (no limit)
+
+    group_by: Optional[str]
+        Print a table of counts, and in size mode byte sums, grouped by ext, type, owner, depth or dir, default None
+
+    top: Optional[int]
+        Print only the top rows of the group by table, default None (all)
+
+    largest_files: int
+        Number of largest files to print in size mode, default 0
+
+    largest_dirs: int
+        Number of largest directories, by the size of their subtree, to print in size mode, default 0
+
+    distribution: bool
+        Whether to print the size percentiles and log2 histogram of every filter in size mode, default False
+
+    quantiles: list[float]
+        The percentiles to print with distribution, default 50, 90 and 99
+
+    exclude: list[str]
+        Gitignore style patterns of the directories not to descend into, default none
+
+    max_depth: Optional[int]
+        Deepest directory level listed with recursion, the roots are level 0, default None (no limit)
+
+    one_fs: bool
+        Whether to skip the directories on another file system than their root, default False
+
+    dedupe: bool
+        Whether to count and size every hard linked file once in the whole search, under its first link reached, default False
+
+    disk_usage: bool
+        Whether to sum the allocated blocks instead of the apparent sizes, default False
+
+    batch: Optional[str]
+        The NDJSON file of queries to answer, - for the standard input, default None
+
+    min_size: Optional[int]
+        Smallest size in bytes of the matched entries, default None
+
+    max_size: Optional[int]
+        Largest size in bytes of the matched entries, default None
+
+    newer: Optional[float]
+        Time after which the matched entries were modified, as seconds since the epoch, default None
+
+    older: Optional[float]
+        Time before which the matched entries were modified, as seconds since the epoch, default None
+
+    time_field: str
+        The time newer and older are compared with, mtime, atime or ctime, default mtime
+
+    user: Optional[int]
+        The uid owning the matched entries, default None
+
+    group: Optional[int]
+        The gid owning the matched entries, default None
+
+    perm: Optional[tuple[str, int]]
+        The permission test of the matched entries, see permission, default None
+
+    format: Optional[str]
+        Write json, ndjson or csv records instead of sentences, default None
+
+    per_dir: bool
+        Whether to write a record per visited directory with format, default False
+
+    archives: bool
+        Whether to enter the tar and zip archives like directories while recursing, default False
+
+    max_ops: Optional[float]
+        The metadata operations per second of the traversal, default no limit
+
+    max_dirs: Optional[float]
+        The directories listed per second of the traversal, default no limit
+
+    adaptive: bool
+        Whether to lower the rate limits while the latency of the operations rises, default False
+
+    nice: bool
+        Whether to run with the lowest CPU and I/O priorities, default False
+
     filters: set[NoDir]
         The filters to search for without duplicates
     """
-    ftype:    FileType
-    size:     Optional[Size]
-    auto:     bool
-    follow:   bool
-    blank:    bool
-    recr:     bool
-    separate: bool
-    round:    int  = 2
-    _is_cd:   bool = False
-    _filters: set[NoDir] = field(default_factory=set[NoDir])
+    ftype:         FileType
+    size:          Optional[Size]
+    auto:          bool
+    follow:        bool
+    blank:         bool
+    recr:          bool
+    separate:      bool
+    round:         int  = 2
+    jobs:          int  = 1
+    processes:     int  = 1
+    cache:         bool = False
+    rebuild_cache: bool = False
+    verify_cache:  bool = False
+    cache_age:     float = 30
+    cache_size:    float = 256
+    serve:         bool = False
+    query:         bool = False
+    daemon_socket: Optional[str] = None
+    server_stats:  bool = False
+    stats:         Optional[str] = None
+    limit:         Optional[int] = None
+    at_least:      Optional[int] = None
+    estimate:      bool = False
+    estimate_time: Optional[float] = None
+    estimate_dirs: Optional[int] = None
+    group_by:      Optional[str] = None
+    top:           Optional[int] = None
+    largest_files: int = 0
+    largest_dirs:  int = 0
+    distribution:  bool = False
+    quantiles:     list[float] = field(default_factory=lambda: [50.0, 90.0, 99.0])
+    exclude:       list[str] = field(default_factory=list)
+    max_depth:     Optional[int] = None
+    one_fs:        bool = False
+    dedupe:        bool = False
+    disk_usage:    bool = False
+    batch:         Optional[str] = None
+    min_size:      Optional[int] = None
+    max_size:      Optional[int] = None
+    newer:         Optional[float] = None
+    older:         Optional[float] = None
+    time_field:    str = "mtime"
+    user:          Optional[int] = None
+    group:         Optional[int] = None
+    perm:          Optional[tuple[str, int]] = None
+    format:        Optional[str] = None
+    per_dir:       bool = False
+    archives:      bool = False
+    max_ops:       Optional[float] = None
+    max_dirs:      Optional[float] = None
+    adaptive:      bool = False
+    nice:          bool = False
+    _is_cd:        bool = False
+    _filters:      set[NoDir] = field(default_factory=set[NoDir])
 
     def __len__(self) -> int:
         return len(self._filters)
@@ -230,6 +553,28 @@ class ArgvContainer():
     def is_cd(self) -> int:
         return self._is_cd
 
+    @property
+    def predicated(self) -> bool:
+        """
+        Whether the matched entries are also selected by their metadata, like their size or modification time
+        """
+        return self.min_size is not None or self.max_size is not None or self.newer is not None or \
+            self.older is not None or self.user is not None or self.group is not None or self.perm is not None
+
+    @property
+    def throttled(self) -> bool:
+        """
+        Whether the traversal is rate limited
+        """
+        return self.max_ops is not None or self.max_dirs is not None
+
+    @property
+    def stop_at(self) -> Optional[int]:
+        """
+        The total at which the search can stop because the exit status is already known, None to search everything
+        """
+        return self.limit if self.limit is not None else self.at_least
+
     def repr_filters(self, sep: str=", ") -> str:
         """
         Display the filters in a prettier format
@@ -244,6 +589,7 @@ class ArgvContainer():
         repr_filters: str
             The string representation of the filters
         """
+        from .colors import Fore
         return f'{Fore.LIGHTBLUE_EX}{sep.join(map(NoDir.join, self._filters))}{Fore.RESET}'
 
     def parse(self, filters: list[str]) -> Self:
@@ -262,6 +608,8 @@ class ArgvContainer():
         -------
         Self
         """
+        from itertools import product, starmap
+        from pathlib import Path
         dires:   list[Path]  = []
         filt:    set[str]    = set()
         nodires: list[NoDir] = []
@@ -322,6 +670,7 @@ class ArgvContainer():
             repr += "fifos, "
         if self.ftype & FileType.SOCKET:
             repr += "socket, "
+        from .colors import Fore
         return f'{Fore.LIGHTGREEN_EX}{repr[:-2]}{Fore.RESET}'
 
     def reducesize(self, num: float) -> float:
@@ -368,13 +717,15 @@ class ArgvContainer():
                 res = num
         return round(res, self.round)
 
-    def match_type(self, file: Path) -> bool:
+    def match_type(self, file: DirEntry) -> bool:
         """
-        Search for the files in the direcotry associated with the corresponding filter
+        Search for the files in the direcotry associated with the corresponding filter.
+        The file type comes from the directory listing, stat is only called for
+        followed symlinks and special files.
         
         Parameters
         ----------
-        file: Path
+        file: DirEntry
             The file to test if it is a valid ftype
         
         Returns
@@ -382,33 +733,121 @@ class ArgvContainer():
         match_type: bool
             Whether the file specified matches type
         """
-        if file.is_symlink():
-            if self.ftype & FileType.LINK == FileType.LINK:
+        try:
+            if file.is_symlink():
+                if self.ftype & FileType.LINK == FileType.LINK:
+                    return True
+                elif not self.follow:
+                    return False
+            if (self.ftype & FileType.FILE != 0 and file.is_file()) or \
+                (self.ftype & FileType.DIR != 0 and file.is_dir()):
                 return True
-            elif not self.follow:
+            if self.ftype & (FileType.FIFO | FileType.CHAR | FileType.BLOCK | FileType.SOCKET) == 0:
                 return False
-        return (self.ftype & FileType.FILE != 0 and file.is_file()) or \
-            (self.ftype & FileType.DIR != 0 and file.is_dir()) or \
-            (self.ftype & FileType.FIFO != 0 and file.is_fifo()) or \
-            (self.ftype & FileType.CHAR != 0 and file.is_char_device()) or \
-            (self.ftype & FileType.BLOCK != 0 and file.is_block_device()) or \
-            (self.ftype & FileType.SOCKET != 0 and file.is_socket())
+            mode = file.stat().st_mode
+        except OSError:
+            return False
+        return (self.ftype & FileType.FIFO != 0 and S_ISFIFO(mode)) or \
+            (self.ftype & FileType.CHAR != 0 and S_ISCHR(mode)) or \
+            (self.ftype & FileType.BLOCK != 0 and S_ISBLK(mode)) or \
+            (self.ftype & FileType.SOCKET != 0 and S_ISSOCK(mode))
+
+    def classify(self, file: DirEntry) -> FileType:
+        """
+        Get the file type of an entry with the same rules as match_type,
+        symbolic links are links unless they are followed and links are not filtered
+
+        Parameters
+        ----------
+        file: DirEntry
+            The file to classify
+
+        Returns
+        -------
+        classify: FileType
+            The file type, FileType(0) if it is unknown
+        """
+        try:
+            if file.is_symlink() and (self.ftype & FileType.LINK == FileType.LINK or not self.follow):
+                return FileType.LINK
+            if file.is_file():
+                return FileType.FILE
+            if file.is_dir():
+                return FileType.DIR
+            mode = file.stat().st_mode
+        except OSError:
+            # ? Broken symbolic link while following
+            return FileType.LINK
+        for ftype, test in ((FileType.FIFO, S_ISFIFO), (FileType.CHAR, S_ISCHR), (FileType.BLOCK, S_ISBLK), (FileType.SOCKET, S_ISSOCK)):
+            if test(mode):
+                return ftype
+        return FileType(0)
 
     @staticmethod
-    def print_permission(perror: PermissionError) -> None:
+    def print_permission(perror: OSError) -> None:
         """
-        Default PermissionError handler
+        Default handler of the directories that cannot be read, a PermissionError or any other OSError
 
         Parameters
         ----------
-        perror: PermissionError
-            The permission error object
+        perror: OSError
+            The error object
 
         Returns
         -------
         None
         """
-        print(f"many: {Fore.RED}error:{Fore.RESET} could not read {Fore.LIGHTBLUE_EX}{perror.filename}{Fore.RESET} due to {Fore.LIGHTYELLOW_EX}permission error{Fore.RESET}", file=stderr)
+        from .colors import Fore
+        reason = "permission error" if isinstance(perror, PermissionError) else (perror.strerror or str(perror)).lower()
+        print(f"many: {Fore.RED}error:{Fore.RESET} could not read {Fore.LIGHTBLUE_EX}{perror.filename}{Fore.RESET} due to {Fore.LIGHTYELLOW_EX}{reason}{Fore.RESET}", file=stderr)
+
+    @classmethod
+    def parse_fast(cls, args: list[str]) -> Optional['ArgvContainer']:
+        """
+        Parse the common invocations, short flags followed or preceded by filters, without argparse.
+        Anything else, like long options, options with values, help or wrong arguments, is left to parse_args
+
+        Parameters
+        ----------
+        args: list[str]
+            The arguments to parse
+
+        Returns
+        -------
+        parse_fast: Optional[ArgvContainer]
+            The ArgvContainer object, None if the arguments need argparse
+        """
+        ftype, size = FileType(0), None
+        flags:   set[str]  = set()
+        filters: list[str] = []
+        after = False
+        for arg in args:
+            if len(arg) < 2 or arg[0] != "-":
+                if after:
+                    return None
+                filters.append(arg)
+                continue
+            after = len(filters) > 0
+            if arg[1] == "-" or arg[1].isdigit():
+                return None
+            for flag in arg[1:]:
+                if flag in FAST_TYPES:
+                    ftype |= FAST_TYPES[flag]
+                elif flag in FAST_SIZES:
+                    size = FAST_SIZES[flag]
+                elif flag in FAST_FLAGS:
+                    flags.add(flag)
+                else:
+                    return None
+        return cls(
+            follow="f" in flags,
+            ftype=ftype or FileType.FILE | FileType.DIR,
+            size=Size.B if "u" in flags else size,
+            blank="n" in flags,
+            recr="r" in flags,
+            separate="s" in flags,
+            auto="u" in flags
+        ).parse(filters)
 
     @classmethod
     def parse_args(cls, args: list[str]=argv[1:]) -> 'ArgvContainer':
@@ -426,6 +865,11 @@ class ArgvContainer():
         parse_args: ArgvContainer
             The ArgvContainer object for the application
         """
+        fast = cls.parse_fast(args)
+        if fast is not None:
+            return fast
+
+        from argparse import ArgumentParser, BooleanOptionalAction, RawTextHelpFormatter
         bold, under, reset = ("\x1b[1m", "\x1b[4m", "\x1b[0m") if stdout.isatty() else ("", "", "")
 
         parser = ArgumentParser(
@@ -448,6 +892,9 @@ class ArgvContainer():
 				    - Default file type filter is -ad (files and directories) for counting,
 				      and -a (files) for size count.
 				    - Default floating point round is 2.
+				    - --cache reuses the results of a directory while its mtime does not change,
+				      changing the content of a file does not change it, so sizes may be outdated.
+				      Use --rebuild-cache to refresh them or --verify-cache to check them.
 
 				{bold}Restrictions{reset}:
 				    - You must specify at least two filters to use -s, or use it with -r
@@ -492,6 +939,68 @@ class ArgvContainer():
         parser.add_argument("-u", "--auto", action="store_true", dest="auto", help="Display size instead of file count. Size is computed automatically")
 
         parser.add_argument("-R", "--round", type=int, dest="round", help="Decimal round", required=False, default=2)
+        parser.add_argument("-j", "--jobs", type=int, dest="jobs", help="Number of threads listing directories with -r, default 1", required=False, default=1)
+        parser.add_argument("-P", "--processes", type=int, dest="processes", help="Number of processes sharding roots and first level subdirectories, default 1", required=False, default=1)
+
+        parser.add_argument("--cache", action=BooleanOptionalAction, dest="cache", default=False, help="Reuse the results of directories not modified since the last cached search")
+        parser.add_argument("--rebuild-cache", action="store_true", dest="rebuild_cache", help="Ignore the cached results and store fresh ones, implies --cache")
+        parser.add_argument("--verify-cache", action="store_true", dest="verify_cache", help="Check that the cached results match a fresh search, implies --cache")
+        parser.add_argument("--cache-max-age", type=float, dest="cache_age", default=30, metavar="DAYS", help="Evict cached results not used for DAYS days, default 30")
+        parser.add_argument("--cache-max-size", type=float, dest="cache_size", default=256, metavar="MB", help="Maximum size of the cache file, default 256 MB")
+
+        parser.add_argument("--serve", action="store_true", dest="serve", help="Keep the totals up to date with inotify and serve them on a Unix socket (Linux only)")
+        parser.add_argument("--query", action="store_true", dest="query", help="Print the totals of a daemon started with --serve")
+        parser.add_argument("--daemon-socket", dest="daemon_socket", metavar="SOCKET", help="With --serve or --query, the Unix socket of the daemon, default many.sock under $XDG_RUNTIME_DIR")
+        parser.add_argument("--server-stats", action="store_true", dest="server_stats", help="With --query, print the daemon memory, latency and event statistics")
+
+        parser.add_argument("--stats", action="store_true", dest="stats", help="Print traversal counters and timings to stderr after the search")
+        parser.add_argument("--stats-format", choices=["text", "json"], dest="stats_format", help="The format of --stats, text or json, default text, implies --stats")
+
+        threshold = parser.add_mutually_exclusive_group()
+        threshold.add_argument("--limit", type=int, dest="limit", metavar="N", help="Stop once the total reaches N and exit 1, exit 0 if it stays below N. N is bytes with size")
+        threshold.add_argument("--at-least", type=int, dest="at_least", metavar="N", help="Stop once the total reaches N and exit 0, exit 1 if it stays below N. N is bytes with size")
+        threshold.add_argument("--exists", action="store_const", const=1, dest="at_least", help="Stop at the first match and exit 0, exit 1 if nothing matches, the same as --at-least 1")
+
+        parser.add_argument("--estimate", action="store_true", dest="estimate", help="Estimate the totals with a 95%% confidence interval probing random subdirectories, default budget 2000 directories")
+        parser.add_argument("--estimate-time", type=duration, dest="estimate_time", metavar="TIME", help="Probing time like 30s, 5m or 1h, implies --estimate")
+        parser.add_argument("--estimate-dirs", type=int, dest="estimate_dirs", metavar="N", help="Directories listed while probing, implies --estimate")
+
+        parser.add_argument("--group-by", choices=["ext", "type", "owner", "depth", "dir"], dest="group_by", help="Print the count, and in size mode the byte sum, of the matched files grouped by extension, file type, owner, depth or directory")
+        parser.add_argument("--top", type=int, dest="top", metavar="K", help="With --group-by, print only the K biggest groups, by size with a size flag.\nAt most 10*K groups are tracked, with more the smallest ones are replaced and the ranking is approximate")
+
+        parser.add_argument("--largest-files", type=int, dest="largest_files", default=0, metavar="N", help="With a size flag, print the N largest matched files")
+        parser.add_argument("--largest-dirs", type=int, dest="largest_dirs", default=0, metavar="N", help="With a size flag, print the N directories with the largest subtree size")
+
+        parser.add_argument("--distribution", action="store_true", dest="distribution", help="With a size flag, print the size percentiles and log2 histogram of every filter")
+        parser.add_argument("--quantiles", type=lambda text: [float(i) for i in text.split(",")], dest="quantiles", default=[50.0, 90.0, 99.0], metavar="P,P", help="Percentiles printed by --distribution, default 50,90,99")
+
+        parser.add_argument("--exclude", action="append", dest="exclude", default=[], metavar="GLOB", help="Do not descend into the directories matching GLOB, by name or by path from the root if it has a /, repeatable.\nA root inside another one with the same filter needs -s with an anchored GLOB, see --max-depth")
+        parser.add_argument("--exclude-from", action="append", dest="exclude_from", default=[], metavar="FILE", help="Read gitignore style exclude patterns from FILE, - for stdin")
+        parser.add_argument("--max-depth", type=int, dest="max_depth", metavar="N", help="With -r, list at most N levels of subdirectories below every root.\nA root inside another one with the same filter is then walked on its own, the matches under it\nwould be counted twice in the combined total so it needs -s")
+        parser.add_argument("-x", "--one-file-system", action="store_true", dest="one_fs", help="With -r, do not descend into directories on other file systems than their root")
+
+        parser.add_argument("--dedupe-inodes", action="store_true", dest="dedupe", help="Count and size a file with several hard links once in the whole search, under the first link reached.\nThe roots share the inode table, so with -P the search runs in a single process")
+        parser.add_argument("--disk-usage", action="store_true", dest="disk_usage", help="With a size flag, sum the allocated blocks like du instead of the apparent sizes")
+        parser.add_argument("--archives", action="store_true", dest="archives", help="With -r, enter the tar and zip archives like directories, their members are matched from the headers without extracting them")
+
+        parser.add_argument("--min-size", type=byte_size, dest="min_size", metavar="SIZE", help="Match only the entries of at least SIZE bytes, like 10K, 5M or 1G")
+        parser.add_argument("--max-size", type=byte_size, dest="max_size", metavar="SIZE", help="Match only the entries of at most SIZE bytes")
+        parser.add_argument("--newer", type=moment, dest="newer", metavar="TIME", help="Match only the entries modified after TIME, a date like 2026-01-31 or an age like 7d")
+        parser.add_argument("--older", type=moment, dest="older", metavar="TIME", help="Match only the entries modified before TIME, a date or an age like 30d")
+        parser.add_argument("--time", choices=["mtime", "atime", "ctime"], dest="time_field", default="mtime", help="The time compared by --newer and --older, default mtime")
+        parser.add_argument("--user", type=owner_id, dest="user", metavar="USER", help="Match only the entries owned by USER, a name or an uid")
+        parser.add_argument("--group", type=lambda text: owner_id(text, group=True), dest="group", metavar="GROUP", help="Match only the entries of GROUP, a name or a gid")
+        parser.add_argument("--perm", type=permission, dest="perm", metavar="MODE", help="Match only the entries with the octal MODE, -MODE for all of its bits or /MODE for any of them, like find")
+
+        parser.add_argument("--format", choices=["json", "ndjson", "csv"], dest="format", help="Write machine readable records with the exact totals instead of sentences")
+        parser.add_argument("--per-dir", action="store_true", dest="per_dir", help="With --format, also write a record per visited directory while the search runs")
+
+        parser.add_argument("--max-ops-per-sec", type=float, dest="max_ops", metavar="N", help="Issue at most N metadata operations per second, a listing costs one plus one per entry, shared by every job and process")
+        parser.add_argument("--max-dirs-per-sec", type=float, dest="max_dirs", metavar="N", help="List at most N directories per second, shared by every job and process")
+        parser.add_argument("--adaptive", action="store_true", dest="adaptive", help="Lower the rate limits while the latency of the operations rises and raise them back once it recovers")
+        parser.add_argument("--nice", action="store_true", dest="nice", help="Run with the lowest CPU priority and, on Linux, the idle I/O scheduling class")
+
+        parser.add_argument("--batch", dest="batch", metavar="FILE", help="Answer the NDJSON queries of FILE, - for stdin, sharing the walks of their roots, the answers are NDJSON in query order")
 
         parser.add_argument("filters", nargs='*', help="File filters or directories to apply, default all files")
 
@@ -499,6 +1008,14 @@ class ArgvContainer():
         # parser.add_argument("-h", "-?", "--help", action="help")
 
         argparse = parser.parse_args(args)
+        exclude  = list(argparse.exclude)
+        if len(argparse.exclude_from) > 0:
+            from .prune import read_patterns
+            for path in argparse.exclude_from:
+                try:
+                    exclude.extend(read_patterns(path))
+                except (OSError, UnicodeDecodeError) as err:
+                    parser.error(f"cannot read exclude file {path}: {getattr(err, 'strerror', None) or err}")
         ftype = argparse.files | argparse.dires | argparse.links | argparse.chardev | argparse.blockdev | argparse.fifo | argparse.socket \
             or FileType.FILE | FileType.DIR
         return cls(
@@ -509,6 +1026,50 @@ class ArgvContainer():
             recr=argparse.recursive,
             separate=argparse.sep,
             round=argparse.round,
+            jobs=argparse.jobs,
+            processes=argparse.processes,
+            cache=argparse.cache or argparse.rebuild_cache or argparse.verify_cache,
+            rebuild_cache=argparse.rebuild_cache,
+            verify_cache=argparse.verify_cache,
+            cache_age=argparse.cache_age,
+            cache_size=argparse.cache_size,
+            serve=argparse.serve,
+            query=argparse.query,
+            daemon_socket=argparse.daemon_socket,
+            server_stats=argparse.server_stats,
+            stats=argparse.stats_format or ("text" if argparse.stats else None),
+            limit=argparse.limit,
+            at_least=argparse.at_least,
+            estimate=argparse.estimate or argparse.estimate_time is not None or argparse.estimate_dirs is not None,
+            estimate_time=argparse.estimate_time,
+            group_by=argparse.group_by,
+            top=argparse.top,
+            largest_files=argparse.largest_files,
+            largest_dirs=argparse.largest_dirs,
+            distribution=argparse.distribution,
+            quantiles=argparse.quantiles,
+            exclude=exclude,
+            max_depth=argparse.max_depth,
+            one_fs=argparse.one_fs,
+            dedupe=argparse.dedupe,
+            disk_usage=argparse.disk_usage,
+            batch=argparse.batch,
+            min_size=argparse.min_size,
+            max_size=argparse.max_size,
+            newer=argparse.newer,
+            older=argparse.older,
+            time_field=argparse.time_field,
+            user=argparse.user,
+            group=argparse.group,
+            perm=argparse.perm,
+            format=argparse.format,
+            per_dir=argparse.per_dir,
+            archives=argparse.archives,
+            max_ops=argparse.max_ops,
+            max_dirs=argparse.max_dirs,
+            adaptive=argparse.adaptive,
+            nice=argparse.nice,
+            estimate_dirs=argparse.estimate_dirs if argparse.estimate_dirs is not None or argparse.estimate_time is not None else 2000,
             auto=argparse.auto
         ).parse(argparse.filters)
 
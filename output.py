@@ -0,0 +1,206 @@
+#!/usr/bin/python3
+"""
+Machine readable output, --format json, ndjson or csv
+---------------------------------------------------------------------------------
+Every record has the same fields: kind, root, filter, path and total.
+The dir records, one per directory and NoDir entry with --per-dir, are written while the
+search runs, then one filter record per NoDir entry and a last total record.
+The totals are file counts, or sizes in bytes with a size flag, never rounded nor colored.
+json writes a single document {"size", "dirs", "filters", "total", "errors", "stopped"}
+whose dirs array is written while the search runs too.
+---------------------------------------------------------------------------------
+"""
+
+from collections.abc import Collection
+from dataclasses import dataclass, field
+from json import dumps
+from os import sep
+from sys import stdout
+from threading import Lock
+from typing import Optional, TextIO
+from .mainclass import NoDir
+
+FORMATS = ("json", "ndjson", "csv")
+
+@dataclass
+class Records():
+    """
+    Writer of the records of a search, the dir records can be written from several worker threads
+
+    Parameters
+    ----------
+    format: str
+        The format, json, ndjson or csv
+
+    size: bool
+        Whether the totals are sizes in bytes instead of file counts
+
+    out: TextIO = stdout
+        Where the records are written
+
+    scopes: dict[NoDir, str] = {}
+        The directory of the NoDir entries walked inside another root, they have no dir records out of it
+    """
+    format: str
+    size:   bool
+    out:    TextIO = stdout
+    scopes: dict[NoDir, str] = field(default_factory=dict)
+    _lock:  Lock = field(default_factory=Lock, init=False)
+    _dirs:  int = field(default=0, init=False)
+    _keys:  dict[NoDir, tuple[str, str]] = field(default_factory=dict, init=False)
+
+    def begin(self) -> None:
+        """
+        Write what goes before the dir records
+
+        Parameters
+        ----------
+        None
+
+        Returns
+        -------
+        None
+        """
+        if self.format == "csv":
+            self.out.write("kind,root,filter,path,total\n")
+        elif self.format == "json":
+            self.out.write(f'{{"size": {dumps(self.size)}, "dirs": [')
+
+    def encode(self, nodir: NoDir) -> tuple[str, str]:
+        """
+        The root and the filter of a NoDir entry encoded for the format, once per entry
+
+        Parameters
+        ----------
+        nodir: NoDir
+            The NoDir entry
+
+        Returns
+        -------
+        encode: tuple[str, str]
+            The encoded root and filter
+        """
+        if nodir not in self._keys:
+            fields = str(nodir.path), nodir.filter
+            self._keys[nodir] = tuple(map(csv_field if self.format == "csv" else dumps, fields))
+        return self._keys[nodir]
+
+    def record(self, kind: str, nodir: Optional[NoDir], path: str, total: int) -> str:
+        """
+        Build a record line
+
+        Parameters
+        ----------
+        kind: str
+            dir, filter or total
+
+        nodir: Optional[NoDir]
+            The NoDir entry of the record, None for the total
+
+        path: str
+            The encoded directory of a dir record, an empty string or null otherwise
+
+        total: int
+            The file count or the size
+
+        Returns
+        -------
+        record: str
+            The line, without the line break
+        """
+        root, filter = self.encode(nodir) if nodir is not None else (("", "") if self.format == "csv" else ("null", "null"))
+        if self.format == "csv":
+            return f"{kind},{root},{filter},{path},{total}"
+        body = f'"root": {root}, "filter": {filter}, "path": {path}, "total": {total}'
+        return f"{{{body}}}" if self.format == "json" else f'{{"kind": "{kind}", {body}}}'
+
+    def directory(self, path: str, totals: dict[NoDir, int]) -> None:
+        """
+        Write the dir records of a visited directory
+
+        Parameters
+        ----------
+        path: str
+            The directory
+
+        totals: dict[NoDir, int]
+            The totals of the entries of the directory by NoDir entry
+
+        Returns
+        -------
+        None
+        """
+        scopes  = self.scopes
+        encoded = csv_field(path) if self.format == "csv" else dumps(path)
+        lines   = [
+            self.record("dir", nodir, encoded, aux) for nodir, aux in totals.items()
+            if nodir not in scopes or path == scopes[nodir] or path.startswith(scopes[nodir] + sep)
+        ]
+        if len(lines) == 0:
+            return
+        with self._lock:
+            if self.format == "json":
+                self.out.write((",\n" if self._dirs > 0 else "\n") + ",\n".join(lines))
+            else:
+                self.out.write("\n".join(lines) + "\n")
+            self._dirs += len(lines)
+
+    def finish(self, totals: dict[NoDir, int], covered: Collection[NoDir]=(), errors: int=0, stopped: bool=False) -> None:
+        """
+        Write the filter records and the total
+
+        Parameters
+        ----------
+        totals: dict[NoDir, int]
+            The totals of every NoDir entry
+
+        covered: Collection[NoDir] = ()
+            The NoDir entries left out of the total, their matches are counted by other ones
+
+        errors: int = 0
+            The number of directories that could not be read
+
+        stopped: bool = False
+            Whether the search stopped at its threshold, so the totals are partial
+
+        Returns
+        -------
+        None
+        """
+        total = sum(aux for nodir, aux in totals.items() if nodir not in covered)
+        empty = "" if self.format == "csv" else "null"
+        if self.format == "json":
+            filters = ",\n".join(self.record("filter", nodir, empty, aux) for nodir, aux in totals.items())
+            self.out.write(
+                ("\n" if self._dirs > 0 else "") +
+                f'], "filters": [\n{filters}\n], "total": {total}, "errors": {errors}, "stopped": {dumps(stopped)}}}\n'
+            )
+        else:
+            for nodir, aux in totals.items():
+                self.out.write(self.record("filter", nodir, empty, aux) + "\n")
+            self.out.write(self.record("total", None, empty, total) + "\n")
+        self.out.flush()
+
+def csv_field(text: str) -> str:
+    """
+    Quote a CSV field if it needs it, like the csv module does.
+    The bytes of a name that are not UTF-8, decoded by the os module as surrogates, are written
+    as \\xNN escapes, json and ndjson escape them too so no format fails on such a name
+
+    Parameters
+    ----------
+    text: str
+        The field
+
+    Returns
+    -------
+    csv_field: str
+        The field, between double quotes with the double quotes doubled if it has a comma, a quote or a line break
+    """
+    if not text.isascii():
+        text = text.encode("utf-8", "surrogateescape").decode("utf-8", "backslashreplace")
+    if any(i in text for i in ',"\n\r'):
+        return '"' + text.replace('"', '""') + '"'
+    return text
+
+__all__ = ["FORMATS", "Records", "csv_field"]
@@ -0,0 +1,204 @@
+#!/usr/bin/python3
+"""
+Path patterns with wildcards in any component and ** for any number of directories
+---------------------------------------------------------------------------------
+Every filter is split into its components and all the filters of a root are run
+together as a nondeterministic automaton over the directory names from the root.
+A state is the set of (filter, component) pairs still alive at a directory:
+its last components match the entries of the directory and its other components
+select the subdirectories to descend into, a directory with an empty state is never listed.
+---------------------------------------------------------------------------------
+"""
+
+from dataclasses import dataclass, field
+from glob import has_magic
+from os import sep
+from os.path import join
+from typing import Callable, Iterable
+from .mainclass import compile_filter
+from .planner import NEVER, Matcher
+
+State = frozenset[tuple[int, int]]
+
+# ? Directory states remembered, every directory is stepped from the state of its parent
+MAX_PATHS = 1 << 16
+
+@dataclass
+class PathMatcher(Matcher):
+    """
+    Matcher of multi component filters relative to a root, like */logs/2026-*/*.gz or src/**/*.py.
+    The names of a directory are matched with the Matcher of its state, got with within.
+    With recursion every filter is matched at any depth, as if it started with **.
+
+    Parameters
+    ----------
+    filters: list[str]
+        The path patterns, the tags are the indices of this list
+
+    root: str = "."
+        The directory the patterns are relative to
+
+    recursive: bool = False
+        Whether the patterns match at any depth or not
+    """
+    root:      str = "."
+    recursive: bool = False
+    _parts:    list[list[str]] = field(default_factory=list, init=False)
+    _match:    dict[str, Callable[[str], object]] = field(default_factory=dict, init=False)
+    _prefix:   str = field(default="", init=False)
+    _start:    State = field(default_factory=frozenset, init=False)
+    _states:   dict[State, Matcher] = field(default_factory=dict, init=False)
+    _paths:    dict[str, State] = field(default_factory=dict, init=False)
+
+    directed = True
+
+    def __post_init__(self) -> None:
+        self._prefix = join(self.root, "")
+        for filter in self.filters:
+            parts = [i for i in filter.split(sep) if i not in ("", ".")]
+            if self.recursive and parts[:1] != ["**"]:
+                parts.insert(0, "**")
+            # ? Consecutive ** are the same as a single one
+            parts = [i for n, i in enumerate(parts) if i != "**" or n == 0 or parts[n - 1] != "**"]
+            self._parts.append(parts or ["*"])
+            for part in parts:
+                if part != "**" and has_magic(part):
+                    self._match[part] = compile_filter(part)
+        self._start = self.closure((tag, 0) for tag in range(len(self._parts)))
+
+    def closure(self, items: Iterable[tuple[int, int]]) -> State:
+        """
+        Add the pairs reached by skipping the ** components, which also match no directory at all
+
+        Parameters
+        ----------
+        items: Iterable[tuple[int, int]]
+            The (filter, component) pairs
+
+        Returns
+        -------
+        closure: State
+            The state with the skipped components
+        """
+        state = set(items)
+        stack = list(state)
+        while len(stack) > 0:
+            tag, index = stack.pop()
+            parts = self._parts[tag]
+            if parts[index] == "**" and index + 1 < len(parts) and (tag, index + 1) not in state:
+                state.add((tag, index + 1))
+                stack.append((tag, index + 1))
+        return frozenset(state)
+
+    def matches(self, part: str, name: str) -> bool:
+        if part in self._match:
+            return bool(self._match[part](name))
+        return part == name
+
+    def step(self, state: State, name: str) -> State:
+        """
+        The state of a subdirectory
+
+        Parameters
+        ----------
+        state: State
+            The state of the directory
+
+        name: str
+            The name of the subdirectory
+
+        Returns
+        -------
+        step: State
+            The state of the subdirectory, empty if no filter can match below it
+        """
+        items = []
+        for tag, index in state:
+            parts = self._parts[tag]
+            if parts[index] == "**":
+                items.append((tag, index))
+            elif index + 1 < len(parts) and self.matches(parts[index], name):
+                items.append((tag, index + 1))
+        return self.closure(items) if len(items) > 0 else frozenset()
+
+    def state(self, path: str) -> State:
+        """
+        Run the automaton over the names from the root to a directory
+
+        Parameters
+        ----------
+        path: str
+            The directory, the root or a directory under it
+
+        Returns
+        -------
+        state: State
+            The state of the directory
+        """
+        if not path.startswith(self._prefix):
+            return self._start
+        state = self._paths.get(path)
+        if state is not None:
+            return state
+        # ? Up to the deepest known ancestor, then down stepping the automaton and remembering every state
+        names: list[str] = []
+        head  = path
+        while state is None:
+            head, _, name = head.rpartition(sep)
+            names.append(name)
+            state = self._paths.get(head) if len(head) >= len(self._prefix) else self._start
+        if len(self._paths) >= MAX_PATHS:
+            self._paths.clear()
+        for name in reversed(names):
+            state = self.step(state, name) if len(state) > 0 else state
+            head  = head + sep + name if len(head) >= len(self._prefix) else self._prefix + name
+            self._paths[head] = state
+        return state
+
+    def descends(self, path: str) -> bool:
+        """
+        Whether a filter can match anything in a directory or below it
+
+        Parameters
+        ----------
+        path: str
+            The subdirectory
+
+        Returns
+        -------
+        descends: bool
+            False if the directory does not need to be listed
+        """
+        return len(self.state(path)) > 0
+
+    def within(self, path: str) -> Matcher:
+        """
+        Get the Matcher of the names of a directory
+
+        Parameters
+        ----------
+        path: str
+            The directory
+
+        Returns
+        -------
+        within: Matcher
+            Matches the last component of the filters alive in the directory, with the tags of this matcher
+        """
+        state = self.state(path)
+        if state not in self._states:
+            filters = [NEVER] * len(self._parts)
+            for tag, index in state:
+                parts = self._parts[tag]
+                if index == len(parts) - 1:
+                    filters[tag] = "*" if parts[index] == "**" else parts[index]
+            self._states[state] = Matcher(filters)
+        return self._states[state]
+
+    def is_literal(self, tag: int) -> bool:
+        return not has_magic(self._parts[tag][-1])
+
+    def __call__(self, name: str) -> list[int]:
+        return self.within(self.root)(name)
+
+__all__ = ["PathMatcher"]
@@ -0,0 +1,1255 @@
+#!/usr/bin/python3
+from dataclasses import dataclass, field, replace
+from pathlib import Path
+from os import stat, stat_result, sep, DirEntry
+from os.path import dirname, join, realpath, relpath
+from re import compile as re_compile
+from fnmatch import translate
+from glob import has_magic
+from stat import S_ISDIR
+from time import perf_counter
+from typing import Callable, Iterable, Iterator, Optional, TYPE_CHECKING
+from .mainclass import ArgvContainer, NoDir, compile_filter
+from .walker import StrPath, Walker, isdir
+if TYPE_CHECKING:
+    from .cache import ScanCache
+    from .groups import GroupTable
+    from .inodes import InodeTable
+    from .largest import Largest
+    from .output import Records
+    from .predicate import Predicate
+    from .prune import Pruner
+    from .sketch import SizeSketch
+    from .stats import Stats
+    from .throttle import Throttle
+
+# ? Placeholder of the filters that cannot match in a directory, no entry has an empty name
+NEVER = ""
+
+@dataclass
+class Matcher():
+    """
+    Compiled glob filters of the NoDir entries sharing a root.
+    Every name is tested once against all the filters and tagged with the indices of the filters it matches.
+
+    Parameters
+    ----------
+    filters: list[str]
+        The glob filters to compile, the tags are the indices of this list
+    """
+    filters:  list[str]
+    _literal: dict[str, list[int]] = field(default_factory=dict, init=False)
+    _suffix:  dict[str, list[int]] = field(default_factory=dict, init=False)
+    _globs:   list[tuple[int, Callable[[str], object]]] = field(default_factory=list, init=False)
+    _any:     Optional[Callable[[str], object]] = field(default=None, init=False)
+
+    # ? Whether the filters depend on the directory, then the names are matched with the Matcher of within
+    directed = False
+
+    def __post_init__(self) -> None:
+        for tag, filter in enumerate(self.filters):
+            suffix = filter[2:]
+            if not has_magic(filter):
+                self._literal.setdefault(filter, []).append(tag)
+            elif filter.startswith("*.") and "." not in suffix and not has_magic(suffix):
+                self._suffix.setdefault(suffix, []).append(tag)
+            else:
+                self._globs.append((tag, compile_filter(filter)))
+        if len(self._globs) > 0:
+            self._any = re_compile("|".join(translate(self.filters[tag]) for tag, _ in self._globs)).match
+
+    def within(self, path: str) -> 'Matcher':
+        """
+        Get the Matcher of the names of a directory, the same one since the filters are plain names
+
+        Parameters
+        ----------
+        path: str
+            The directory
+
+        Returns
+        -------
+        within: Matcher
+            The matcher itself
+        """
+        return self
+
+    def is_literal(self, tag: int) -> bool:
+        """
+        Whether a filter has no wildcards, literal names are only matched if they exist
+
+        Parameters
+        ----------
+        tag: int
+            The filter index
+
+        Returns
+        -------
+        is_literal: bool
+            True if the filter is a literal file name
+        """
+        return not has_magic(self.filters[tag])
+
+    def __call__(self, name: str) -> list[int]:
+        """
+        Get the filters matching a file name
+
+        Parameters
+        ----------
+        name: str
+            The file name to test
+
+        Returns
+        -------
+        __call__: list[int]
+            The indices of the filters matching the name, empty if none does
+        """
+        tags = self._literal.get(name, [])
+        _, dot, suffix = name.rpartition(".")
+        if dot and suffix in self._suffix:
+            tags = tags + self._suffix[suffix]
+        if self._any is not None and self._any(name):
+            tags = tags + [tag for tag, match in self._globs if match(name)]
+        return tags
+
+@dataclass
+class ScopedMatcher(Matcher):
+    """
+    Matcher of the NoDir entries of a root and of the roots nested in it, walked once together.
+    The filters of a nested root only match in its directory and below it,
+    the names of a directory are matched with the Matcher of within.
+
+    Parameters
+    ----------
+    filters: list[str]
+        The glob filters to compile, the tags are the indices of this list
+
+    scopes: list[Optional[str]] = []
+        The directory, as reached by the walk, every filter is matched under, None for the whole walk
+    """
+    scopes:  list[Optional[str]] = field(default_factory=list)
+    _states: dict[frozenset[int], Matcher] = field(default_factory=dict, init=False)
+
+    directed = True
+
+    def within(self, path: str) -> Matcher:
+        """
+        Get the Matcher of the names of a directory
+
+        Parameters
+        ----------
+        path: str
+            The directory
+
+        Returns
+        -------
+        within: Matcher
+            Matches the filters whose root contains the directory, with the tags of this matcher
+        """
+        alive = frozenset(
+            tag for tag, scope in enumerate(self.scopes) if scope is None or path == scope or path.startswith(scope + sep)
+        )
+        if alive not in self._states:
+            self._states[alive] = Matcher([i if tag in alive else NEVER for tag, i in enumerate(self.filters)])
+        return self._states[alive]
+
+@dataclass(frozen=True)
+class Shard():
+    """
+    A unit of work of the process pool, a directory with the filters to apply to it
+
+    Parameters
+    ----------
+    path: str
+        The directory to traverse
+
+    filters: list[str]
+        The glob filters to match
+
+    recursive: bool
+        Whether to read sub directories or not
+
+    verbose: bool
+        Whether to print error messages or not
+
+    argvcont: ArgvContainer
+        The search options, its NoDir entries are ignored
+
+    stats: bool = False
+        Whether to collect the traversal counters
+
+    pruner: Optional[Pruner] = None
+        The pruning rules of the root the shard belongs to, default none
+    """
+    path:      str
+    filters:   list[str]
+    recursive: bool
+    verbose:   bool
+    argvcont:  ArgvContainer
+    stats:     bool = False
+    pruner:    Optional['Pruner'] = None
+
+@dataclass(frozen=True)
+class Partial():
+    """
+    Partial aggregate returned by a process pool worker
+
+    Parameters
+    ----------
+    totals: list[int]
+        The file count or the size of every filter of the shard, in the same order
+
+    errors: int
+        The number of directories that could not be read
+
+    stats: Optional[Stats] = None
+        The traversal counters of the shard, if they were collected
+
+    sketches: Optional[list[SizeSketch]] = None
+        The size distribution of every filter of the shard, in the same order, if they were collected
+    """
+    totals:   list[int]
+    errors:   int
+    stats:    Optional['Stats'] = None
+    sketches: Optional[list['SizeSketch']] = None
+
+class ThresholdReached(Exception):
+    """
+    Raised after the match that makes the totals reach the stop_at value of the arguments,
+    it stops the traversal of every worker. A serial search stops with the exact threshold, the other
+    jobs or processes and the subtrees reused from the scan cache can add a few matches more
+    """
+
+@dataclass
+class QueryPlan():
+    """
+    Query planner, groups the NoDir entries by root so every root is traversed only once
+    no matter how many filters are applied to it. The roots are compared by their real path
+    and identity, the same directory given twice is walked once and, with recursion, a root
+    inside another one is walked as part of it.
+
+    Parameters
+    ----------
+    argvcont: ArgvContainer
+        The parsed arguments with the NoDir entries to search for
+
+    stats: Optional[Stats] = None
+        The traversal counters to fill, default they are not collected
+
+    table: Optional[GroupTable] = None
+        The group by table to fill with the matched entries, default no table is built
+
+    largest: Optional[Largest] = None
+        The heaps of the largest files and directories to fill in size mode, default they are not kept
+
+    rows: Optional[Records] = None
+        The writer of a record per visited directory, default they are not written
+
+    errors: int
+        The number of directories that could not be read during the last run
+
+    stopped: bool
+        Whether the last run stopped early because argvcont.stop_at was reached, so the totals are partial
+
+    sketches: Optional[dict[NoDir, SizeSketch]]
+        The size distribution of every NoDir entry during the last run with argvcont.distribution
+
+    cache: Optional[ScanCache]
+        The scan cache, open while running with argvcont.cache
+
+    pruners: dict[str, Optional[Pruner]]
+        The pruning rules of every root, built on first use
+
+    inodes: Optional[InodeTable]
+        The hard linked files already counted by the search with argvcont.dedupe, shared by all its roots and
+        NoDir entries so its memory bound holds whatever their number, None between the runs
+
+    scopes: dict[NoDir, str]
+        The directory, as reached by the walk of its group, of every NoDir entry of a root walked inside another one
+
+    predicate: Optional[Predicate]
+        The metadata conditions of the matched entries, None without them
+
+    throttle: Optional[Throttle]
+        The rate limits shared by all the walks of the plan, None without them
+    """
+    argvcont: ArgvContainer
+    stats:    Optional['Stats'] = None
+    table:    Optional['GroupTable'] = None
+    largest:  Optional['Largest'] = None
+    rows:     Optional['Records'] = None
+    errors:   int  = field(default=0, init=False)
+    stopped:  bool = field(default=False, init=False)
+    sketches: Optional[dict[NoDir, 'SizeSketch']] = field(default=None, init=False)
+    cache:    Optional['ScanCache'] = field(default=None, init=False)
+    pruners:  dict[str, Optional['Pruner']] = field(default_factory=dict, init=False)
+    inodes:   Optional['InodeTable'] = field(default=None, init=False)
+    scopes:   dict[NoDir, str] = field(default_factory=dict, init=False)
+    predicate: Optional['Predicate'] = field(default=None, init=False)
+    throttle: Optional['Throttle'] = field(default=None, init=False)
+    _found:   int  = field(default=0, init=False)
+    _groups:  Optional[dict[Path, list[NoDir]]] = field(default=None, init=False)
+    _roots:   dict[Path, Optional[tuple[str, int, int]]] = field(default_factory=dict, init=False)
+    _nested:  dict[tuple[Path, Path], Optional[str]] = field(default_factory=dict, init=False)
+    _covered: frozenset[NoDir] = field(default_factory=frozenset, init=False)
+
+    def __post_init__(self) -> None:
+        if self.rows is not None:
+            # ? The same dict, filled when the roots are grouped
+            self.rows.scopes = self.scopes
+        if self.argvcont.predicated:
+            from .predicate import Predicate
+            self.predicate = Predicate.fromargs(self.argvcont)
+        if self.argvcont.throttled:
+            from .throttle import Throttle
+            self.throttle = Throttle.fromargs(self.argvcont)
+
+    def new_sketches(self, nodires: Iterable[NoDir]) -> Optional[dict[NoDir, 'SizeSketch']]:
+        """
+        Create an empty size distribution for every NoDir entry if they are requested
+
+        Parameters
+        ----------
+        nodires: Iterable[NoDir]
+            The NoDir entries
+
+        Returns
+        -------
+        new_sketches: Optional[dict[NoDir, SizeSketch]]
+            The empty distributions, None without argvcont.distribution
+        """
+        if not self.argvcont.distribution:
+            return None
+        from .sketch import SizeSketch
+        return {i: SizeSketch() for i in nodires}
+
+    def groups(self) -> dict[Path, list[NoDir]]:
+        """
+        Group the NoDir entries by the root walked for them, built on first use.
+        The roots with the same identity, like . and the current directory or a symbolic link and its target, share a group.
+        With recursion, a single process and without following symbolic links, the roots inside another root join its group
+        and their NoDir entries only match under their scopes
+
+        Parameters
+        ----------
+        None
+
+        Returns
+        -------
+        groups: dict[Path, list[NoDir]]
+            The NoDir entries of every walked root, the ones of the root itself first
+        """
+        if self._groups is not None:
+            return self._groups
+        argvcont = self.argvcont
+        byroot: dict[Path, list[NoDir]] = {}
+        for nodir in argvcont:
+            byroot.setdefault(nodir.path, []).append(nodir)
+        nest = argvcont.recr and not argvcont.follow and (argvcont.processes == 1 or argvcont.dedupe)
+        groups: dict[Path, list[NoDir]] = {}
+        # ? Outer roots first, so a nested root joins the outermost root containing it
+        for root in sorted(byroot, key=lambda i: (len(self.identity(i)[0]) if self.identity(i) is not None else 0, str(i))):
+            nodires = byroot[root]
+            mine    = self.identity(root)
+            if mine is None:
+                # ? A root that cannot be stat'ed is walked alone, its walk reports it as unreadable
+                groups[root] = list(nodires)
+                continue
+            for walked, group in groups.items():
+                theirs = self.identity(walked)
+                same   = theirs is not None and mine[1:] == theirs[1:]
+                if same and not (any(i.directed for i in nodires) and any(i in self.scopes for i in group)):
+                    group.extend(nodires)
+                    break
+                if nest and not any(i.directed for i in nodires + group):
+                    scope = self.nested(walked, root)
+                    if scope is not None:
+                        self.scopes.update(dict.fromkeys(nodires, scope))
+                        group.extend(nodires)
+                        break
+            else:
+                groups[root] = list(nodires)
+        self._groups = groups
+        return groups
+
+    def identity(self, root: Path) -> Optional[tuple[str, int, int]]:
+        """
+        Get the real path and the (st_dev, st_ino) identity of a root
+
+        Parameters
+        ----------
+        root: Path
+            The root
+
+        Returns
+        -------
+        identity: Optional[tuple[str, int, int]]
+            The real path, the device and the inode number, None if the root cannot be stat'ed
+        """
+        if root not in self._roots:
+            try:
+                st = stat(root)
+                self._roots[root] = realpath(root), st.st_dev, st.st_ino
+            except OSError:
+                self._roots[root] = None
+        return self._roots[root]
+
+    def nested(self, outer: Path, inner: Path) -> Optional[str]:
+        """
+        Test if the recursive walk of a root is a part of the walk of another root, so it can be done inside it.
+        It is when the inner real path is under the outer one and the directories from the outer root down to
+        the inner one are not pruned, unless the pruning depends on the path from the root, like --max-depth
+
+        Parameters
+        ----------
+        outer: Path
+            The containing root
+
+        inner: Path
+            The nested root
+
+        Returns
+        -------
+        nested: Optional[str]
+            The inner root as reached by the walk of the outer one, None if it is not nested
+        """
+        key = outer, inner
+        if key not in self._nested:
+            self._nested[key] = None
+            argvcont = self.argvcont
+            out, inn = self.identity(outer), self.identity(inner)
+            if argvcont.recr and out is not None and inn is not None and inn[0].startswith(join(out[0], "")):
+                from .prune import Pruner
+                pruner = Pruner(str(outer), argvcont.exclude, argvcont.max_depth, argvcont.one_fs)
+                if not pruner.relative:
+                    path = str(outer)
+                    for part in relpath(inn[0], out[0]).split(sep):
+                        path = join(path, part)
+                        if pruner.enabled and pruner.prunes(path):
+                            break
+                    else:
+                        self._nested[key] = path
+        return self._nested[key]
+
+    def covered(self, nodires: Iterable[NoDir]) -> frozenset[NoDir]:
+        """
+        Find the NoDir entries whose matches are all matches of another one too, with the same filter
+        on the same root or on a root containing theirs. They are left out of the combined total so nothing
+        is counted twice, their own totals are kept
+
+        Parameters
+        ----------
+        nodires: Iterable[NoDir]
+            The NoDir entries summed together
+
+        Returns
+        -------
+        covered: frozenset[NoDir]
+            The NoDir entries left out of the sum
+        """
+        nodires = sorted(nodires, key=NoDir.join)
+        covered = set()
+        for n, nodir in enumerate(nodires):
+            for m, other in enumerate(nodires):
+                if m == n or other.filter != nodir.filter or other in covered:
+                    continue
+                mine, theirs = self.identity(nodir.path), self.identity(other.path)
+                if mine is None or theirs is None:
+                    continue
+                if mine[1:] == theirs[1:] or (not nodir.directed and self.nested(other.path, nodir.path) is not None):
+                    covered.add(nodir)
+                    break
+        return frozenset(covered)
+
+    def overlapping(self, nodires: Iterable[NoDir]) -> list[tuple[NoDir, NoDir]]:
+        """
+        Find the NoDir entries on a root inside the root of another one with the same filter that cannot be walked
+        as a part of it, because the pruning depends on the path from the root, like --max-depth or an anchored --exclude.
+        Both walks count the files under the inner root, so the combined total would count them twice
+
+        Parameters
+        ----------
+        nodires: Iterable[NoDir]
+            The NoDir entries summed together
+
+        Returns
+        -------
+        overlapping: list[tuple[NoDir, NoDir]]
+            The inner NoDir entries along with the outer ones, empty if the combined total is exact
+        """
+        argvcont = self.argvcont
+        if not argvcont.recr or (argvcont.max_depth is None and len(argvcont.exclude) == 0):
+            return []
+        from .prune import Pruner
+        if not Pruner("", argvcont.exclude, argvcont.max_depth).relative:
+            return []
+        nodires = sorted(nodires, key=NoDir.join)
+        found   = []
+        for nodir in nodires:
+            for other in nodires:
+                if other is nodir or other.filter != nodir.filter or nodir.directed:
+                    continue
+                mine, theirs = self.identity(nodir.path), self.identity(other.path)
+                if mine is not None and theirs is not None and mine[1:] != theirs[1:] and mine[0].startswith(join(theirs[0], "")):
+                    found.append((nodir, other))
+                    break
+        return found
+
+    def dispatch(
+        self,
+        nodires: list[NoDir],
+        matcher: Matcher,
+        entries: list[DirEntry],
+        stats: Optional['Stats']=None
+    ) -> Iterator[tuple[NoDir, DirEntry, int]]:
+        """
+        Send every entry of a listed directory to all the NoDir entries it matches, the only matching loop of the plan.
+        With stats the matching and the stat calls of every entry are timed, the time spent by the caller between
+        two matches is left out. The clock is only read with stats, the search without counters does not pay for it
+
+        Parameters
+        ----------
+        nodires: list[NoDir]
+            The NoDir entries of the root, in the same order as the matcher filters
+
+        matcher: Matcher
+            The compiled filters of nodires
+
+        entries: list[DirEntry]
+            The entries of a directory
+
+        stats: Optional[Stats] = None
+            The counters of the worker to update, default they are not collected
+
+        Returns
+        -------
+        dispatch: Iterator[tuple[NoDir, DirEntry, int]]
+            The NoDir entries paired with every entry matching them and its count or size
+        """
+        argvcont  = self.argvcont
+        follow    = argvcont.follow
+        predicate = self.predicate
+        dedupe    = argvcont.dedupe
+        counting  = argvcont.size is None
+        timed     = stats is not None
+        # ? An entry is stat'ed once, by the predicate, the inode table or for its size, the later ones reuse it
+        stating   = int(predicate is not None or dedupe or not counting)
+        if matcher.directed and len(entries) > 0:
+            matcher = matcher.within(dirname(entries[0].path))
+        for entry in entries:
+            if timed:
+                start = perf_counter()
+            tags = matcher(entry.name)
+            valid = len(tags) > 0 and argvcont.match_type(entry)
+            if timed:
+                split = perf_counter()
+                stats.match_seconds += split - start
+                stats.stat_calls += stating if valid else 0
+            if not valid:
+                continue
+            # ? The metadata conditions go last, their stat is the one the sizes use
+            if predicate is not None and not predicate(entry, follow):
+                if timed:
+                    stats.rejected += 1
+                    stats.stat_seconds += perf_counter() - split
+                continue
+            if dedupe and self.seen(entry):
+                if timed:
+                    stats.stat_seconds += perf_counter() - split
+                continue
+            aux = 1 if counting else self.weigh(entry)
+            for tag in tags:
+                if matcher.is_literal(tag):
+                    if timed:
+                        stats.stat_calls += 1
+                    try:
+                        entry.stat()
+                    except OSError:
+                        continue
+                if timed:
+                    stats.matched += 1
+                    stats.stat_seconds += perf_counter() - split
+                yield nodires[tag], entry, aux
+                if timed:
+                    split = perf_counter()
+            if timed:
+                stats.stat_seconds += perf_counter() - split
+
+    def gather(
+        self,
+        totals: dict[NoDir, int],
+        nodires: list[NoDir],
+        matcher: Matcher,
+        entries: list[DirEntry],
+        sketches: Optional[dict[NoDir, 'SizeSketch']]=None,
+        partials: Optional[list[dict[NoDir, int]]]=None
+    ) -> tuple[list[DirEntry], list[int]]:
+        """
+        The same as accumulate, also adding the sizes to the size distributions and returning the matched entries
+
+        Parameters
+        ----------
+        totals: dict[NoDir, int]
+            The partial totals to update
+
+        nodires: list[NoDir]
+            The NoDir entries of the root, in the same order as the matcher filters
+
+        matcher: Matcher
+            The compiled filters of nodires
+
+        entries: list[DirEntry]
+            The entries of a directory
+
+        sketches: Optional[dict[NoDir, SizeSketch]] = None
+            The size distributions to update in size mode, default none
+
+        partials: Optional[list[dict[NoDir, int]]] = None
+            The partial totals of every worker, totals among them, to check against argvcont.stop_at after every match, default no check
+
+        Returns
+        -------
+        gather: tuple[list[DirEntry], list[int]]
+            The entries matching any NoDir entry, once even if they match several of them, and their sizes, or 1 if counting
+        """
+        matched: list[DirEntry] = []
+        sizes:   list[int] = []
+        for nodir, entry, aux in self.dispatch(nodires, matcher, entries):
+            totals[nodir] += aux
+            if sketches is not None:
+                sketches[nodir].add(aux)
+            if len(matched) == 0 or matched[-1] is not entry:
+                matched.append(entry)
+                sizes.append(aux)
+            if partials is not None:
+                self.reached(partials)
+        return matched, sizes
+
+    def accumulate(
+        self,
+        totals: dict[NoDir, int],
+        nodires: list[NoDir],
+        matcher: Matcher,
+        entries: list[DirEntry],
+        stats: Optional['Stats']=None,
+        partials: Optional[list[dict[NoDir, int]]]=None
+    ) -> None:
+        """
+        Add the file count or the size of the entries of a directory to the totals of the NoDir entries
+
+        Parameters
+        ----------
+        totals: dict[NoDir, int]
+            The partial totals to update
+
+        nodires: list[NoDir]
+            The NoDir entries of the root, in the same order as the matcher filters
+
+        matcher: Matcher
+            The compiled filters of nodires
+
+        entries: list[DirEntry]
+            The entries of a directory
+
+        stats: Optional[Stats] = None
+            The counters of the worker to update, default they are not collected
+
+        partials: Optional[list[dict[NoDir, int]]] = None
+            The partial totals of every worker, totals among them, to check against argvcont.stop_at after every match, default no check
+
+        Returns
+        -------
+        None
+        """
+        if partials is None:
+            for nodir, _, aux in self.dispatch(nodires, matcher, entries, stats):
+                totals[nodir] += aux
+            return
+        # ? A directory can hold more matches than the threshold, so it is checked entry by entry
+        for nodir, _, aux in self.dispatch(nodires, matcher, entries, stats):
+            totals[nodir] += aux
+            self.reached(partials)
+
+    def seen(self, entry: DirEntry) -> bool:
+        """
+        Test if a matched entry is a hard link of a file already counted by the search, in any root, with --dedupe-inodes.
+        The file is counted under the first of its links reached, for every filter this link matches.
+        Only the files with several hard links go into the inode table, the rest cannot be seen twice
+
+        Parameters
+        ----------
+        entry: DirEntry
+            The matched entry
+
+        Returns
+        -------
+        seen: bool
+            True if the inode was already counted, then the entry is skipped
+        """
+        st = entry.stat(follow_symlinks=self.argvcont.follow)
+        return st.st_nlink > 1 and not S_ISDIR(st.st_mode) and not self.inodes.add(st.st_dev, st.st_ino)
+
+    def weigh(self, entry: DirEntry) -> int:
+        """
+        The count or size of a matched entry, with --dedupe-inodes from the stat the inode table used
+
+        Parameters
+        ----------
+        entry: DirEntry
+            The matched entry
+
+        Returns
+        -------
+        weigh: int
+            1 or the size in bytes, the allocated ones with --disk-usage
+        """
+        argvcont = self.argvcont
+        if argvcont.size is None:
+            return 1
+        return st_bytes(entry.stat(follow_symlinks=argvcont.follow), argvcont.disk_usage)
+
+    def reached(self, partials: list[dict[NoDir, int]]) -> None:
+        """
+        Stop the traversal if the totals of the finished roots plus the partial totals reach argvcont.stop_at.
+        The partial totals of the other workers may be read while they are updated, so the
+        traversal can stop a few entries later than it could, never earlier.
+
+        Parameters
+        ----------
+        partials: list[dict[NoDir, int]]
+            The partial totals of every worker of the current root
+
+        Returns
+        -------
+        None
+        """
+        stop_at = self.argvcont.stop_at
+        if stop_at is None:
+            return
+        # ? The covered NoDir entries count matches of other ones again
+        found = sum(aux for i in partials for nodir, aux in i.items() if nodir not in self._covered)
+        if self._found + found >= stop_at:
+            raise ThresholdReached(stop_at)
+
+    def pruner(self, root: StrPath) -> Optional['Pruner']:
+        """
+        Get the pruning rules of a root from --exclude, --max-depth, --one-file-system and its multi component filters
+
+        Parameters
+        ----------
+        root: StrPath
+            The root of the traversal
+
+        Returns
+        -------
+        pruner: Optional[Pruner]
+            The rules, None if no subdirectory can be pruned
+        """
+        key = str(root)
+        if key not in self.pruners:
+            argvcont = self.argvcont
+            nodires  = self.groups().get(Path(root), [])
+            directed = None
+            if any(i.directed for i in nodires):
+                from .pattern import PathMatcher
+                directed = PathMatcher([i.filter for i in nodires], key, argvcont.recr)
+            pruner = None
+            if len(argvcont.exclude) > 0 or argvcont.max_depth is not None or argvcont.one_fs or directed is not None:
+                from .prune import Pruner
+                pruner = Pruner(key, argvcont.exclude, argvcont.max_depth, argvcont.one_fs, directed)
+            self.pruners[key] = pruner if pruner is not None and pruner.enabled else None
+        return self.pruners[key]
+
+    def matcher(self, nodires: list[NoDir]) -> Matcher:
+        """
+        Compile the filters of the NoDir entries sharing a root, into a path pattern automaton
+        if any of them has several components, scoped if some of them belong to nested roots
+
+        Parameters
+        ----------
+        nodires: list[NoDir]
+            The NoDir entries of the root
+
+        Returns
+        -------
+        matcher: Matcher
+            The compiled filters, tagged in the order of nodires
+        """
+        pruner = self.pruner(nodires[0].path)
+        if pruner is not None and pruner.directed is not None:
+            return pruner.directed
+        if any(i in self.scopes for i in nodires):
+            return ScopedMatcher([i.filter for i in nodires], [self.scopes.get(i) for i in nodires])
+        return Matcher([i.filter for i in nodires])
+
+    def walker(self, root: StrPath, verbose: bool=True, recursive: Optional[bool]=None) -> Walker:
+        """
+        Create the Walker of a root, counting the directories that could not be read
+
+        Parameters
+        ----------
+        root: StrPath
+            The directory to traverse
+
+        verbose: bool = True
+            Whether to print error messages or not
+
+        recursive: Optional[bool] = None
+            Override the recursive flag of the arguments, default argvcont.recr
+
+        Returns
+        -------
+        walker: Walker
+            The traversal engine for the root
+        """
+        report = verbose and self.argvcont.recr
+        pruner = self.pruner(root)
+        if recursive is None:
+            # ? Multi component filters descend by themselves, into the directories they can match only
+            recursive = self.argvcont.recr or (pruner is not None and pruner.directed is not None)
+
+        def onerror(err: OSError) -> None:
+            self.errors += 1
+            if report:
+                ArgvContainer.print_permission(err)
+
+        visited = None
+        if self.argvcont.follow and recursive:
+            # ? Following symbolic links the same directory can be reached again, even from itself
+            from .inodes import InodeSet
+            visited = InodeSet()
+            try:
+                st = stat(root)
+                visited.add(st.st_dev, st.st_ino)
+            except OSError:
+                pass
+
+        archives = None
+        if self.argvcont.archives:
+            from .archives import shared
+            archives = shared
+
+        return Walker(
+            root,
+            recursive=recursive,
+            follow=self.argvcont.follow,
+            onerror=onerror,
+            stats=self.stats,
+            pruner=pruner,
+            visited=visited,
+            archives=archives,
+            throttle=self.throttle
+        )
+
+    def run(self, verbose: bool=True) -> dict[NoDir, int]:
+        """
+        Traverse every root once and compute the file count or the size of every NoDir entry.
+        With more than one job the directories are listed by a thread pool and
+        the partial totals of every worker are merged at the end.
+        With more than one process the work is sharded with run_sharded, unless the hard links are
+        deduplicated: the inode table is shared by the whole search, so it runs in this process.
+
+        Parameters
+        ----------
+        verbose: bool = True
+            Whether to print error messages or not
+
+        Returns
+        -------
+        run: dict[NoDir, int]
+            The file count, or the size in bytes in size mode, of every NoDir entry
+        """
+        if self.argvcont.processes > 1 and not self.argvcont.dedupe:
+            return self.run_sharded(verbose)
+        argvcont = self.argvcont
+        totals = dict.fromkeys(argvcont, 0)
+        start  = perf_counter()
+        self.errors  = 0
+        self.stopped = False
+        self._found  = 0
+        self._covered = self.covered(argvcont)
+        self.sketches = self.new_sketches(argvcont)
+        if argvcont.dedupe:
+            # ? A single table for every root, a file linked from several roots is counted once
+            from .inodes import InodeTable
+            self.inodes = InodeTable()
+        if argvcont.cache:
+            from .cache import ScanCache
+            self.cache = ScanCache(rebuild=argvcont.rebuild_cache, max_age=argvcont.cache_age, max_size=argvcont.cache_size)
+        try:
+            for nodires in self.groups().values():
+                partials = [dict.fromkeys(nodires, 0) for _ in range(max(argvcont.jobs, 1))]
+                try:
+                    self.scan_group(nodires, partials, verbose)
+                except ThresholdReached:
+                    self.stopped = True
+                for partial in partials:
+                    for nodir, aux in partial.items():
+                        totals[nodir] += aux
+                        self._found   += aux if nodir not in self._covered else 0
+                if self.stopped:
+                    break
+        finally:
+            if self.cache is not None:
+                self.cache.close()
+                self.cache = None
+            if self.inodes is not None and self.stats is not None:
+                self.stats.hardlinks += self.inodes.duplicates
+            self.inodes = None
+        if self.stats is not None:
+            self.stats.errors    += self.errors
+            self.stats.seconds   += perf_counter() - start
+            if self.throttle is not None:
+                self.throttle.report(self.stats)
+        return totals
+
+    def scan_group(self, nodires: list[NoDir], partials: list[dict[NoDir, int]], verbose: bool=True) -> None:
+        """
+        Traverse the root of a group of NoDir entries once, with a traversal counter per worker if stats are collected
+
+        Parameters
+        ----------
+        nodires: list[NoDir]
+            The NoDir entries sharing the root
+
+        partials: list[dict[NoDir, int]]
+            The partial totals of every worker to update
+
+        verbose: bool = True
+            Whether to print error messages or not
+
+        Returns
+        -------
+        None
+        """
+        matcher  = self.matcher(nodires)
+        walker   = self.walker(nodires[0].path, verbose)
+        if self.table is not None or self.largest is not None or self.sketches is not None:
+            self.collect(walker, nodires, matcher, partials)
+            return
+        counters: list[Optional['Stats']] = [None] * len(partials)
+        if self.stats is not None:
+            from .stats import Stats
+            counters = [Stats() for _ in partials]
+        try:
+            self.traverse(walker, nodires, matcher, partials, counters)
+        finally:
+            if self.stats is not None:
+                for counter in counters:
+                    self.stats.merge(counter)
+
+    def collect(self, walker: Walker, nodires: list[NoDir], matcher: Matcher, partials: list[dict[NoDir, int]]) -> None:
+        """
+        Walk the root of a group of NoDir entries adding the matched entries of every directory
+        to the group by table, the largest files and directories heaps and the size distributions.
+        Every worker has its own table and distributions, they are merged at the end.
+
+        Parameters
+        ----------
+        walker: Walker
+            The traversal engine of the root
+
+        nodires: list[NoDir]
+            The NoDir entries sharing the root
+
+        matcher: Matcher
+            The compiled filters of nodires
+
+        partials: list[dict[NoDir, int]]
+            The partial totals of every worker to update
+
+        Returns
+        -------
+        None
+        """
+        argvcont = self.argvcont
+        follow   = argvcont.follow
+        root     = str(walker.root)
+        table    = self.table
+        largest  = self.largest
+        pruner   = walker.pruner
+        tables   = [table.empty() for _ in partials] if table is not None else []
+        sketches = [self.new_sketches(nodires) for _ in partials]
+        checked  = partials if argvcont.stop_at is not None else None
+
+        def aggregate(wid: int, path: str, entries: list[DirEntry]) -> None:
+            matched, sizes = self.gather(partials[wid], nodires, matcher, entries, sketches[wid], checked)
+            if table is not None:
+                tables[wid].add(argvcont, root, path, matched)
+            if largest is not None:
+                # ? The pruned subdirectories are never visited, counting them would leave the directory open
+                subdirs = sum(
+                    1 for i in entries if isdir(i, follow) and (pruner is None or not pruner.prunes(i.path, i))
+                ) if walker.recursive else 0
+                largest.add(root, path, matched, sizes, subdirs)
+
+        try:
+            walker.parallel(argvcont.jobs, aggregate)
+        finally:
+            if largest is not None:
+                largest.finish(root)
+            if table is not None:
+                for aux in tables:
+                    table.merge(aux)
+            if self.sketches is not None:
+                for part in sketches:
+                    for nodir, sketch in part.items():
+                        self.sketches[nodir].merge(sketch)
+
+    def traverse(
+        self,
+        walker: Walker,
+        nodires: list[NoDir],
+        matcher: Matcher,
+        partials: list[dict[NoDir, int]],
+        counters: list[Optional['Stats']]
+    ) -> None:
+        """
+        Walk the root of a group of NoDir entries, through the scan cache if it is open
+
+        Parameters
+        ----------
+        walker: Walker
+            The traversal engine of the root
+
+        nodires: list[NoDir]
+            The NoDir entries sharing the root
+
+        matcher: Matcher
+            The compiled filters of nodires
+
+        partials: list[dict[NoDir, int]]
+            The partial totals of every worker to update
+
+        counters: list[Optional[Stats]]
+            The traversal counters of every worker, None if they are not collected
+
+        Returns
+        -------
+        None
+        """
+        argvcont = self.argvcont
+        check    = argvcont.stop_at is not None
+        # ? The thresholds are checked after every match, only the other workers can add a few more
+        checked  = partials if check else None
+        if self.cache is None and self.rows is not None:
+            rows = self.rows
+
+            def record(wid: int, path: str, entries: list[DirEntry]) -> None:
+                partial = partials[wid]
+                before  = dict(partial)
+                try:
+                    self.accumulate(partial, nodires, matcher, entries, counters[wid], checked)
+                finally:
+                    rows.directory(path, {i: partial[i] - aux for i, aux in before.items()})
+
+            walker.parallel(argvcont.jobs, record)
+            return
+        if self.cache is None:
+            def accumulate(wid: int, _: str, entries: list[DirEntry]) -> None:
+                self.accumulate(partials[wid], nodires, matcher, entries, counters[wid], checked)
+
+            walker.parallel(argvcont.jobs, accumulate)
+            return
+
+        from .cache import CachedWalker, ScanCache
+        # ? The rows are keyed by filter, or by the whole NoDir entry when the group repeats a filter or has nested roots
+        keys  = {i: i.filter for i in nodires}
+        if len(set(keys.values())) < len(keys) or any(i in self.scopes for i in nodires):
+            keys = {i: i.join() for i in nodires}
+        bykey = {key: i for i, key in keys.items()}
+        # ? The totals of a directory under multi component filters depend on its path from the root
+        scope = [str(walker.root)] if matcher.directed else []
+
+        def visit(wid: int, _: str, entries: list[DirEntry]) -> dict[str, int]:
+            partial = partials[wid]
+            before  = dict(partial)
+            self.accumulate(partial, nodires, matcher, entries, counters[wid], checked)
+            return {keys[i]: partial[i] - aux for i, aux in before.items()}
+
+        # ? A reused subtree adds its stored totals at once, the search can stop past the threshold by them
+        def reuse(wid: int, stored: dict[str, int]) -> None:
+            for key, aux in stored.items():
+                partials[wid][bykey[key]] += aux
+            if check:
+                self.reached(partials)
+
+        CachedWalker(
+            walker.root,
+            recursive=walker.recursive,
+            follow=walker.follow,
+            onerror=walker.onerror,
+            stats=walker.stats,
+            pruner=walker.pruner,
+            visited=walker.visited,
+            archives=walker.archives,
+            throttle=walker.throttle,
+            cache=self.cache,
+            sig=ScanCache.signature(list(bykey) + scope, argvcont.ftype, argvcont.follow, argvcont.size is not None, argvcont.disk_usage, argvcont.archives),
+            reuse=reuse
+        ).parallel(argvcont.jobs, visit)
+
+    def verify_cache(self, verbose: bool=True) -> tuple[dict[NoDir, int], dict[NoDir, int]]:
+        """
+        Run the search through the scan cache and without it, to check that the cached results match a fresh scan
+
+        Parameters
+        ----------
+        verbose: bool = True
+            Whether to print error messages or not
+
+        Returns
+        -------
+        verify_cache: tuple[dict[NoDir, int], dict[NoDir, int]]
+            The cached and the fresh totals of every NoDir entry
+        """
+        argvcont = self.argvcont
+        cached = QueryPlan(replace(argvcont, cache=True, rebuild_cache=False)).run(verbose=False)
+        fresh  = QueryPlan(replace(argvcont, cache=False)).run(verbose)
+        return cached, fresh
+
+    def shards(self, totals: dict[NoDir, int], verbose: bool=True) -> Iterator[tuple[list[NoDir], Shard]]:
+        """
+        Split the roots into shards, one per root and, in recursive mode without following symbolic links
+        nor multi component filters, one per first level subdirectory.
+        The entries of the roots themselves are added to totals while they are listed.
+
+        Parameters
+        ----------
+        totals: dict[NoDir, int]
+            The totals to update with the entries of the roots
+
+        verbose: bool = True
+            Whether to print error messages or not
+
+        Returns
+        -------
+        shards: Iterator[tuple[list[NoDir], Shard]]
+            The NoDir entries of every shard along with the shard
+        """
+        argvcont = self.argvcont
+        # ? Every process gets an equal share of the rate limits
+        share    = argvcont.processes
+        options  = replace(
+            argvcont,
+            max_ops=None if argvcont.max_ops is None else argvcont.max_ops / share,
+            max_dirs=None if argvcont.max_dirs is None else argvcont.max_dirs / share,
+            _filters=set()
+        )
+        for nodires in self.groups().values():
+            filters = [i.filter for i in nodires]
+            root    = nodires[0].path
+            shard   = Shard(str(root), filters, argvcont.recr, verbose, options, self.stats is not None, self.pruner(root))
+            matcher = self.matcher(nodires)
+            # ? Multi component filters are relative to their root and, following symbolic links or
+            # ? deduplicating hard links, a file of a shard can be reached from another one, so the root is not split
+            if not argvcont.recr or matcher.directed or argvcont.follow or argvcont.dedupe:
+                yield nodires, shard
+                continue
+            walker  = self.walker(root, verbose)
+            entries = walker.listdir(root)
+            if self.sketches is None:
+                self.accumulate(totals, nodires, matcher, entries, self.stats)
+            else:
+                self.gather(totals, nodires, matcher, entries, self.sketches)
+            for sub in walker.subdirs(entries):
+                yield nodires, replace(shard, path=sub.path)
+
+    def run_sharded(self, verbose: bool=True) -> dict[NoDir, int]:
+        """
+        Traverse the roots sharded by root and first level subdirectory over a process pool.
+        The workers return compact partial aggregates that are merged here.
+
+        Parameters
+        ----------
+        verbose: bool = True
+            Whether to print error messages or not
+
+        Returns
+        -------
+        run_sharded: dict[NoDir, int]
+            The file count, or the size in bytes in size mode, of every NoDir entry
+        """
+        from concurrent.futures import ProcessPoolExecutor, as_completed
+        totals = dict.fromkeys(self.argvcont, 0)
+        start   = perf_counter()
+        stop_at = self.argvcont.stop_at
+        covered = self.covered(self.argvcont)
+        self.errors   = 0
+        self.stopped  = False
+        self.sketches = self.new_sketches(self.argvcont)
+        with ProcessPoolExecutor(max_workers=self.argvcont.processes) as pool:
+            futures = {pool.submit(scan_shard, shard): nodires for nodires, shard in self.shards(totals, verbose)}
+            for future in as_completed(futures):
+                partial = future.result()
+                self.errors += partial.errors
+                if self.stats is not None and partial.stats is not None:
+                    self.stats.merge(partial.stats)
+                if self.sketches is not None and partial.sketches is not None:
+                    for nodir, sketch in zip(futures[future], partial.sketches):
+                        self.sketches[nodir].merge(sketch)
+                for nodir, aux in zip(futures[future], partial.totals):
+                    totals[nodir] += aux
+                # ? The shards not started yet are cancelled, the running ones stop at stop_at by themselves
+                if stop_at is not None and sum(aux for nodir, aux in totals.items() if nodir not in covered) >= stop_at:
+                    self.stopped = True
+                    for pending in futures:
+                        pending.cancel()
+                    break
+        if self.stats is not None:
+            self.stats.errors  += self.errors
+            self.stats.seconds += perf_counter() - start
+            if self.throttle is not None:
+                self.throttle.report(self.stats)
+        return totals
+
+def scan_shard(shard: Shard) -> Partial:
+    """
+    Process pool worker, traverses a shard and returns its partial aggregate
+
+    Parameters
+    ----------
+    shard: Shard
+        The work to do
+
+    Returns
+    -------
+    scan_shard: Partial
+        The totals of every filter of the shard
+    """
+    nodires  = [NoDir(Path(shard.path), i) for i in shard.filters]
+    argvcont = replace(shard.argvcont, recr=shard.recursive, processes=1, _filters=set(nodires))
+    stats = None
+    if shard.stats:
+        from .stats import Stats
+        stats = Stats()
+    plan   = QueryPlan(argvcont, stats)
+    # ? The depths and anchored patterns are relative to the root of the search, not to the shard
+    plan.pruners[str(nodires[0].path)] = shard.pruner
+    totals = plan.run(verbose=shard.verbose)
+    sketches = None if plan.sketches is None else [plan.sketches[i] for i in nodires]
+    return Partial([totals[i] for i in nodires], plan.errors, stats, sketches)
+
+def st_bytes(st: stat_result, blocks: bool=False) -> int:
+    """
+    Size of a file from its stat
+
+    Parameters
+    ----------
+    st: stat_result
+        The stat of the file
+
+    blocks: bool = False
+        Whether to use the allocated size, st_blocks * 512, instead of the apparent size.
+        Platforms without st_blocks use the apparent size
+
+    Returns
+    -------
+    st_bytes: int
+        The size in bytes
+    """
+    if blocks and hasattr(st, "st_blocks"):
+        return st.st_blocks * 512
+    return st.st_size
+
+__all__ = ["Matcher", "ScopedMatcher", "QueryPlan", "Shard", "Partial", "ThresholdReached", "scan_shard", "st_bytes"]
@@ -0,0 +1,129 @@
+#!/usr/bin/python3
+from dataclasses import dataclass, field
+from os import DirEntry, stat_result
+from typing import Callable, Optional
+from .mainclass import ArgvContainer
+
+@dataclass
+class Predicate():
+    """
+    Metadata conditions of the matched entries, compiled into a list of checks on their stat.
+    It runs after the name and the file type matched, with the stat the sizes use too, so an entry
+    is stat'ed at most once whatever the number of conditions. The integer comparisons of the
+    owner and the permissions go first, then the size and the times.
+
+    Parameters
+    ----------
+    min_size: Optional[int] = None
+        Smallest size in bytes
+
+    max_size: Optional[int] = None
+        Largest size in bytes
+
+    newer: Optional[float] = None
+        The time must be after it, as seconds since the epoch
+
+    older: Optional[float] = None
+        The time must be before it, as seconds since the epoch
+
+    time_field: str = "mtime"
+        The time compared, mtime, atime or ctime
+
+    user: Optional[int] = None
+        The uid of the owner
+
+    group: Optional[int] = None
+        The gid of the owner
+
+    perm: Optional[tuple[str, int]] = None
+        The permission test, = for exactly the mode bits, - for all of them and / for any of them
+
+    blocks: bool = False
+        Whether the sizes are the allocated ones, with --disk-usage
+    """
+    min_size:   Optional[int] = None
+    max_size:   Optional[int] = None
+    newer:      Optional[float] = None
+    older:      Optional[float] = None
+    time_field: str = "mtime"
+    user:       Optional[int] = None
+    group:      Optional[int] = None
+    perm:       Optional[tuple[str, int]] = None
+    blocks:     bool = False
+    _checks:    list[Callable[[stat_result], bool]] = field(default_factory=list, init=False)
+
+    def __post_init__(self) -> None:
+        from .planner import st_bytes
+        checks = self._checks
+        blocks = self.blocks
+        if self.user is not None:
+            checks.append(lambda st, uid=self.user: st.st_uid == uid)
+        if self.group is not None:
+            checks.append(lambda st, gid=self.group: st.st_gid == gid)
+        if self.perm is not None:
+            kind, bits = self.perm
+            if kind == "=":
+                checks.append(lambda st: st.st_mode & 0o7777 == bits)
+            elif kind == "-":
+                checks.append(lambda st: st.st_mode & bits == bits)
+            else:
+                checks.append(lambda st: bits == 0 or st.st_mode & bits != 0)
+        if self.min_size is not None:
+            checks.append(lambda st, low=self.min_size: st_bytes(st, blocks) >= low)
+        if self.max_size is not None:
+            checks.append(lambda st, high=self.max_size: st_bytes(st, blocks) <= high)
+        attr = f"st_{self.time_field}"
+        if self.newer is not None:
+            checks.append(lambda st, low=self.newer: getattr(st, attr) > low)
+        if self.older is not None:
+            checks.append(lambda st, high=self.older: getattr(st, attr) < high)
+
+    @classmethod
+    def fromargs(cls, argvcont: ArgvContainer) -> Optional['Predicate']:
+        """
+        Build the predicate of the arguments
+
+        Parameters
+        ----------
+        argvcont: ArgvContainer
+            The parsed arguments
+
+        Returns
+        -------
+        fromargs: Optional[Predicate]
+            The predicate, None if the arguments have no metadata condition
+        """
+        if not argvcont.predicated:
+            return None
+        return cls(
+            argvcont.min_size, argvcont.max_size, argvcont.newer, argvcont.older, argvcont.time_field,
+            argvcont.user, argvcont.group, argvcont.perm, argvcont.disk_usage
+        )
+
+    def __call__(self, entry: DirEntry, follow: bool) -> bool:
+        """
+        Test an entry
+
+        Parameters
+        ----------
+        entry: DirEntry
+            The matched entry
+
+        follow: bool
+            Whether to follow symbolic links or not, the same as the size stat
+
+        Returns
+        -------
+        __call__: bool
+            Whether the entry meets every condition, False if it cannot be stat'ed
+        """
+        try:
+            st = entry.stat(follow_symlinks=follow)
+        except OSError:
+            return False
+        for check in self._checks:
+            if not check(st):
+                return False
+        return True
+
+__all__ = ["Predicate"]
@@ -0,0 +1,144 @@
+#!/usr/bin/python3
+from dataclasses import dataclass, field
+from os import stat, sep, DirEntry
+from os.path import join
+from typing import Callable, Optional, TYPE_CHECKING
+from .mainclass import compile_filter
+if TYPE_CHECKING:
+    from .pattern import PathMatcher
+
+def read_patterns(path: str) -> list[str]:
+    """
+    Read the exclude patterns of a gitignore style file, blank lines and comments are skipped
+
+    Parameters
+    ----------
+    path: str
+        The file to read, - for the standard input
+
+    Returns
+    -------
+    read_patterns: list[str]
+        The patterns in file order
+    """
+    if path == "-":
+        from sys import stdin
+        lines = stdin.read().splitlines()
+    else:
+        with open(path, encoding="utf-8") as file:
+            lines = file.read().splitlines()
+    patterns = []
+    for line in lines:
+        line = line.rstrip()
+        if line.startswith("\\#") or line.startswith("\\!"):
+            patterns.append(line[1:])
+        elif line and not line.startswith("#"):
+            patterns.append(line)
+    return patterns
+
+@dataclass
+class Pruner():
+    """
+    Rules deciding which subdirectories a traversal does not descend into.
+    They are checked when a subdirectory is selected, before it is queued, so a pruned tree is never listed.
+    The cheap checks go first: the depth, the multi component filters, the exclude patterns and the device last, since it needs a stat call.
+
+    The exclude patterns follow the gitignore rules for directories: a pattern without a slash matches
+    the directory name at any depth, a pattern with a slash matches the path relative to the root
+    (a leading slash only anchors it), a trailing slash is ignored and a pattern starting with !
+    keeps a directory excluded by a previous pattern, the last matching pattern wins.
+
+    Parameters
+    ----------
+    root: str
+        The root of the traversal, depths and anchored patterns are relative to it
+
+    exclude: list[str] = []
+        The exclude patterns
+
+    max_depth: Optional[int] = None
+        Deepest level listed, the root is level 0, default no limit
+
+    one_fs: bool = False
+        Whether to skip the directories on another device than the root or not
+
+    directed: Optional[PathMatcher] = None
+        The multi component filters of the root, the directories none of them can match below are skipped, default none
+    """
+    root:      str
+    exclude:   list[str] = field(default_factory=list)
+    max_depth: Optional[int] = None
+    one_fs:    bool = False
+    directed:  Optional['PathMatcher'] = None
+    _prefix:   str = field(default="", init=False)
+    _rules:    list[tuple[bool, bool, Callable[[str], object]]] = field(default_factory=list, init=False)
+    _dev:      Optional[int] = field(default=None, init=False)
+
+    def __post_init__(self) -> None:
+        self._prefix = join(self.root, "")
+        for pattern in self.exclude:
+            keep = pattern.startswith("!")
+            pattern = pattern[1:] if keep else pattern
+            pattern = pattern.rstrip("/")
+            anchored = "/" in pattern
+            if pattern:
+                self._rules.append((keep, anchored, compile_filter(pattern.lstrip("/"))))
+        if self.one_fs:
+            try:
+                self._dev = stat(self.root).st_dev
+            except OSError:
+                pass
+
+    @property
+    def enabled(self) -> bool:
+        """
+        Whether any rule can prune a directory
+        """
+        return len(self._rules) > 0 or self.max_depth is not None or self._dev is not None or self.directed is not None
+
+    @property
+    def relative(self) -> bool:
+        """
+        Whether a rule depends on the path from the root, the depth or an anchored pattern,
+        so the same directory can be pruned under a root and kept under another one
+        """
+        return self.max_depth is not None or any(anchored for _, anchored, _ in self._rules)
+
+    def prunes(self, path: str, entry: Optional[DirEntry]=None) -> bool:
+        """
+        Test if a subdirectory must not be descended into
+
+        Parameters
+        ----------
+        path: str
+            The subdirectory, under the root
+
+        entry: Optional[DirEntry] = None
+            Its directory entry, its cached stat is reused by later size checks, default path is stat'ed
+
+        Returns
+        -------
+        prunes: bool
+            Whether the subdirectory is pruned or not
+        """
+        relative = path[len(self._prefix):] if path.startswith(self._prefix) else path
+        if self.max_depth is not None and relative.count(sep) >= self.max_depth:
+            return True
+        if self.directed is not None and not self.directed.descends(path):
+            return True
+        if len(self._rules) > 0:
+            name = relative.rpartition(sep)[2]
+            excluded = False
+            for keep, anchored, match in self._rules:
+                if excluded == keep and match(relative if anchored else name):
+                    excluded = not keep
+            if excluded:
+                return True
+        if self._dev is not None:
+            try:
+                return (entry.stat() if entry is not None else stat(path)).st_dev != self._dev
+            except OSError:
+                return False
+        return False
+
+__all__ = ["Pruner", "read_patterns"]
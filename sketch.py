@@ -0,0 +1,127 @@
+#!/usr/bin/python3
+from dataclasses import dataclass, field
+from math import ceil, log
+
+@dataclass
+class SizeSketch():
+    """
+    Mergeable quantile sketch of file sizes with bounded memory, in the style of DDSketch.
+    Every size goes to the bin ceil(log(size, gamma)), so any quantile is answered with
+    a relative error under alpha and a petabyte range needs less than two thousand bins.
+    The exact counts of the log2 buckets are kept too, bucket k holds the sizes
+    with k significant bits, that is from 2**(k-1) up to 2**k - 1 bytes, bucket 0 holds empty files.
+
+    Parameters
+    ----------
+    alpha: float = 0.01
+        The relative accuracy of the quantiles, sketches are only merged with the same alpha
+    """
+    alpha:  float = 0.01
+    count:  int = field(default=0, init=False)
+    sum:    int = field(default=0, init=False)
+    min:    int = field(default=0, init=False)
+    max:    int = field(default=0, init=False)
+    zeros:  int = field(default=0, init=False)
+    bins:   dict[int, int] = field(default_factory=dict, init=False)
+    log2:   list[int] = field(default_factory=lambda: [0] * 65, init=False)
+    _gamma: float = field(default=0.0, init=False)
+    _lngam: float = field(default=0.0, init=False)
+
+    def __post_init__(self) -> None:
+        self._gamma = (1 + self.alpha) / (1 - self.alpha)
+        self._lngam = log(self._gamma)
+
+    def add(self, size: int) -> None:
+        """
+        Add a file size
+
+        Parameters
+        ----------
+        size: int
+            The size in bytes
+
+        Returns
+        -------
+        None
+        """
+        if self.count == 0 or size < self.min:
+            self.min = size
+        if size > self.max:
+            self.max = size
+        self.count += 1
+        self.sum   += size
+        self.log2[size.bit_length()] += 1
+        if size == 0:
+            self.zeros += 1
+            return
+        index = ceil(log(size) / self._lngam)
+        self.bins[index] = self.bins.get(index, 0) + 1
+
+    def merge(self, other: 'SizeSketch') -> None:
+        """
+        Add the sizes of another sketch, like the one of another worker
+
+        Parameters
+        ----------
+        other: SizeSketch
+            The sketch to add, with the same alpha
+
+        Returns
+        -------
+        None
+        """
+        if other.count == 0:
+            return
+        if self.count == 0 or other.min < self.min:
+            self.min = other.min
+        self.max    = max(self.max, other.max)
+        self.count += other.count
+        self.sum   += other.sum
+        self.zeros += other.zeros
+        for index, aux in other.bins.items():
+            self.bins[index] = self.bins.get(index, 0) + aux
+        self.log2 = [i + j for i, j in zip(self.log2, other.log2)]
+
+    def quantile(self, q: float) -> int:
+        """
+        Get the approximate size at a quantile, rounded to whole bytes like the sizes it estimates
+
+        Parameters
+        ----------
+        q: float
+            The quantile, between 0 and 1
+
+        Returns
+        -------
+        quantile: int
+            The size in bytes, 0 if the sketch is empty
+        """
+        if self.count == 0:
+            return 0
+        rank = q * (self.count - 1)
+        seen = self.zeros
+        if rank < seen:
+            return 0
+        for index in sorted(self.bins):
+            seen += self.bins[index]
+            if rank < seen:
+                value = round(2 * self._gamma ** index / (self._gamma + 1))
+                return min(max(value, self.min), self.max)
+        return self.max
+
+    def buckets(self) -> list[tuple[int, int, int]]:
+        """
+        Get the non empty log2 buckets
+
+        Parameters
+        ----------
+        None
+
+        Returns
+        -------
+        buckets: list[tuple[int, int, int]]
+            The smallest size, the power of two above the largest size and the file count of every bucket
+        """
+        return [(0 if k == 0 else 1 << (k - 1), 1 << k, aux) for k, aux in enumerate(self.log2) if aux > 0]
+
+__all__ = ["SizeSketch"]
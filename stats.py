@@ -0,0 +1,202 @@
+#!/usr/bin/python3
+from dataclasses import dataclass, fields
+from os import DirEntry
+
+# ? Settings of the search rather than counters, merged by taking the largest one
+LIMITS = ("ops_limit", "dirs_limit", "nice")
+
+@dataclass
+class Stats():
+    """
+    Traversal counters of a search, filled by the Walker and the QueryPlan when they are given one.
+    Without a Stats object the counters are not collected at all.
+    With several jobs the phase times are summed over the workers, so they can add up to more than seconds.
+
+    Parameters
+    ----------
+    dirs: int = 0
+        Directories listed
+
+    entries: int = 0
+        Directory entries examined
+
+    matched: int = 0
+        Entries matching a filter and the file type, once per filter they match
+
+    stat_calls: int = 0
+        stat calls issued by many for literal names and sizes, the ones of DirEntry type checks are not included
+
+    errors: int = 0
+        Directories that could not be read due to permission errors
+
+    links_followed: int = 0
+        Symbolic links to directories descended into, only with follow
+
+    links_skipped: int = 0
+        Symbolic links not descended into while recursing
+
+    pruned: int = 0
+        Subdirectories not descended into due to --exclude, --max-depth or --one-file-system
+
+    loops: int = 0
+        Directories reached again through a symbolic link while following them, symbolic link loops
+        or several links to the same directory, not descended into
+
+    hardlinks: int = 0
+        Matched hard links of a file already counted, not counted again with --dedupe-inodes
+
+    rejected: int = 0
+        Entries matching a filter and the file type left out by the metadata predicates, like --min-size or --newer
+
+    archives: int = 0
+        Archives entered as virtual directories with --archives, their members are counted in entries
+
+    archive_reads: int = 0
+        Entered archives whose headers were read, the others were unchanged since an earlier search of the process
+
+    bad_archives: int = 0
+        Archives that could not be read, left as plain files
+
+    ops_limit: float = 0.0
+        The metadata operations per second allowed by --max-ops-per-sec, 0 without it
+
+    dirs_limit: float = 0.0
+        The directories listed per second allowed by --max-dirs-per-sec, 0 without it
+
+    rate_factor: float = 1.0
+        The lowest fraction of the limits in effect during the search, under 1 when --adaptive backed off
+
+    nice: int = 0
+        The CPU niceness of the search with --nice, its I/O priority is the idle class on Linux
+
+    list_seconds: float = 0.0
+        Time listing directories
+
+    match_seconds: float = 0.0
+        Time matching names and file types
+
+    stat_seconds: float = 0.0
+        Time adding the matched entries, stat calls included
+
+    output_seconds: float = 0.0
+        Time printing the results
+
+    wait_seconds: float = 0.0
+        Time waiting for the rate limits, summed over the workers
+
+    seconds: float = 0.0
+        Wall time of the search, output excluded
+    """
+    dirs:           int = 0
+    entries:        int = 0
+    matched:        int = 0
+    stat_calls:     int = 0
+    errors:         int = 0
+    links_followed: int = 0
+    links_skipped:  int = 0
+    pruned:         int = 0
+    loops:          int = 0
+    hardlinks:      int = 0
+    rejected:       int = 0
+    archives:       int = 0
+    archive_reads:  int = 0
+    bad_archives:   int = 0
+    ops_limit:      float = 0.0
+    dirs_limit:     float = 0.0
+    rate_factor:    float = 1.0
+    nice:           int = 0
+    list_seconds:   float = 0.0
+    match_seconds:  float = 0.0
+    stat_seconds:   float = 0.0
+    output_seconds: float = 0.0
+    wait_seconds:   float = 0.0
+    seconds:        float = 0.0
+
+    def listed(self, entries: list[DirEntry], seconds: float) -> None:
+        """
+        Count a listed directory
+
+        Parameters
+        ----------
+        entries: list[DirEntry]
+            The entries of the directory
+
+        seconds: float
+            The time the listing took
+
+        Returns
+        -------
+        None
+        """
+        self.dirs         += 1
+        self.entries      += len(entries)
+        self.list_seconds += seconds
+
+    def descended(self, entries: list[DirEntry], subdirs: list[DirEntry]) -> None:
+        """
+        Count the symbolic links of a directory that were followed or skipped
+
+        Parameters
+        ----------
+        entries: list[DirEntry]
+            The entries of the directory
+
+        subdirs: list[DirEntry]
+            The entries the traversal descends into
+
+        Returns
+        -------
+        None
+        """
+        links    = sum(1 for i in entries if i.is_symlink())
+        followed = sum(1 for i in subdirs if i.is_symlink())
+        self.links_followed += followed
+        self.links_skipped  += links - followed
+
+    def merge(self, other: 'Stats') -> None:
+        """
+        Add the counters of a worker, the errors and the wall time are the ones of the whole search.
+        The limits are the ones of the search too, the rate factor is the lowest one
+
+        Parameters
+        ----------
+        other: Stats
+            The counters of the worker
+
+        Returns
+        -------
+        None
+        """
+        for i in fields(self):
+            if i.name in LIMITS:
+                setattr(self, i.name, max(getattr(self, i.name), getattr(other, i.name)))
+            elif i.name == "rate_factor":
+                self.rate_factor = min(self.rate_factor, other.rate_factor)
+            elif i.name not in ("errors", "seconds"):
+                setattr(self, i.name, getattr(self, i.name) + getattr(other, i.name))
+
+    @property
+    def throughput(self) -> float:
+        """
+        Entries examined per second of search
+        """
+        return self.entries / self.seconds if self.seconds > 0 else 0.0
+
+    def asdict(self) -> dict[str, float]:
+        """
+        The counters with the throughput, the times rounded to microseconds
+
+        Parameters
+        ----------
+        None
+
+        Returns
+        -------
+        asdict: dict[str, float]
+            The counters by name
+        """
+        counters = {i.name: getattr(self, i.name) for i in fields(self)}
+        counters["entries_per_second"] = self.throughput
+        return {key: round(value, 6) if isinstance(value, float) else value for key, value in counters.items()}
+
+__all__ = ["Stats"]
@@ -0,0 +1,82 @@
+#!/usr/bin/python3
+"""
+Shared fixtures of the test suite
+---------------------------------------------------------------------------------
+Run it from the package directory: python -m pytest -q
+The searches run in process through main, the scan cache and the daemon socket
+live in the temporary directory of every test
+---------------------------------------------------------------------------------
+"""
+
+import sys
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable
+import pytest
+from .. import __main__ as cli, mainclass, output
+from ..benchmarks.tree import TreeSpec, TreeStats, generate
+
+@dataclass(frozen=True)
+class Run():
+    """
+    The outcome of a command line
+
+    Parameters
+    ----------
+    code: int
+        The exit status
+
+    out: str
+        What was printed to stdout
+
+    err: str
+        What was printed to stderr
+    """
+    code: int
+    out:  str
+    err:  str
+
+@pytest.fixture(autouse=True)
+def isolated(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path / "cache"))
+    monkeypatch.setenv("XDG_RUNTIME_DIR", str(tmp_path))
+
+@pytest.fixture
+def many(capsys: pytest.CaptureFixture[str], monkeypatch: pytest.MonkeyPatch) -> Callable[..., Run]:
+    """
+    Run the command line with its arguments, die is an exit status like any other.
+    The modules bind the standard streams when they are imported, they are pointed to the captured ones
+    """
+    def run(*args: str) -> Run:
+        capsys.readouterr()
+        for module in (cli, mainclass, output):
+            for name in ("stdout", "stderr"):
+                if hasattr(module, name):
+                    monkeypatch.setattr(module, name, getattr(sys, name))
+        try:
+            code = cli.main(["many", *args])
+        except SystemExit as exc:
+            code = exc.code if isinstance(exc.code, int) else 1
+        out, err = capsys.readouterr()
+        return Run(code, out, err)
+    return run
+
+@pytest.fixture
+def tree(tmp_path: Path) -> tuple[Path, TreeStats]:
+    """
+    A small synthetic tree, 40 directories of 5 files with one symbolic link each
+    """
+    root = tmp_path / "tree"
+    root.mkdir()
+    stats = generate(str(root), TreeSpec(width=3, depth=3, files=5, max_size=4096, symlinks=1, seed=7))
+    return root, stats
+
+def touch(path: Path, size: int=0) -> Path:
+    """
+    Create a file and its parents with a given size
+    """
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(b"x" * size)
+    return path
+
+__all__ = ["Run", "touch"]
@@ -0,0 +1,34 @@
+#!/usr/bin/python3
+from os import environ
+from pathlib import Path
+from subprocess import run
+from sys import executable
+import pytest
+from ..api import scan
+from ..benchmarks.tree import TreeStats
+from ..enums import FileType
+
+PACKAGE = __package__.rsplit(".", 1)[0]
+ROOT    = str(Path(__file__).resolve().parents[2])
+
+def test_scan_gives_the_command_line_totals(tree: tuple[Path, TreeStats], many) -> None:
+    root, spec = tree
+    result = scan([root], ["*.txt", "*"], recursive=True)
+    assert result[f"{root}/*"] == spec.dirs - 1 + spec.files
+    assert result[f"{root}/*.txt"] == spec.files
+    assert str(result.total) == many("-rn", str(root), "*.txt", "*").out.strip()
+    assert scan([root], recursive=True, size=True).total == spec.size
+    assert scan([root], recursive=True, ftype=FileType.LINK).total == spec.symlinks
+
+def test_scan_refuses_what_is_not_a_directory(tmp_path: Path) -> None:
+    (tmp_path / "file").touch()
+    with pytest.raises(NotADirectoryError):
+        scan([tmp_path / "file"])
+    with pytest.raises(KeyError):
+        scan([tmp_path])[f"{tmp_path}/*.pdf"]
+
+def test_library_does_not_import_the_command_line(tmp_path: Path) -> None:
+    code = f"import sys, {PACKAGE}; {PACKAGE}.scan(['.']); print(' '.join(i for i in ('argparse', 'colorama') if i in sys.modules))"
+    proc = run([executable, "-c", code], cwd=tmp_path, env=dict(environ, PYTHONPATH=ROOT), capture_output=True, text=True)
+    assert proc.returncode == 0, proc.stderr
+    assert proc.stdout.strip() == ""
@@ -0,0 +1,56 @@
+#!/usr/bin/python3
+from io import BytesIO
+from json import loads
+from pathlib import Path
+from tarfile import TarInfo, open as taropen
+from zipfile import ZipFile
+import pytest
+from ..benchmarks.startup import PACKAGE, importtime
+from ..benchmarks.tree import TreeStats
+from .conftest import touch
+
+MEMBERS = {"a.txt": 10, "docs/b.txt": 200, "docs/deep/c.log": 3000}
+
+@pytest.fixture
+def archives(tmp_path: Path) -> Path:
+    root = tmp_path / "root"
+    touch(root / "plain.txt", 5)
+    for name, mode in (("one.tar", "w"), ("two.tar.gz", "w:gz")):
+        with taropen(root / name, mode) as tar:
+            for member, size in MEMBERS.items():
+                info = TarInfo(member)
+                info.size = size
+                tar.addfile(info, BytesIO(b"x" * size))
+    (root / "sub").mkdir()
+    with ZipFile(root / "sub" / "three.zip", "w") as zip:
+        for member, size in MEMBERS.items():
+            zip.writestr(member, b"x" * size)
+    (root / "bad.zip").write_bytes(b"PK not really")
+    return root
+
+def test_members_are_counted_and_sized(archives: Path, many) -> None:
+    root = archives
+    assert many("-rna", str(root), "*.txt").out == "1\n"
+    assert many("-rna", "--archives", str(root), "*.txt").out == f"{1 + 3 * 2}\n"
+    assert many("-rny", "--archives", str(root), "*.log").out == f"{3 * 3000}\n"
+    assert many("-rny", "--archives", str(root), "*.txt").out == f"{5 + 3 * 210}\n"
+
+def test_bad_archives_are_plain_files(archives: Path, many) -> None:
+    stats = loads(many("-rna", "--archives", "--stats-format", "json", str(archives)).err)
+    assert stats["archives"] == 3 and stats["bad_archives"] == 1
+
+@pytest.mark.parametrize("extra", [["-j", "4"], ["-P", "2"], ["--cache"]])
+def test_workers_and_cache_agree(archives: Path, many, extra: list[str]) -> None:
+    serial = many("-rny", "--archives", str(archives), "*.txt", "*.log")
+    assert many("-rny", "--archives", *extra, str(archives), "*.txt", "*.log") == serial
+
+def test_archives_need_recursion(archives: Path, many) -> None:
+    assert many("-n", "--archives", str(archives)).code == 1
+
+def test_the_module_is_only_imported_with_archives(tree: tuple[Path, TreeStats]) -> None:
+    root, _ = tree
+    for args in (["-r", "-y", str(root)], ["-r", "--cache", str(root), "*.txt"]):
+        _, modules = importtime(["-m", PACKAGE, *args], str(root))
+        assert f"{PACKAGE}.archives" not in modules
+    _, modules = importtime(["-m", PACKAGE, "-r", "--archives", str(root)], str(root))
+    assert f"{PACKAGE}.archives" in modules
@@ -0,0 +1,73 @@
+#!/usr/bin/python3
+from io import StringIO
+from json import dumps, loads
+from pathlib import Path
+from ..batch import Batch, Query
+from ..benchmarks.tree import TreeStats
+from ..enums import FileType
+from ..mainclass import ArgvContainer
+from .conftest import touch
+
+def base() -> ArgvContainer:
+    return ArgvContainer(ftype=FileType.FILE | FileType.DIR, size=None, auto=False, follow=False, blank=True, recr=False, separate=False)
+
+def answers(lines: list[str]) -> tuple[list[dict], int]:
+    batch = Batch(base())
+    out   = StringIO()
+    wrong = batch.run(batch.read(lines), out, verbose=False)
+    return [loads(i) for i in out.getvalue().splitlines()], wrong
+
+def test_malformed_query_between_valid_ones(tmp_path: Path) -> None:
+    touch(tmp_path / "a.txt", 10)
+    touch(tmp_path / "b.txt", 20)
+    valid = dumps({"id": 1, "roots": [str(tmp_path)], "filters": ["*.txt"]})
+    for wrong in ({"id": 2, "ftype": 3}, {"id": 2, "size": ["MB"]}, {"id": 2, "roots": 5}, {"id": 2, "filters": [1]},
+                  {"id": 2, "recursive": "yes"}, {"id": 2, "roots": ["a\0b"]}, {"id": 2, "colour": True}):
+        result, errors = answers([valid, dumps(wrong), valid.replace('"id": 1', '"id": 3')])
+        assert errors == 1
+        assert [i["id"] for i in result] == [1, 2, 3]
+        assert result[0]["total"] == result[2]["total"] == 2
+        assert set(result[1]) == {"id", "error"}
+
+def test_invalid_json_and_non_object(tmp_path: Path) -> None:
+    result, errors = answers(["{", "[1, 2]", dumps({"id": "x", "roots": str(tmp_path)})])
+    assert errors == 2
+    assert "invalid JSON" in result[0]["error"]
+    assert result[2] == {"id": "x", "filters": [{"path": str(tmp_path), "filter": "*", "total": 0}], "total": 0}
+
+def test_missing_root_is_a_query_error(tmp_path: Path) -> None:
+    query = Query.fromjson(0, dumps({"roots": [str(tmp_path / "gone")]}), base())
+    assert query.argvcont is None and "not found" in query.error
+
+def test_queries_share_a_search(tmp_path: Path) -> None:
+    touch(tmp_path / "sub" / "a.pdf", 100)
+    touch(tmp_path / "b.pdf", 50)
+    lines = [
+        dumps({"id": 1, "roots": [str(tmp_path)], "filters": ["*.pdf"], "recursive": True, "size": "B"}),
+        dumps({"id": 2, "roots": [str(tmp_path / "sub")], "filters": ["*.pdf"], "recursive": True, "size": "B"}),
+        dumps({"id": 3, "roots": [str(tmp_path)], "filters": ["*.pdf"]}),
+    ]
+    result, errors = answers(lines)
+    assert errors == 0
+    assert [i["total"] for i in result] == [150, 100, 1]
+
+def test_command_line_exit_status(tmp_path: Path, many) -> None:
+    touch(tmp_path / "a.txt")
+    queries = tmp_path / "queries.ndjson"
+    queries.write_text(dumps({"id": 1, "roots": [str(tmp_path)]}) + "\n" + dumps({"id": 2, "ftype": 3}) + "\n")
+    run = many("--batch", str(queries))
+    assert run.code == 1
+    assert [loads(i)["id"] for i in run.out.splitlines()] == [1, 2]
+
+def test_answers_are_the_command_line_totals(tree: tuple[Path, TreeStats], many) -> None:
+    root, _ = tree
+    queries = [
+        ({"roots": [str(root)], "filters": ["*.txt", "file1*"], "recursive": True}, ["-rn", str(root), "*.txt", "file1*"]),
+        ({"roots": [str(root / "dir0")], "recursive": True, "size": "B"}, ["-rny", str(root / "dir0")]),
+        ({"roots": [str(root)], "ftype": "l", "recursive": True}, ["-rnl", str(root)]),
+        ({"roots": [str(root / "dir1")]}, ["-n", str(root / "dir1")]),
+    ]
+    result, errors = answers([dumps(query) for query, _ in queries])
+    assert errors == 0
+    for answer, (_, args) in zip(result, queries):
+        assert f"{answer['total']}\n" == many(*args).out
@@ -0,0 +1,43 @@
+#!/usr/bin/python3
+from json import loads
+from os import utime, walk
+from pathlib import Path
+from time import time
+import pytest
+from ..benchmarks.tree import TreeStats
+from .conftest import touch
+
+def age(root: Path) -> None:
+    """
+    Move the mtimes of the directories an hour back, the cache does not store the ones changed while it runs
+    """
+    past = time() - 3600
+    for path, _, _ in walk(root):
+        utime(path, (past, past))
+
+@pytest.mark.parametrize("flags", ["-rn", "-rnl", "-rny"])
+def test_cached_totals_are_the_serial_ones(tree: tuple[Path, TreeStats], many, flags: str) -> None:
+    root, _ = tree
+    age(root)
+    serial = many(flags, str(root), "*.txt", "file4*")
+    for extra in (["--cache"], ["--cache"], ["--cache", "-j", "4"], ["--cache", "-P", "2"]):
+        assert many(flags, *extra, str(root), "*.txt", "file4*") == serial
+
+def test_warm_cache_lists_nothing(tree: tuple[Path, TreeStats], many) -> None:
+    root, spec = tree
+    age(root)
+    cold = many("-rn", "--cache", "--stats-format", "json", str(root))
+    warm = many("-rn", "--cache", "--stats-format", "json", str(root))
+    assert loads(cold.err)["dirs"] == spec.dirs
+    assert loads(warm.err)["dirs"] == 0
+    assert warm.out == cold.out
+
+def test_changed_directories_are_listed_again(tree: tuple[Path, TreeStats], many) -> None:
+    root, spec = tree
+    age(root)
+    many("-rn", "--cache", str(root))
+    touch(root / "dir1" / "dir2" / "new.txt")
+    run = many("-rn", "--cache", "--stats-format", "json", str(root))
+    assert run.out == f"{spec.dirs - 1 + spec.files + 1}\n"
+    assert loads(run.err)["dirs"] == 1
+    assert many("-rn", "--verify-cache", str(root)).code == 0
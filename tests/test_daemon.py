@@ -0,0 +1,104 @@
+#!/usr/bin/python3
+from errno import EADDRINUSE, EEXIST
+from os import environ, unlink
+from pathlib import Path
+from shutil import rmtree
+from signal import SIGTERM
+from socket import socket, AF_UNIX, SOCK_STREAM
+from subprocess import Popen, DEVNULL
+from sys import executable
+from time import monotonic, sleep
+from typing import Any, Callable
+import pytest
+from ..api import scan
+from ..benchmarks.tree import TreeStats
+from ..daemon import Daemon, query
+from ..enums import FileType
+from ..mainclass import ArgvContainer, NoDir
+from .conftest import touch
+
+PACKAGE = __package__.rsplit(".", 1)[0]
+ROOT    = str(Path(__file__).resolve().parents[2])
+
+def daemon(root: Path, socket_path: Path) -> Daemon:
+    argvcont = ArgvContainer(ftype=FileType.FILE | FileType.DIR, size=None, auto=False, follow=False, blank=True, recr=True, separate=False)
+    return Daemon(argvcont.parse([str(root), "*.txt"]), str(socket_path))
+
+def wait(check: Callable[[], Any], seconds: float=10) -> Any:
+    deadline = monotonic() + seconds
+    while True:
+        try:
+            value = check()
+            if value:
+                return value
+        except OSError:
+            pass
+        if monotonic() > deadline:
+            raise TimeoutError
+        sleep(0.05)
+
+def test_regular_file_is_not_replaced(tmp_path: Path) -> None:
+    path = touch(tmp_path / "many.sock", 3)
+    with pytest.raises(OSError) as err:
+        daemon(tmp_path, path).reclaim()
+    assert err.value.errno == EEXIST
+    assert path.read_bytes() == b"xxx"
+
+def test_stale_socket_is_reclaimed_and_live_one_kept(tmp_path: Path) -> None:
+    path = tmp_path / "many.sock"
+    with socket(AF_UNIX, SOCK_STREAM) as stale:
+        stale.bind(str(path))
+    daemon(tmp_path, path).reclaim()
+    assert not path.exists()
+    with socket(AF_UNIX, SOCK_STREAM) as live:
+        live.bind(str(path))
+        live.listen()
+        with pytest.raises(OSError) as err:
+            daemon(tmp_path, path).reclaim()
+        assert err.value.errno == EADDRINUSE
+    assert path.exists()
+    unlink(path)
+
+def test_updates_replace_the_contribution_of_a_directory(tree: tuple[Path, TreeStats], tmp_path: Path) -> None:
+    root, _ = tree
+    live = daemon(root, tmp_path / "many.sock")
+    live.crawl(0, str(root))
+    assert live.totals == dict(scan([root], ["*.txt"], recursive=True).totals)
+    rmtree(root / "dir0")
+    touch(root / "dir1" / "new.txt")
+    for path in (root, root / "dir1", root / "dir0"):
+        live.update(0, str(path))
+    assert live.plan.errors == 0
+    assert live.totals == dict(scan([root], ["*.txt"], recursive=True).totals)
+
+def test_the_socket_is_not_taken_from_the_roots(tree: tuple[Path, TreeStats]) -> None:
+    root, _ = tree
+    argvcont = ArgvContainer.parse_args(["-rn", "--serve", str(root), "*.txt"])
+    assert argvcont.serve and argvcont.daemon_socket is None
+    assert list(argvcont) == [NoDir(root, "*.txt")]
+    argvcont = ArgvContainer.parse_args(["--query", "--daemon-socket", "/tmp/x.sock", "-n"])
+    assert argvcont.query and argvcont.daemon_socket == "/tmp/x.sock"
+
+def test_serve_and_query(tree: tuple[Path, TreeStats], tmp_path: Path) -> None:
+    root, _ = tree
+    path = str(tmp_path / "many.sock")
+    env  = dict(environ, PYTHONPATH=ROOT)
+    proc = Popen([executable, "-m", PACKAGE, "-rn", "--serve", "--daemon-socket", path, str(root), "*.txt"], env=env, stdout=DEVNULL, stderr=DEVNULL)
+    try:
+        expected = scan([root], ["*.txt"], recursive=True).total
+        assert wait(lambda: query(path)["filters"])[0]["total"] == expected
+        touch(root / "dir2" / "dir0" / "new.txt")
+        assert wait(lambda: query(path)["filters"][0]["total"] == expected + 1)
+        # ? A client sending nothing and one sending a byte at a time do not hold the others back
+        with socket(AF_UNIX, SOCK_STREAM) as silent, socket(AF_UNIX, SOCK_STREAM) as slow:
+            silent.connect(path)
+            slow.connect(path)
+            for byte in b'{"cmd"':
+                slow.send(bytes([byte]))
+                start = monotonic()
+                assert query(path)["filters"][0]["total"] == expected + 1
+                assert monotonic() - start < 1
+    finally:
+        proc.send_signal(SIGTERM)
+        assert proc.wait(10) == 0
+    assert not Path(path).exists()
@@ -0,0 +1,41 @@
+#!/usr/bin/python3
+from pathlib import Path
+from ..benchmarks.tree import TreeStats
+from ..enums import FileType, Size
+from ..estimate import Estimator
+from ..mainclass import ArgvContainer
+from ..planner import QueryPlan
+from .conftest import touch
+
+def plan(*args: str, size: bool=False) -> QueryPlan:
+    argvcont = ArgvContainer(ftype=FileType.FILE, size=Size.B if size else None, auto=False, follow=False, blank=True, recr=True, separate=False)
+    return QueryPlan(argvcont.parse(list(args)))
+
+def test_fully_listed_tree_is_exact(tree: tuple[Path, TreeStats]) -> None:
+    root, spec = tree
+    estimate = Estimator(plan(str(root), "*.txt"), seed=1).run(verbose=False)
+    assert (estimate.total, estimate.margin, estimate.dirs) == (spec.files, 0, spec.dirs)
+
+def test_uniform_tree_is_estimated_from_a_few_probes(tree: tuple[Path, TreeStats]) -> None:
+    root, spec = tree
+    estimate = Estimator(plan(str(root), "*.txt"), dirs=8, seed=1).run(verbose=False)
+    assert estimate.dirs < spec.dirs
+    assert estimate.total == spec.files
+
+def test_interval_holds_the_true_total(tmp_path: Path) -> None:
+    for i in range(30):
+        for j in range(i % 7):
+            touch(tmp_path / f"d{i}" / f"e{j % 3}" / f"f{j}.bin", 100 * j)
+    exact = plan(str(tmp_path), size=True).run(verbose=False)
+    truth = sum(exact.values())
+    hits  = 0
+    for seed in range(20):
+        estimate = Estimator(plan(str(tmp_path), size=True), dirs=40, seed=seed).run(verbose=False)
+        hits += abs(estimate.total - truth) <= estimate.margin
+    assert hits >= 15
+
+def test_command_line(tree: tuple[Path, TreeStats], many) -> None:
+    root, spec = tree
+    assert many("-rn", "--estimate", str(root), "*.txt").out == f"{spec.files}\n"
+    run = many("-r", "--estimate", "--estimate-dirs", "8", str(root), "*.txt")
+    assert run.code == 0 and run.out.startswith(f"~{spec.files} ±0")
@@ -0,0 +1,32 @@
+#!/usr/bin/python3
+from json import loads
+from pathlib import Path
+import pytest
+from ..benchmarks.tree import TreeSpec, generate
+from .conftest import touch
+
+@pytest.fixture
+def loops(tmp_path: Path) -> tuple[Path, int]:
+    """
+    A tree with a symbolic link to the parent in every directory, the one of the root goes to a directory holding only the tree
+    """
+    root = tmp_path / "outer" / "tree"
+    root.mkdir(parents=True)
+    return root, generate(str(root), TreeSpec(width=2, depth=2, files=2, loops=1, seed=1)).dirs
+
+def test_every_directory_is_walked_once(loops: tuple[Path, int], many) -> None:
+    root, dirs = loops
+    run = many("-rnf", "--stats-format", "json", str(root))
+    stats = loads(run.err)
+    assert stats["dirs"] == dirs + 1
+    assert stats["loops"] == dirs
+    for extra in (["-j", "4"], ["-P", "2"]):
+        assert many("-rnf", *extra, str(root)).out == run.out
+
+def test_directory_reached_through_several_links_is_counted_once(tmp_path: Path, many) -> None:
+    touch(tmp_path / "data" / "a.txt")
+    touch(tmp_path / "data" / "b.txt")
+    (tmp_path / "one").symlink_to("data")
+    (tmp_path / "two").symlink_to("data")
+    assert many("-rnfa", str(tmp_path), "*.txt").out == "2\n"
+    assert many("-rna", str(tmp_path), "*.txt").out == "2\n"
@@ -0,0 +1,56 @@
+#!/usr/bin/python3
+from os import scandir
+from pathlib import Path
+import pytest
+from ..benchmarks.tree import TreeStats
+from ..enums import FileType
+from ..groups import SPACE_FACTOR, GroupTable
+from ..mainclass import ArgvContainer
+from .conftest import touch
+
+def rows(out: str) -> dict[str, list[str]]:
+    return {key: values for key, *values in (i.split("\t") for i in out.splitlines())}
+
+def test_count_has_no_size_column(tree: tuple[Path, TreeStats], many) -> None:
+    root, spec = tree
+    assert rows(many("-rn", "--group-by", "ext", str(root)).out) == {"txt": [str(spec.files)], "": [str(spec.dirs - 1)]}
+    table = many("-r", "--group-by", "ext", str(root)).out.splitlines()
+    assert table[0].split() == ["ext", "count"]
+    assert "B" not in "".join(table[1:])
+
+def test_sizes_are_summed_by_group(tree: tuple[Path, TreeStats], many) -> None:
+    root, spec = tree
+    assert rows(many("-rny", "--group-by", "type", str(root)).out) == {"file": [str(spec.files), str(spec.size)]}
+    assert many("-r", "-y", "--group-by", "type", str(root)).out.splitlines()[0].split() == ["type", "count", "size"]
+
+def test_depth_and_top(tree: tuple[Path, TreeStats], many) -> None:
+    root, _ = tree
+    assert rows(many("-rna", "--group-by", "depth", str(root)).out) == {"1": ["5"], "2": ["15"], "3": ["45"], "4": ["135"]}
+    top = rows(many("-rn", "--group-by", "dir", "--top", "2", str(root)).out)
+    assert list(top.values()) == [["8"], ["8"]]
+
+@pytest.mark.parametrize("key", ["ext", "type", "owner", "depth", "dir"])
+def test_jobs_give_the_serial_table(tree: tuple[Path, TreeStats], many, key: str) -> None:
+    root, _ = tree
+    serial = sorted(many("-rny", "--group-by", key, str(root)).out.splitlines())
+    assert sorted(many("-rny", "-j", "4", "--group-by", key, str(root)).out.splitlines()) == serial
+
+def test_top_bounds_the_rows_of_any_key(tmp_path: Path, many) -> None:
+    # ? Rotated logs, every one has its own extension
+    for i in range(200):
+        touch(tmp_path / f"app.log.{i}")
+    for i in range(50):
+        touch(tmp_path / f"data{i}.csv")
+        touch(tmp_path / f"page{i}.html")
+    argvcont = ArgvContainer(ftype=FileType.FILE, size=None, auto=False, follow=False, blank=True, recr=False, separate=False)
+    table = GroupTable("ext", top=2)
+    with scandir(tmp_path) as it:
+        entries = sorted(it, key=lambda i: i.name)
+    for n in range(0, len(entries), 7):
+        table.add(argvcont, str(tmp_path), str(tmp_path), entries[n:n + 7])
+    assert len(table.rows) <= 2 * SPACE_FACTOR and not table.exact
+    assert [key for key, _, _ in table.result()] in (["csv", "html"], ["html", "csv"])
+    run = many("-rna", "--group-by", "ext", "--top", "2", str(tmp_path))
+    assert sorted(rows(run.out)) == ["csv", "html"]
+    assert "warning" in run.err
+    assert "warning" not in many("-rna", "--group-by", "ext", "--top", "30", str(tmp_path)).err
@@ -0,0 +1,54 @@
+#!/usr/bin/python3
+from json import loads
+from os import link
+from pathlib import Path
+from ..inodes import InodeSet, InodeTable
+from .conftest import touch
+
+def test_inode_set_grows_and_keeps_everything() -> None:
+    inodes = InodeSet(capacity=4)
+    assert all(inodes.add(i % 3, i) for i in range(1, 5001))
+    assert not any(inodes.add(i % 3, i) for i in range(1, 5001))
+    assert inodes.add(0, 0) and not inodes.add(0, 0)
+    assert len(inodes) == 5000
+    assert (1, 4000) in inodes and (2, 4000) not in inodes
+
+def test_inode_table_counts_the_duplicates() -> None:
+    table = InodeTable()
+    assert table.add(1, 10) and table.add(2, 10) and not table.add(1, 10)
+    assert table.duplicates == 1
+
+def test_hard_links_are_counted_once_in_every_root(tmp_path: Path, many) -> None:
+    data = touch(tmp_path / "a" / "data.txt", 1000)
+    link(data, tmp_path / "a" / "copy.log")
+    link(data, tmp_path / "b.txt")
+    assert many("-rny", str(tmp_path), "*.txt").out == "2000\n"
+    assert many("-rny", "--dedupe-inodes", str(tmp_path), "*.txt").out == "1000\n"
+    # ? The first link reached takes the file, for every filter it matches, the other filters get nothing
+    run = many("-r", "-y", "-s", "--dedupe-inodes", str(tmp_path / "a"), "*.txt", "*.log")
+    assert "1000 B" in run.out and "0 bytes" in run.err
+    stats = loads(many("-rny", "--dedupe-inodes", "--stats-format", "json", str(tmp_path)).err)
+    assert stats["hardlinks"] == 2
+    for extra in (["-j", "4"], ["-P", "2"]):
+        assert many("-rny", "--dedupe-inodes", *extra, str(tmp_path)).out == "1000\n"
+
+def test_hard_links_are_counted_once_across_roots(tmp_path: Path, many) -> None:
+    # ? Two snapshots like rsync --link-dest, the second one links the unchanged files of the first one
+    touch(tmp_path / "b" / "new", 10000)
+    for name, size in (("one", 5000), ("two", 10000)):
+        link(touch(tmp_path / "a" / name, size), tmp_path / "b" / name)
+    a, b = str(tmp_path / "a"), str(tmp_path / "b")
+    assert many("-rny", "--", a, b).out == "40000\n"
+    for extra in ([], ["-j", "4"], ["-P", "2"]):
+        assert many("-rny", "--dedupe-inodes", *extra, "--", a, b).out == "25000\n"
+    stats = loads(many("-rny", "--dedupe-inodes", "--stats-format", "json", "--", a, b).err)
+    assert stats["hardlinks"] == 2
+
+def test_disk_usage_sums_the_allocated_blocks(tmp_path: Path, many) -> None:
+    sparse = tmp_path / "sparse"
+    with open(sparse, "wb") as file:
+        file.truncate(1 << 20)
+    touch(tmp_path / "full", 1000)
+    blocks = sum(i.stat().st_blocks * 512 for i in tmp_path.iterdir())
+    assert many("-rny", "--disk-usage", str(tmp_path)).out == f"{blocks}\n"
+    assert many("-rny", str(tmp_path)).out == f"{(1 << 20) + 1000}\n"
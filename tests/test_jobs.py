@@ -0,0 +1,28 @@
+#!/usr/bin/python3
+from pathlib import Path
+import pytest
+from ..benchmarks.tree import TreeStats
+from ..walker import Walker
+
+@pytest.mark.parametrize("flags", ["-rn", "-rna", "-rnl", "-rny", "-rnfy"])
+def test_jobs_give_the_serial_totals(tree: tuple[Path, TreeStats], many, flags: str) -> None:
+    root, _ = tree
+    serial = many(flags, str(root), "*.txt", "file2*")
+    assert serial.code == 0
+    for jobs in ("2", "8"):
+        assert many(flags, "-j", jobs, str(root), "*.txt", "file2*") == serial
+
+def test_directories_gone_while_walked_are_reported(tmp_path: Path) -> None:
+    errors: list[OSError] = []
+    walker = Walker(str(tmp_path), onerror=errors.append)
+    (tmp_path / "file").touch()
+    assert walker.listdir(str(tmp_path / "gone")) == []
+    assert walker.listdir(str(tmp_path / "file")) == []
+    assert [type(i) for i in errors] == [FileNotFoundError, NotADirectoryError]
+
+def test_workers_report_the_errors(tmp_path: Path) -> None:
+    errors:  list[OSError] = []
+    visited: list[str] = []
+    Walker(str(tmp_path / "gone"), recursive=True, onerror=errors.append).parallel(4, lambda wid, path, entries: visited.append(path))
+    assert visited == [str(tmp_path / "gone")]
+    assert [type(i) for i in errors] == [FileNotFoundError]
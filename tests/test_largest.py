@@ -0,0 +1,30 @@
+#!/usr/bin/python3
+from os import walk
+from pathlib import Path
+from ..benchmarks.tree import TreeStats
+
+def sizes(root: Path) -> tuple[list[tuple[int, str]], list[tuple[int, str]]]:
+    files, dirs = [], []
+    for path, _, names in walk(root):
+        files.extend((Path(path, i).lstat().st_size, str(Path(path, i))) for i in names if not Path(path, i).is_symlink())
+    for path, _, _ in walk(root):
+        dirs.append((sum(size for size, file in files if file.startswith(path + "/")), path))
+    return sorted(files, reverse=True), sorted(dirs, reverse=True)
+
+def test_largest_files_and_directories(tree: tuple[Path, TreeStats], many) -> None:
+    root, spec = tree
+    files, dirs = sizes(root)
+    out = many("-rny", "--largest-files", "5", "--largest-dirs", "4", str(root)).out.splitlines()
+    assert out[0] == str(spec.size)
+    largest = [(int(size), path) for size, path in (i.split("\t") for i in out[1:])]
+    assert [i[0] for i in largest[:5]] == [i[0] for i in files[:5]]
+    assert largest[5:] == dirs[:4]
+
+def test_jobs_give_the_same_heaps(tree: tuple[Path, TreeStats], many) -> None:
+    root, _ = tree
+    serial = many("-rny", "--largest-files", "10", "--largest-dirs", "10", str(root))
+    assert many("-rny", "-j", "4", "--largest-files", "10", "--largest-dirs", "10", str(root)).out == serial.out
+
+def test_largest_needs_a_size_flag(tree: tuple[Path, TreeStats], many) -> None:
+    root, _ = tree
+    assert many("-rn", "--largest-files", "3", str(root)).code == 1
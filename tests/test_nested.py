@@ -0,0 +1,46 @@
+#!/usr/bin/python3
+from dataclasses import replace
+from json import dumps, loads
+from pathlib import Path
+from ..api import scan
+from ..benchmarks.tree import TreeStats
+from ..enums import FileType
+from ..mainclass import ArgvContainer
+from ..planner import QueryPlan
+
+def plan(*args: str) -> QueryPlan:
+    argvcont = ArgvContainer(ftype=FileType.FILE, size=None, auto=False, follow=False, blank=True, recr=True, separate=False)
+    return QueryPlan(argvcont.parse(list(args)))
+
+def test_nested_and_repeated_roots_are_walked_once(tree: tuple[Path, TreeStats], many) -> None:
+    root, spec = tree
+    run = many("-rna", "--stats-format", "json", str(root), str(root / "dir0"), str(root / "dir0" / ".." / "dir0"))
+    assert run.out == f"{spec.files}\n"
+    assert loads(run.err)["dirs"] == spec.dirs
+    result = scan([root, root / "dir0"], ["*.txt"], recursive=True)
+    assert result[f"{root / 'dir0'}/*.txt"] == 65
+    assert result.total == spec.files
+    separate = many("-r", "-s", str(root), str(root / "dir0"), "*.txt").out
+    assert "65 files" in separate and f"{spec.files} files" in separate
+
+def test_roots_that_cannot_be_stated_get_their_own_group(tmp_path: Path) -> None:
+    (tmp_path / "a").mkdir()
+    gone = plan(str(tmp_path / "a"))
+    gone.argvcont._filters.add(replace(next(iter(gone.argvcont)), _path=tmp_path / "gone"))
+    assert sorted(map(str, gone.groups())) == [str(tmp_path / "a"), str(tmp_path / "gone")]
+    assert sum(gone.run(verbose=False).values()) == 0
+
+def test_depth_limits_refuse_a_combined_total(tree: tuple[Path, TreeStats], many) -> None:
+    root, _ = tree
+    for rule in (["--max-depth", "1"], ["--exclude", "/dir1"]):
+        run = many("-rn", *rule, str(root), str(root / "dir0"))
+        assert run.code == 1 and "count its files twice" in run.err
+    assert many("-rn", "--exclude", "dir1", str(root), str(root / "dir0")).code == 0
+    assert many("-r", "-s", "--max-depth", "1", str(root), str(root / "dir0"), "*.txt").code == 0
+
+def test_batch_refuses_a_combined_total_too(tree: tuple[Path, TreeStats], many, tmp_path: Path) -> None:
+    root, _ = tree
+    queries = tmp_path / "queries.ndjson"
+    queries.write_text(dumps({"roots": [str(root), str(root / "dir0")], "recursive": True}) + "\n")
+    run = many("--max-depth", "1", "--batch", str(queries))
+    assert run.code == 1 and "is inside" in loads(run.out)["error"]
@@ -0,0 +1,42 @@
+#!/usr/bin/python3
+from csv import DictReader
+from io import StringIO
+from json import loads
+from os import fsdecode
+from pathlib import Path
+import pytest
+from ..benchmarks.tree import TreeStats
+from ..output import csv_field
+
+def records(format: str, out: str) -> list[dict]:
+    if format == "json":
+        document = loads(out)
+        return [dict(i, kind="dir") for i in document["dirs"]] + [dict(i, kind="filter") for i in document["filters"]] + \
+            [{"kind": "total", "total": document["total"]}]
+    if format == "ndjson":
+        return [loads(i) for i in out.splitlines()]
+    return [dict(i, total=int(i["total"])) for i in DictReader(StringIO(out))]
+
+@pytest.mark.parametrize("format", ["json", "ndjson", "csv"])
+def test_dir_records_add_up_to_the_totals(tree: tuple[Path, TreeStats], many, format: str) -> None:
+    root, spec = tree
+    for extra in ([], ["-j", "4"]):
+        lines = records(format, many("-r", "-y", "--format", format, "--per-dir", *extra, str(root), "*.txt", "file1*").out)
+        dirs  = [i for i in lines if i["kind"] == "dir"]
+        assert len({i["path"] for i in dirs}) == spec.dirs
+        filters = {i["filter"]: i["total"] for i in lines if i["kind"] == "filter"}
+        for filter, total in filters.items():
+            assert total == sum(i["total"] for i in dirs if i["filter"] == filter)
+        assert filters["*.txt"] == spec.size
+        assert lines[-1]["total"] == sum(filters.values())
+
+def test_undecodable_names(tmp_path: Path, many) -> None:
+    name = fsdecode(b"caf\xe9,1.txt")
+    (tmp_path / name).touch()
+    assert csv_field(name) == '"caf\\xe9,1.txt"'
+    assert csv_field("plain") == "plain" and csv_field('say "hi"') == '"say ""hi"""'
+    for format in ("json", "ndjson", "csv"):
+        run = many("-r", "--format", format, "--per-dir", str(tmp_path), name)
+        assert run.code == 0
+        run.out.encode("utf-8")
+    assert loads(many("-r", "--format", "ndjson", str(tmp_path), name).out.splitlines()[0])["filter"] == name
@@ -0,0 +1,26 @@
+#!/usr/bin/python3
+from json import loads
+from pathlib import Path
+import pytest
+from ..benchmarks.tree import TreeStats
+
+@pytest.mark.parametrize("pattern", ["dir*/dir1/*.txt", "**/file1.txt", "dir0/**/*.txt", "*/*/dir2/file[0-2].txt", "dir?/dir0"])
+def test_path_patterns_match_like_path_glob(tree: tuple[Path, TreeStats], many, pattern: str) -> None:
+    root, _ = tree
+    expected = sum(1 for i in root.glob(pattern) if not i.is_symlink())
+    for extra in ([], ["-j", "4"]):
+        assert many("-n", *extra, f"{root}/{pattern}").out == f"{expected}\n"
+
+def test_only_the_directories_that_can_match_are_listed(tree: tuple[Path, TreeStats], many) -> None:
+    root, _ = tree
+    run = many("-n", "--stats-format", "json", f"{root}/dir0/*/file1.txt")
+    assert run.out == "3\n"
+    assert loads(run.err)["dirs"] == 4
+
+def test_a_trailing_double_star_matches_everything_below(tree: tuple[Path, TreeStats], many) -> None:
+    root, spec = tree
+    below = [i for i in (root / "dir0").rglob("*") if not i.is_symlink()]
+    assert many("-n", f"{root}/dir0/**").out == f"{len(below)}\n" == "77\n"
+    assert many("-nd", f"{root}/dir0/**").out == f"{sum(1 for i in below if i.is_dir())}\n" == "12\n"
+    # ? Not the directory itself and not once per walked directory like Path.glob
+    assert many("-rn", f"{root}/**").out == many("-rn", str(root)).out == f"{spec.dirs - 1 + spec.files}\n"
@@ -0,0 +1,34 @@
+#!/usr/bin/python3
+from json import loads
+from pathlib import Path
+from ..api import scan
+from ..benchmarks.tree import TreeStats
+from ..stats import Stats
+
+FILTERS = ["*.txt", "file1*", "link*", "*"]
+
+def test_a_root_is_walked_once_for_all_its_filters(tree: tuple[Path, TreeStats]) -> None:
+    root, spec = tree
+    stats  = Stats()
+    result = scan([root], FILTERS, recursive=True, stats=stats)
+    assert stats.dirs == spec.dirs
+    for filter in FILTERS:
+        assert result[f"{root}/{filter}"] == scan([root], [filter], recursive=True).total
+
+def test_a_match_counts_for_every_filter_it_matches(tree: tuple[Path, TreeStats]) -> None:
+    root, spec = tree
+    result = scan([root], ["*.txt", "file*"], recursive=True, size=True)
+    assert result[f"{root}/*.txt"] == result[f"{root}/file*"] == spec.size
+    assert result.total == 2 * spec.size
+
+def test_every_path_through_the_matching_loop_agrees(tree: tuple[Path, TreeStats], many) -> None:
+    root, _ = tree
+    for base in (["-rn"], ["-rny"], ["-rny", "--min-size", "1K"], ["-rn", "--dedupe-inodes"]):
+        expected = many(*base, str(root), "*.txt").out
+        # ? The plain sum, the timed one, the threaded one, the per directory records and the group by table
+        for extra in (["--stats"], ["-j", "4"], ["--limit", str(10 ** 12)]):
+            assert many(*base, *extra, str(root), "*.txt").out == expected
+        records = many(*base, "--format", "ndjson", "--per-dir", str(root), "*.txt").out.splitlines()
+        assert loads(records[-1])["total"] == int(expected)
+        groups = many(*base, "--group-by", "type", str(root), "*.txt").out.split()
+        assert groups[-1] == expected.strip()
@@ -0,0 +1,42 @@
+#!/usr/bin/python3
+from os import chmod, getgid, getuid, utime
+from pathlib import Path
+from time import time
+from .conftest import touch
+
+def files(root: Path) -> None:
+    now = time()
+    for name, size, days, mode in (("a", 10, 1, 0o644), ("b", 2000, 10, 0o600), ("c", 5 << 20, 100, 0o755), ("d", 0, 0, 0o640)):
+        path = touch(root / "sub" / name, size)
+        chmod(path, mode)
+        utime(path, (now - days * 86400 - 60, now - days * 86400 - 60))
+
+def test_sizes(tmp_path: Path, many) -> None:
+    files(tmp_path)
+    assert many("-rna", "--min-size", "1K", str(tmp_path)).out == "2\n"
+    assert many("-rna", "--max-size", "10", str(tmp_path)).out == "2\n"
+    assert many("-rny", "--min-size", "1", "--max-size", "1M", str(tmp_path)).out == "2010\n"
+    assert many("-rn", "--min-size", "2K", "--max-size", "1K", str(tmp_path)).code == 1
+
+def test_times(tmp_path: Path, many) -> None:
+    files(tmp_path)
+    assert many("-rna", "--newer", "7d", str(tmp_path)).out == "2\n"
+    assert many("-rna", "--older", "30d", str(tmp_path)).out == "1\n"
+    assert many("-rna", "--newer", "30d", "--older", "7d", str(tmp_path)).out == "1\n"
+    assert many("-rna", "--time", "ctime", "--older", "7d", str(tmp_path)).out == "0\n"
+
+def test_owners_and_permissions(tmp_path: Path, many) -> None:
+    files(tmp_path)
+    assert many("-rna", "--user", str(getuid()), "--group", str(getgid()), str(tmp_path)).out == "4\n"
+    assert many("-rna", "--user", str(getuid() + 12345), str(tmp_path)).out == "0\n"
+    assert many("-rna", "--perm", "644", str(tmp_path)).out == "1\n"
+    assert many("-rna", "--perm", "-600", str(tmp_path)).out == "4\n"
+    assert many("-rna", "--perm", "/011", str(tmp_path)).out == "1\n"
+
+def test_predicates_stat_once_and_agree_across_jobs(tmp_path: Path, many) -> None:
+    files(tmp_path)
+    serial = many("-rny", "--min-size", "1", "--newer", "50d", "--stats-format", "json", str(tmp_path))
+    assert serial.out == "2010\n"
+    assert '"stat_calls": 4' in serial.err and '"rejected": 2' in serial.err
+    for extra in (["-j", "4"], ["-P", "2"]):
+        assert many("-rny", "--min-size", "1", "--newer", "50d", *extra, str(tmp_path)).out == serial.out
@@ -0,0 +1,39 @@
+#!/usr/bin/python3
+from json import loads
+from pathlib import Path
+import pytest
+from ..benchmarks.tree import TreeStats
+from ..prune import Pruner
+
+@pytest.mark.parametrize("depth", [0, 1, 2, 3, 10])
+def test_max_depth(tree: tuple[Path, TreeStats], many, depth: int) -> None:
+    root, _ = tree
+    assert many("-rna", "--max-depth", str(depth), str(root)).out == f"{5 * sum(3 ** i for i in range(min(depth, 3) + 1))}\n"
+
+def test_exclude_patterns(tree: tuple[Path, TreeStats], many, tmp_path: Path) -> None:
+    root, spec = tree
+    assert many("-rna", "--exclude", "dir*", str(root)).out == "5\n"
+    assert many("-rna", "--exclude", "dir*", "--exclude", "!dir1", str(root)).out == "20\n"
+    assert many("-rna", "--exclude", "dir0/dir1", str(root)).out == f"{spec.files - 20}\n"
+    assert many("-rna", "--exclude", "/dir0", str(root)).out == f"{spec.files - 65}\n"
+    rules = tmp_path / "rules"
+    rules.write_text("# comment\n\n/dir0\n/dir1/\n")
+    assert many("-rna", "--exclude-from", str(rules), str(root)).out == "70\n"
+
+def test_pruned_directories_are_never_listed(tree: tuple[Path, TreeStats], many) -> None:
+    root, _ = tree
+    run = many("-rna", "--stats-format", "json", "--exclude", "/dir2", str(root))
+    stats = loads(run.err)
+    assert stats["dirs"] == 27 and stats["pruned"] == 1
+
+def test_same_device_keeps_everything(tree: tuple[Path, TreeStats], many) -> None:
+    root, _ = tree
+    assert many("-rn", "-x", str(root)).out == many("-rn", str(root)).out
+
+def test_rules(tmp_path: Path) -> None:
+    pruner = Pruner(str(tmp_path), ["build/", "/src/gen"], max_depth=3)
+    assert pruner.prunes(str(tmp_path / "a" / "build"))
+    assert pruner.prunes(str(tmp_path / "src" / "gen"))
+    assert not pruner.prunes(str(tmp_path / "x" / "src" / "gen"))
+    assert not pruner.prunes(str(tmp_path / "a" / "b" / "c"))
+    assert pruner.prunes(str(tmp_path / "a" / "b" / "c" / "d"))
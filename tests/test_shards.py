@@ -0,0 +1,19 @@
+#!/usr/bin/python3
+from pathlib import Path
+import pytest
+from ..benchmarks.tree import TreeStats
+
+@pytest.mark.parametrize("flags", ["-rn", "-rnd", "-rnl", "-rny"])
+def test_processes_give_the_serial_totals(tree: tuple[Path, TreeStats], many, flags: str) -> None:
+    root, _ = tree
+    serial = many(flags, str(root), "*.txt", "file3*")
+    assert serial.code == 0
+    for extra in (["-P", "2"], ["-P", "3", "-j", "2"]):
+        assert many(flags, *extra, str(root), "*.txt", "file3*") == serial
+
+def test_processes_keep_the_roots_apart(tree: tuple[Path, TreeStats], many) -> None:
+    root, _ = tree
+    run = many("-r", "-s", "-P", "2", str(root / "dir0"), str(root / "dir1"), "*.txt")
+    assert run.code == 0
+    assert run.out == many("-r", "-s", str(root / "dir0"), str(root / "dir1"), "*.txt").out
+    assert run.out.count("\n") == 2
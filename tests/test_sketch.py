@@ -0,0 +1,48 @@
+#!/usr/bin/python3
+from pathlib import Path
+from random import Random
+from ..benchmarks.tree import TreeStats
+from ..sketch import SizeSketch
+
+def exact(sizes: list[int], q: float) -> int:
+    return sorted(sizes)[int(q * (len(sizes) - 1))]
+
+def test_quantiles_are_whole_bytes_within_alpha() -> None:
+    random = Random(5)
+    sizes  = [int(random.lognormvariate(8, 3)) for _ in range(5000)]
+    sketch = SizeSketch()
+    for size in sizes:
+        sketch.add(size)
+    for q in (0, 0.1, 0.5, 0.9, 0.99, 1):
+        value = sketch.quantile(q)
+        assert isinstance(value, int)
+        assert abs(value - exact(sizes, q)) <= sketch.alpha * exact(sizes, q) + 0.5
+    small = SizeSketch()
+    for size in (5, 6, 6, 7):
+        small.add(size)
+    assert [small.quantile(i) for i in (0, 0.5, 1)] == [5, 6, 7]
+
+def test_merge_is_the_same_as_adding() -> None:
+    whole, left, right = SizeSketch(), SizeSketch(), SizeSketch()
+    for size in range(0, 100000, 37):
+        whole.add(size)
+        (left if size % 2 else right).add(size)
+    left.merge(right)
+    assert left == whole
+    assert SizeSketch().quantile(0.5) == 0
+
+def test_buckets_hold_the_sizes_by_bit_length() -> None:
+    sketch = SizeSketch()
+    for size in (0, 1, 2, 3, 4, 1023, 1024):
+        sketch.add(size)
+    assert sketch.buckets() == [(0, 1, 1), (1, 2, 1), (2, 4, 2), (4, 8, 1), (512, 1024, 1), (1024, 2048, 1)]
+
+def test_command_line_prints_whole_bytes(tree: tuple[Path, TreeStats], many) -> None:
+    root, spec = tree
+    out = many("-rny", "--distribution", "--quantiles", "10,50,99.9", str(root)).out.splitlines()
+    assert out[0] == str(spec.size)
+    percentiles = [i.split("\t") for i in out[1:4]]
+    assert [i[1] for i in percentiles] == ["p10", "p50", "p99.9"]
+    assert all(i[2].isdigit() for i in percentiles)
+    assert sum(int(i.split("\t")[3]) for i in out[4:]) == spec.files
+    assert many("-rny", "-j", "4", "--distribution", str(root)).out == many("-rny", "--distribution", str(root)).out
@@ -0,0 +1,30 @@
+#!/usr/bin/python3
+from pathlib import Path
+import pytest
+from .. import __main__ as cli
+from ..benchmarks.startup import PACKAGE, importtime
+from ..benchmarks.tree import TreeStats
+
+ARGUMENTS = [[], ["."], ["dir1"], ["*.txt"], [".", "*.txt", "file1.txt"], ["link0.txt"], ["*"], ["dir0", "*", "*.txt"], ["missing.txt"]]
+
+@pytest.mark.parametrize("flags", ["-n", "-nr", "-na", "-nd", "-nl", "-nrl", "-nrad", "-nrdl"])
+def test_fast_count_is_the_search_total(tree: tuple[Path, TreeStats], many, monkeypatch: pytest.MonkeyPatch, flags: str) -> None:
+    root, _ = tree
+    (root / "broken.txt").symlink_to("missing")
+    monkeypatch.chdir(root)
+    for args in ARGUMENTS:
+        fast = cli.fast_count([flags, *args])
+        assert fast is not None
+        with monkeypatch.context() as patch:
+            patch.setattr(cli, "fast_count", lambda args: None)
+            assert many(flags, *args).out == f"{fast}\n", args
+
+@pytest.mark.parametrize("args", [["-nf"], ["-n", "-y"], ["-n", "a/b"], ["-n", "*.t?t"], ["-n", "a*"], ["-r", "."], ["*", "-n"], ["-n", "--limit", "3"]])
+def test_fast_count_leaves_the_rest_to_the_search(args: list[str]) -> None:
+    assert cli.fast_count(args) is None
+
+def test_trivial_counts_do_not_import_the_search(tmp_path: Path) -> None:
+    _, base = importtime(["-c", "pass"], str(tmp_path))
+    for args in (["-n"], ["-nr", ".", "*.txt"]):
+        _, modules = importtime(["-m", PACKAGE, *args], str(tmp_path))
+        assert {"argparse", "pathlib", "re", "glob", f"{PACKAGE}.mainclass"} & (modules - base) == set()
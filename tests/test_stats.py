@@ -0,0 +1,34 @@
+#!/usr/bin/python3
+from json import loads
+from pathlib import Path
+import pytest
+from ..benchmarks.tree import TreeStats
+
+@pytest.mark.parametrize("extra", [[], ["-j", "4"], ["-P", "2"]])
+def test_counters_match_the_tree(tree: tuple[Path, TreeStats], many, extra: list[str]) -> None:
+    root, spec = tree
+    run = many("-rn", "--stats-format", "json", *extra, str(root), "*.txt")
+    stats = loads(run.err)
+    assert int(run.out) == stats["matched"] == spec.files
+    assert stats["dirs"] == spec.dirs
+    assert stats["entries"] == spec.entries
+    assert stats["links_skipped"] == spec.symlinks
+    assert stats["errors"] == 0
+
+def test_sizes_stat_every_match(tree: tuple[Path, TreeStats], many) -> None:
+    root, spec = tree
+    stats = loads(many("-rny", "--stats-format", "json", str(root)).err)
+    assert stats["matched"] == stats["stat_calls"] == spec.files
+
+def test_text_format(tree: tuple[Path, TreeStats], many) -> None:
+    root, spec = tree
+    lines = dict(i.split(": ") for i in many("-rn", "--stats-format", "text", str(root)).err.splitlines())
+    assert lines["dirs"] == str(spec.dirs)
+    assert float(lines["seconds"]) > 0
+
+def test_the_flag_does_not_take_the_filters(tree: tuple[Path, TreeStats], many) -> None:
+    root, spec = tree
+    run = many("-rn", "--stats", "*.txt", str(root))
+    assert int(run.out) == spec.files
+    assert "matched: " in run.err
+    assert loads(many("-rn", "--stats", "--stats-format", "json", "*.txt", str(root)).err)["matched"] == spec.files
@@ -0,0 +1,36 @@
+#!/usr/bin/python3
+from json import loads
+from pathlib import Path
+import pytest
+from ..benchmarks.tree import TreeStats
+
+def test_serial_search_stops_at_the_exact_threshold(tree: tuple[Path, TreeStats], many) -> None:
+    root, _ = tree
+    for extra in ([], ["--cache"], ["--stats-format", "json"]):
+        run = many("-rn", "--limit", "3", *extra, str(root))
+        assert (run.code, run.out) == (1, "3\n")
+    lines = [loads(i) for i in many("-rn", "--limit", "3", "--format", "ndjson", "--per-dir", str(root)).out.splitlines()]
+    assert lines[-1]["total"] == sum(i["total"] for i in lines if i["kind"] == "dir") == 3
+
+def test_exit_status(tree: tuple[Path, TreeStats], many) -> None:
+    root, spec = tree
+    assert many("-rn", "--limit", str(spec.files + 1), str(root), "*.txt").code == 0
+    assert many("-rn", "--at-least", str(spec.files), str(root), "*.txt").code == 0
+    assert many("-rn", "--at-least", str(spec.files + 1), str(root), "*.txt").code == 1
+    assert many("-rn", "--exists", str(root), "*.pdf").code == 1
+    assert many("-rn", "--exists", str(root), "file3.txt").out == "1\n"
+
+@pytest.mark.parametrize("extra", [["-j", "4"], ["-P", "2"]])
+def test_workers_stop_once_the_threshold_is_reached(tree: tuple[Path, TreeStats], many, extra: list[str]) -> None:
+    root, spec = tree
+    run = many("-rn", "--limit", "10", *extra, str(root))
+    assert run.code == 1
+    assert 10 <= int(run.out) < spec.dirs - 1 + spec.files
+
+def test_distribution_honours_the_threshold(tree: tuple[Path, TreeStats], many) -> None:
+    root, spec = tree
+    run = many("-r", "-y", "--at-least", "1", "--distribution", str(root))
+    assert run.code == 0
+    assert "stopped" in run.err
+    assert run.out.splitlines()[0].startswith(tuple(str(i) for i in range(1, 4097)))
+    assert ", 1 files" in run.out
@@ -0,0 +1,52 @@
+#!/usr/bin/python3
+from json import loads
+from os import environ
+from pathlib import Path
+from subprocess import run
+from sys import executable
+from time import perf_counter
+from ..benchmarks.tree import TreeStats
+from ..throttle import MIN_FACTOR, WARMUP, Throttle, TokenBucket
+
+PACKAGE = __package__.rsplit(".", 1)[0]
+ROOT    = str(Path(__file__).resolve().parents[2])
+
+def test_bucket_goes_in_debt() -> None:
+    bucket = TokenBucket(100, burst=10)
+    assert bucket.take(10) == 0
+    wait = bucket.take(20)
+    assert 0.15 < wait <= 0.2
+    assert TokenBucket(5).burst == 1 and TokenBucket(1000).burst == 100
+
+def test_limits_hold_the_rate(tree: tuple[Path, TreeStats], many) -> None:
+    root, spec = tree
+    start = perf_counter()
+    run = many("-rn", "--max-dirs-per-sec", "200", "--stats-format", "json", str(root))
+    elapsed = perf_counter() - start
+    stats = loads(run.err)
+    assert run.out == f"{spec.dirs - 1 + spec.files}\n"
+    assert elapsed >= (spec.dirs - 20) / 200
+    assert stats["dirs_limit"] == 200 and stats["wait_seconds"] > 0
+
+def test_adaptive_mode_backs_off_and_recovers() -> None:
+    throttle = Throttle(max_ops=1e9, adaptive=True)
+    for _ in range(WARMUP):
+        throttle.listed(0, 0.001)
+    throttle._adjusted = 0
+    for _ in range(WARMUP):
+        throttle.listed(0, 0.1)
+    assert throttle.factor == 0.5
+    for _ in range(200):
+        throttle._adjusted = 0
+        throttle.listed(0, 0.1)
+    assert throttle.factor >= MIN_FACTOR and throttle.lowest < 0.5
+    for _ in range(200):
+        throttle._adjusted = 0
+        throttle.listed(0, 0.0001)
+    assert throttle.factor == 1.0
+
+def test_nice_keeps_the_totals(tree: tuple[Path, TreeStats], many) -> None:
+    root, _ = tree
+    proc = run([executable, "-m", PACKAGE, "-rn", "--nice", str(root)], env=dict(environ, PYTHONPATH=ROOT), capture_output=True, text=True)
+    assert proc.returncode == 0
+    assert proc.stdout == many("-rn", str(root)).out
@@ -0,0 +1,38 @@
+#!/usr/bin/python3
+from os import lstat, walk
+from pathlib import Path
+from stat import S_ISDIR, S_ISFIFO, S_ISLNK, S_ISREG, S_ISSOCK
+from ..benchmarks.tree import TreeSpec, TreeStats, generate, restore
+
+SPEC = TreeSpec(width=2, depth=2, files=3, max_size=1000, symlinks=1, loops=1, fifos=1, sockets=1, unreadable=1, seed=3)
+
+def census(root: Path) -> TreeStats:
+    stats = TreeStats(dirs=1)
+    for path, dirs, files in walk(root):
+        for name in files + dirs:
+            st = lstat(Path(path, name))
+            stats.dirs     += S_ISDIR(st.st_mode)
+            stats.files    += S_ISREG(st.st_mode)
+            stats.size     += st.st_size if S_ISREG(st.st_mode) else 0
+            stats.symlinks += S_ISLNK(st.st_mode)
+            stats.fifos    += S_ISFIFO(st.st_mode)
+            stats.sockets  += S_ISSOCK(st.st_mode)
+    return stats
+
+def test_generated_tree_matches_its_stats(tmp_path: Path) -> None:
+    root = tmp_path / "tree"
+    root.mkdir()
+    stats = generate(str(root), SPEC)
+    try:
+        assert census(root) == stats
+    finally:
+        restore(str(root), SPEC)
+
+def test_same_spec_gives_the_same_tree(tmp_path: Path) -> None:
+    first, second = tmp_path / "a", tmp_path / "b"
+    first.mkdir()
+    second.mkdir()
+    spec = TreeSpec(width=2, depth=2, files=4, max_size=1 << 20, seed=11)
+    assert generate(str(first), spec) == generate(str(second), spec)
+    sizes = [{i.relative_to(root): i.stat().st_size for i in root.rglob("*")} for root in (first, second)]
+    assert sizes[0] == sizes[1]
@@ -0,0 +1,30 @@
+#!/usr/bin/python3
+from os import listdir
+from pathlib import Path
+from ..benchmarks.tree import TreeStats
+from ..walker import Walker
+
+def test_every_directory_is_listed_once(tree: tuple[Path, TreeStats]) -> None:
+    root, stats = tree
+    seen = [(path, entries) for path, entries in Walker(str(root), recursive=True)]
+    paths = [path for path, _ in seen]
+    assert len(paths) == len(set(paths)) == stats.dirs
+    for path, entries in seen:
+        assert sorted(i.name for i in entries) == sorted(listdir(path))
+
+def test_not_recursive_lists_the_root_only(tree: tuple[Path, TreeStats]) -> None:
+    root, _ = tree
+    assert [path for path, _ in Walker(str(root))] == [str(root)]
+
+def test_counts_and_sizes_match_the_tree(tree: tuple[Path, TreeStats], many) -> None:
+    root, stats = tree
+    assert many("-rn", str(root)).out == f"{stats.dirs - 1 + stats.files}\n"
+    assert many("-rna", str(root)).out == f"{stats.files}\n"
+    assert many("-rnl", str(root)).out == f"{stats.symlinks}\n"
+    assert many("-rny", str(root)).out == f"{stats.size}\n"
+
+def test_size_mode_type_warning_goes_to_stdout(tree: tuple[Path, TreeStats], many) -> None:
+    root, _ = tree
+    run = many("-y", "-l", str(root))
+    assert "warning" in run.out and "ignored while counting size" in run.out
+    assert "warning" not in run.err
@@ -0,0 +1,293 @@
+#!/usr/bin/python3
+"""
+Rate limits of the traversal, --max-ops-per-sec, --max-dirs-per-sec, --adaptive and --nice
+---------------------------------------------------------------------------------
+The metadata operations are the directory listings, one per directory plus one per entry
+returned since a file server sends the attributes of every entry, and the stat calls of the
+scan cache. Every limit is a token bucket shared by all the worker threads of the process,
+a worker takes its tokens before listing a directory and waits while the bucket is in debt,
+so the rate holds whatever the number of jobs. With -P every process gets its share of the limits.
+The adaptive mode lowers the rates while the latency of the operations is well over the
+lowest one seen, and raises them back slowly once it recovers.
+---------------------------------------------------------------------------------
+"""
+
+from dataclasses import dataclass, field
+from threading import Lock
+from time import perf_counter, sleep
+from typing import Optional, TYPE_CHECKING
+if TYPE_CHECKING:
+    from .mainclass import ArgvContainer
+    from .stats import Stats
+
+# ? The adaptive mode backs off when the latency doubles and recovers under 1.25 times the lowest one
+BACKOFF = 2.0
+RECOVER = 1.25
+
+# ? Lowest fraction of the limits the adaptive mode goes down to
+MIN_FACTOR = 1 / 32
+
+# ? Seconds between adaptive adjustments, and latency samples before the first one
+ADJUST_SECONDS = 0.5
+WARMUP = 16
+
+# ? Linux ioprio_set syscall numbers, the I/O priority is left alone on other machines
+IOPRIO_SET = {"x86_64": 251, "i386": 289, "i686": 289, "aarch64": 30, "riscv64": 30, "armv7l": 314, "ppc64le": 273, "ppc64": 273, "s390x": 282}
+IOPRIO_CLASS_IDLE = 3
+IOPRIO_CLASS_SHIFT = 13
+IOPRIO_WHO_PROCESS = 1
+
+@dataclass
+class TokenBucket():
+    """
+    Token bucket of a rate limit, tokens are taken ahead of time so the bucket can go in debt,
+    the caller waits until the debt is paid back
+
+    Parameters
+    ----------
+    rate: float
+        The tokens added per second
+
+    burst: float = 0
+        The tokens kept while idle, default a tenth of a second of tokens and at least one
+    """
+    rate:    float
+    burst:   float = 0
+    _tokens: float = field(default=0, init=False)
+    _stamp:  float = field(default_factory=perf_counter, init=False)
+
+    def __post_init__(self) -> None:
+        self.burst   = self.burst or max(1.0, self.rate / 10)
+        self._tokens = self.burst
+
+    def take(self, tokens: float, factor: float=1.0) -> float:
+        """
+        Take tokens, called with the lock of the throttle held
+
+        Parameters
+        ----------
+        tokens: float
+            The tokens to take
+
+        factor: float = 1.0
+            The fraction of the rate in effect, lowered by the adaptive mode
+
+        Returns
+        -------
+        take: float
+            The seconds to wait before going on, 0 if the bucket is not in debt
+        """
+        now  = perf_counter()
+        rate = self.rate * factor
+        self._tokens = min(self.burst, self._tokens + (now - self._stamp) * rate) - tokens
+        self._stamp  = now
+        return -self._tokens / rate if self._tokens < 0 else 0.0
+
+@dataclass
+class Throttle():
+    """
+    The rate limits of a search, shared by its worker threads
+
+    Parameters
+    ----------
+    max_ops: Optional[float] = None
+        The metadata operations per second, default no limit
+
+    max_dirs: Optional[float] = None
+        The directories listed per second, default no limit
+
+    adaptive: bool = False
+        Whether to lower the limits while the latency of the operations rises
+
+    factor: float
+        The fraction of the limits in effect, 1 unless the adaptive mode lowered it
+
+    lowest: float
+        The lowest fraction of the limits the adaptive mode went down to
+
+    waited: float
+        The seconds the workers waited for the limits, summed over the workers
+    """
+    max_ops:   Optional[float] = None
+    max_dirs:  Optional[float] = None
+    adaptive:  bool = False
+    factor:    float = field(default=1.0, init=False)
+    lowest:    float = field(default=1.0, init=False)
+    waited:    float = field(default=0.0, init=False)
+    _ops:      Optional[TokenBucket] = field(default=None, init=False)
+    _dirs:     Optional[TokenBucket] = field(default=None, init=False)
+    _recent:   float = field(default=0.0, init=False)
+    _baseline: float = field(default=0.0, init=False)
+    _samples:  int = field(default=0, init=False)
+    _adjusted: float = field(default_factory=perf_counter, init=False)
+    _lock:     Lock = field(default_factory=Lock, init=False)
+
+    def __post_init__(self) -> None:
+        if self.max_ops is not None:
+            self._ops = TokenBucket(self.max_ops)
+        if self.max_dirs is not None:
+            self._dirs = TokenBucket(self.max_dirs)
+
+    @classmethod
+    def fromargs(cls, argvcont: 'ArgvContainer') -> Optional['Throttle']:
+        """
+        Get the throttle of the arguments, the same one for every search of the process with
+        the same limits, so the shards a worker process runs one after the other share their buckets
+
+        Parameters
+        ----------
+        argvcont: ArgvContainer
+            The parsed arguments
+
+        Returns
+        -------
+        fromargs: Optional[Throttle]
+            The throttle, None if the arguments have no limit
+        """
+        if argvcont.max_ops is None and argvcont.max_dirs is None:
+            return None
+        key = argvcont.max_ops, argvcont.max_dirs, argvcont.adaptive
+        if key not in THROTTLES:
+            THROTTLES[key] = cls(*key)
+        return THROTTLES[key]
+
+    def take(self, ops: int, dirs: int=0) -> None:
+        """
+        Take the tokens of some operations, waiting while a limit is exceeded
+
+        Parameters
+        ----------
+        ops: int
+            The metadata operations
+
+        dirs: int = 0
+            The directories listed
+
+        Returns
+        -------
+        None
+        """
+        with self._lock:
+            wait = 0.0
+            if self._ops is not None and ops > 0:
+                wait = self._ops.take(ops, self.factor)
+            if self._dirs is not None and dirs > 0:
+                wait = max(wait, self._dirs.take(dirs, self.factor))
+            self.waited += wait
+        if wait > 0:
+            sleep(wait)
+
+    def listed(self, entries: int, seconds: float) -> None:
+        """
+        Take the tokens of the entries of a listed directory, and with the adaptive mode
+        follow the latency of its operations and adjust the limits
+
+        Parameters
+        ----------
+        entries: int
+            The entries of the directory
+
+        seconds: float
+            The time the listing took
+
+        Returns
+        -------
+        None
+        """
+        if self.adaptive:
+            with self._lock:
+                latency = seconds / (entries + 1)
+                self._samples += 1
+                self._recent   = latency if self._samples == 1 else 0.8 * self._recent + 0.2 * latency
+                if self._samples >= WARMUP:
+                    self.adjust()
+        self.take(entries)
+
+    def adjust(self) -> None:
+        """
+        Lower the limits by half while the recent latency is over BACKOFF times the baseline,
+        raise them by a tenth while it is under RECOVER times, at most once per ADJUST_SECONDS.
+        The baseline is the lowest recent latency, drifting up so a few fast listings do not
+        keep the limits low forever. Called with the lock held
+
+        Parameters
+        ----------
+        None
+
+        Returns
+        -------
+        None
+        """
+        now = perf_counter()
+        if self._baseline == 0.0 or self._recent < self._baseline:
+            self._baseline = self._recent
+        if now - self._adjusted < ADJUST_SECONDS:
+            return
+        self._adjusted = now
+        if self._recent > BACKOFF * self._baseline:
+            self.factor = max(MIN_FACTOR, self.factor / 2)
+        elif self._recent < RECOVER * self._baseline:
+            self.factor = min(1.0, self.factor + 0.1)
+        self.lowest    = min(self.lowest, self.factor)
+        self._baseline *= 1.05
+
+    def report(self, stats: 'Stats') -> None:
+        """
+        Write the limits in effect and the time waited for them into the counters of the search
+
+        Parameters
+        ----------
+        stats: Stats
+            The counters of the search
+
+        Returns
+        -------
+        None
+        """
+        stats.ops_limit    = max(stats.ops_limit, self.max_ops or 0.0)
+        stats.dirs_limit   = max(stats.dirs_limit, self.max_dirs or 0.0)
+        stats.rate_factor  = min(stats.rate_factor, self.lowest)
+        stats.wait_seconds += self.waited
+        self.waited = 0.0
+
+# ? The throttles of the process by limits
+THROTTLES: dict[tuple[Optional[float], Optional[float], bool], Throttle] = {}
+
+def renice() -> tuple[int, list[str]]:
+    """
+    Lower the CPU priority of the process to the lowest one and, on Linux, its I/O priority to the idle class.
+    It is called before any worker thread or process starts, they inherit both priorities
+
+    Parameters
+    ----------
+    None
+
+    Returns
+    -------
+    renice: tuple[int, list[str]]
+        The niceness of the process and the priorities that could not be set
+    """
+    import os
+    failed: list[str] = []
+    try:
+        os.setpriority(os.PRIO_PROCESS, 0, 19)
+    except (AttributeError, OSError):
+        failed.append("CPU")
+    from platform import machine
+    from sys import platform
+    number = IOPRIO_SET.get(machine()) if platform == "linux" else None
+    if number is None:
+        failed.append("I/O")
+    else:
+        from ctypes import CDLL
+        from ctypes.util import find_library
+        libc = CDLL(find_library("c") or "libc.so.6", use_errno=True)
+        if libc.syscall(number, IOPRIO_WHO_PROCESS, 0, IOPRIO_CLASS_IDLE << IOPRIO_CLASS_SHIFT) != 0:
+            failed.append("I/O")
+    try:
+        niceness = os.getpriority(os.PRIO_PROCESS, 0)
+    except (AttributeError, OSError):
+        niceness = 0
+    return niceness, failed
+
+__all__ = ["Throttle", "TokenBucket", "renice"]
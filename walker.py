@@ -0,0 +1,415 @@
+#!/usr/bin/python3
+from dataclasses import dataclass, replace
+from collections import deque
+from os import scandir, sep, stat, stat_result, DirEntry, PathLike
+from time import perf_counter
+from typing import Callable, Iterator, Optional, Union, TYPE_CHECKING
+# ? The archives module, and the threading one it needs, are only imported with --archives
+if TYPE_CHECKING:
+    from .archives import ArchiveIndex
+    from .inodes import InodeSet
+    from .prune import Pruner
+    from .stats import Stats
+    from .throttle import Throttle
+
+StrPath = Union[str, PathLike[str]]
+
+def isdir(file: DirEntry, follow: bool=False) -> bool:
+    """
+    Test if the entry is a directory and not a symlink, or is a symlink to a directory while follow flag is set.
+    The directory entry caches the file type from the listing, so this does not issue any syscall
+    unless the entry is a symbolic link that has to be followed.
+
+    Parameters
+    ----------
+    file: DirEntry
+        The directory entry to test
+
+    follow: bool
+        Whether to follow symlinks or not
+
+    Returns
+    -------
+    isdir: bool
+        Whether the entry is a directory to descend into or not
+    """
+    try:
+        return file.is_dir() and (not file.is_symlink() or follow)
+    except OSError:
+        return False
+
+@dataclass
+class Walker():
+    """
+    Traversal engine over os.scandir.
+    Every directory is listed exactly once and its entries are shared between
+    filter matching, type matching and size summing through the DirEntry cache.
+
+    Parameters
+    ----------
+    root: StrPath
+        The directory to start the traversal from
+
+    recursive: bool = False
+        Whether to read sub directories or not
+
+    follow: bool = False
+        Whether follow symlinks to directories or not
+
+    onerror: Optional[Callable[[OSError], None]] = None
+        The handler of the directories that cannot be read, like a PermissionError or a directory
+        removed while it is walked, default errors are ignored
+
+    stats: Optional[Stats] = None
+        The counters of listed directories and symbolic links, default they are not collected
+
+    pruner: Optional[Pruner] = None
+        The rules of the subdirectories not to descend into, default every subdirectory is visited
+
+    visited: Optional[InodeSet] = None
+        The identities of the directories already visited, with the root among them,
+        a directory reached again through a symbolic link is not descended into. Default no check
+
+    archives: Optional[ArchiveIndex] = None
+        The listings of the tar and zip archives to enter like directories while recursing, default archives are plain files
+
+    throttle: Optional[Throttle] = None
+        The rate limits of the listings, shared by the workers, default directories are listed as fast as possible
+    """
+    root:      StrPath
+    recursive: bool = False
+    follow:    bool = False
+    onerror:   Optional[Callable[[OSError], None]] = None
+    stats:     Optional['Stats'] = None
+    pruner:    Optional['Pruner'] = None
+    visited:   Optional['InodeSet'] = None
+    archives:  Optional['ArchiveIndex'] = None
+    throttle:  Optional['Throttle'] = None
+
+    def listdir(self, path: StrPath) -> list[DirEntry]:
+        """
+        List a directory with a single os.scandir call
+
+        Parameters
+        ----------
+        path: StrPath
+            The directory to list
+
+        Returns
+        -------
+        listdir: list[DirEntry]
+            The directory entries, empty if the directory could not be read or is gone
+        """
+        if self.throttle is not None:
+            self.throttle.take(1, 1)
+        start = perf_counter() if self.stats is not None or self.throttle is not None else 0.0
+        try:
+            with scandir(path) as it:
+                entries = list(it)
+        except OSError as err:
+            # ? A directory removed or replaced while the tree is walked must not stop the search
+            if self.onerror is not None:
+                self.onerror(err)
+            return []
+        if self.stats is not None:
+            self.stats.listed(entries, perf_counter() - start)
+        if self.throttle is not None:
+            self.throttle.listed(len(entries), perf_counter() - start)
+        return entries
+
+    def keep(self, path: str, entry: Optional[DirEntry]=None) -> bool:
+        """
+        Test a subdirectory against the pruning rules and the visited directories, counting the skipped ones
+
+        Parameters
+        ----------
+        path: str
+            The subdirectory
+
+        entry: Optional[DirEntry] = None
+            Its directory entry, if it was listed
+
+        Returns
+        -------
+        keep: bool
+            Whether the traversal descends into the subdirectory or not
+        """
+        if self.pruner is not None and self.pruner.prunes(path, entry):
+            if self.stats is not None:
+                self.stats.pruned += 1
+            return False
+        if self.visited is None:
+            return True
+        try:
+            st = entry.stat() if entry is not None else stat(path)
+        except OSError:
+            return True
+        if self.visited.add(st.st_dev, st.st_ino):
+            return True
+        if self.stats is not None:
+            self.stats.loops += 1
+        return False
+
+    def subdirs(self, entries: list[DirEntry], prune: bool=True) -> list[DirEntry]:
+        """
+        Select the entries the traversal should descend into
+
+        Parameters
+        ----------
+        entries: list[DirEntry]
+            The entries of an already listed directory
+
+        prune: bool = True
+            Whether to apply the pruning rules and skip the visited directories or not
+
+        Returns
+        -------
+        subdirs: list[DirEntry]
+            The directories to visit, with the archives to enter if any, in listing order
+        """
+        if self.archives is None:
+            subdirs = [i for i in entries if isdir(i, self.follow)]
+        else:
+            # ? An archive is descended into like a directory, in listing order
+            subdirs = [i for i in entries if isdir(i, self.follow) or self.enters(i)]
+        if prune and (self.pruner is not None or self.visited is not None):
+            subdirs = [i for i in subdirs if self.keep(i.path, i)]
+        if self.stats is not None:
+            self.stats.descended(entries, subdirs)
+        return subdirs
+
+    def __iter__(self) -> Iterator[tuple[str, list[DirEntry]]]:
+        """
+        Depth first traversal, every directory is yielded before its subdirectories
+
+        Parameters
+        ----------
+        None
+
+        Returns
+        -------
+        __iter__: Iterator[tuple[str, list[DirEntry]]]
+            Iterates over the directory paths and their entries
+        """
+        if self.archives is not None:
+            from .archives import is_archive
+        ddires: list[StrPath] = [self.root]
+        while len(ddires) > 0:
+            last = ddires.pop()
+            if self.archives is not None and is_archive(str(last)):
+                found: list[tuple[str, list[DirEntry]]] = []
+                if self.unpack(0, str(last), lambda _, path, entries: found.append((path, entries))) is not None:
+                    yield from found
+                    continue
+            entries = self.listdir(last)
+            yield str(last), entries
+            if self.recursive:
+                tmp = self.subdirs(entries)
+                if len(tmp) > 0:
+                    tmp.reverse()
+                    ddires.extend(i.path for i in tmp)
+
+    def enters(self, entry: DirEntry) -> bool:
+        """
+        Test if an entry is an archive to descend into, a symbolic link to an archive only while following them
+
+        Parameters
+        ----------
+        entry: DirEntry
+            The directory entry to test
+
+        Returns
+        -------
+        enters: bool
+            Whether the entry is a tar or zip file entered with the archives
+        """
+        from .archives import is_archive
+        try:
+            return is_archive(entry.name) and entry.is_file() and (not entry.is_symlink() or self.follow)
+        except OSError:
+            return False
+
+    def unpack(self, wid: int, path: str, visit: Callable[[int, str, list[DirEntry]], object], st: Optional[stat_result]=None) -> Optional[list[object]]:
+        """
+        Visit the virtual directories of an archive, the pruning rules apply to them like to the directories on disk.
+        An archive that cannot be read is left as a plain file, counted in the bad_archives counter
+
+        Parameters
+        ----------
+        wid: int
+            The index of the worker processing the archive
+
+        path: str
+            The archive
+
+        visit: Callable[[int, str, list[DirEntry]], object]
+            Called with the worker index, every virtual directory path and its members
+
+        st: Optional[stat_result] = None
+            The stat of the archive, default path is stat'ed
+
+        Returns
+        -------
+        unpack: Optional[list[object]]
+            What visit returned for every virtual directory, None if path is not a regular file so it must be listed
+        """
+        assert self.archives is not None
+        if self.throttle is not None:
+            self.throttle.take(1)
+        start = perf_counter() if self.stats is not None else 0.0
+        try:
+            opened = self.archives.open(path, st)
+        except Exception:
+            # ? Every format raises its own errors for truncated or corrupted archives, tarfile, zipfile, zlib, lzma...
+            if self.stats is not None:
+                self.stats.bad_archives += 1
+            return []
+        if opened is None:
+            return None
+        vdirs, fresh = opened
+        results: list[object] = []
+        pruned:  list[str] = []
+        for vdir, members in vdirs:
+            if any(vdir.startswith(i) for i in pruned):
+                continue
+            if vdir != path and self.pruner is not None and self.pruner.prunes(vdir):
+                pruned.append(vdir + sep)
+                if self.stats is not None:
+                    self.stats.pruned += 1
+                continue
+            if self.stats is not None:
+                self.stats.entries      += len(members)
+                self.stats.list_seconds += perf_counter() - start
+            results.append(visit(wid, vdir, members))
+            start = perf_counter() if self.stats is not None else 0.0
+        if self.stats is not None:
+            self.stats.archives      += 1
+            self.stats.archive_reads += fresh
+        return results
+
+    def expand(self, wid: int, path: StrPath, visit: Callable[[int, str, list[DirEntry]], object]) -> list[StrPath]:
+        """
+        Process a single directory, list it, visit its entries and select its subdirectories
+
+        Parameters
+        ----------
+        wid: int
+            The index of the worker processing the directory
+
+        path: StrPath
+            The directory to process
+
+        visit: Callable[[int, str, list[DirEntry]], object]
+            Called with the worker index, the directory path and its entries
+
+        Returns
+        -------
+        expand: list[StrPath]
+            The subdirectories to visit next, empty if not recursive
+        """
+        if self.archives is not None:
+            from .archives import is_archive
+            if is_archive(str(path)) and self.unpack(wid, str(path), visit) is not None:
+                return []
+        entries = self.listdir(path)
+        visit(wid, str(path), entries)
+        if not self.recursive:
+            return []
+        return [i.path for i in self.subdirs(entries)]
+
+    def parallel(self, jobs: int, visit: Callable[[int, str, list[DirEntry]], object]) -> None:
+        """
+        Work stealing traversal over a thread pool.
+        Every worker keeps its own deque of directories, it takes work from its tail (depth first)
+        and steals from the head of the other workers deques when it runs out of directories.
+        The listing and the visit callback run in the worker threads, so the syscalls of
+        several directories are in flight at the same time.
+        Every worker has its own stats counters, they are merged at the end.
+        An exception raised by visit stops all the workers and is raised again here,
+        that is how a search stops early.
+
+        Parameters
+        ----------
+        jobs: int
+            The number of worker threads
+
+        visit: Callable[[int, str, list[DirEntry]], object]
+            Called in the worker thread with the worker index, the directory path and its entries
+
+        Returns
+        -------
+        None
+        """
+        if not self.recursive or jobs < 2:
+            ddires: list[StrPath] = [self.root]
+            while len(ddires) > 0:
+                tmp = self.expand(0, ddires.pop(), visit)
+                tmp.reverse()
+                ddires.extend(tmp)
+            return
+
+        from threading import Condition, Lock, Thread
+        queues: list[deque[StrPath]] = [deque() for _ in range(jobs)]
+        queues[0].append(self.root)
+        cond     = Condition()
+        printing = Lock()
+        pending  = 1
+        failure: list[BaseException] = []
+        onerror  = self.onerror
+
+        def report(err: OSError) -> None:
+            with printing:
+                if onerror is not None:
+                    onerror(err)
+
+        def take(wid: int) -> Optional[StrPath]:
+            try:
+                return queues[wid].pop()
+            except IndexError:
+                pass
+            for i in range(1, jobs):
+                try:
+                    return queues[(wid + i) % jobs].popleft()
+                except IndexError:
+                    continue
+            return None
+
+        def worker(wid: int) -> None:
+            nonlocal pending
+            walker = walkers[wid]
+            while not failure:
+                path = take(wid)
+                if path is None:
+                    with cond:
+                        while pending > 0 and not any(queues) and not failure:
+                            cond.wait()
+                        if pending == 0 or failure:
+                            return
+                    continue
+                try:
+                    tmp = walker.expand(wid, path, visit)
+                except BaseException as exc:
+                    with cond:
+                        failure.append(exc)
+                        cond.notify_all()
+                    return
+                with cond:
+                    pending += len(tmp) - 1
+                    tmp.reverse()
+                    queues[wid].extend(tmp)
+                    if len(tmp) > 0 or pending == 0:
+                        cond.notify_all()
+
+        walkers = [replace(self, onerror=report, stats=None if self.stats is None else type(self.stats)()) for _ in range(jobs)]
+        threads = [Thread(target=worker, args=(i,), daemon=True) for i in range(jobs)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        if self.stats is not None:
+            for walker in walkers:
+                self.stats.merge(walker.stats)
+        if failure:
+            raise failure[0]
+
+__all__ = ["Walker", "isdir"]